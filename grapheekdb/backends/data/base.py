@@ -1,12 +1,22 @@
 # -*- coding:utf-8 -*-
 
+try:  # pragma : no cover
+    from itertools import izip_longest as zip_longest
+except ImportError:  # pragma : no cover
+    from itertools import zip_longest
+
 import sys
+import heapq
 import random
-from collections import defaultdict
-from functools import reduce, cmp_to_key
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, Counter
+from contextlib import contextmanager
+from functools import partial, reduce, wraps
 from itertools import chain, tee
+from operator import itemgetter
 
 from grapheekdb.lib.undef import UNDEFINED
+from grapheekdb.lib.cache import LRUCache, DEFAULT_MAX_ENTRIES, DEFAULT_MAX_BYTES, copy_value
 from grapheekdb.lib.readwrite import GraphReadWrite
 from grapheekdb.lib.nx import GraphNx
 from grapheekdb.lib.validations import check_valid_data
@@ -15,18 +25,20 @@ from grapheekdb.lib.exceptions import GrapheekIndexCreationFailedException, Grap
 from grapheekdb.lib.exceptions import GrapheekMissingKeyException, GrapheekInvalidDataTypeException
 from grapheekdb.lib.exceptions import GrapheekUnknownScriptException, GrapheekUnknownAlias
 from grapheekdb.lib.exceptions import GrapheekUnknownMethod, GrapheekMixedKindException
-from grapheekdb.lib.expressions import eval_expr
+from grapheekdb.lib.expressions import compile_expr
 
 from grapheekdb.backends.data.keys import build_key, PREPARED
 from grapheekdb.backends.data.keys import METADATA_EDGE_COUNTER, METADATA_EDGE_INDEX_COUNTER, METADATA_EDGE_INDEX_LIST, METADATA_EDGE_INDEX_FIELDS_PREFIX, METADATA_EDGE_INDEX_PREFIX
 from grapheekdb.backends.data.keys import METADATA_VERTEX_COUNTER, METADATA_VERTEX_INDEX_COUNTER, METADATA_VERTEX_INDEX_LIST, METADATA_VERTEX_INDEX_FIELDS_PREFIX, METADATA_VERTEX_INDEX_PREFIX
 from grapheekdb.backends.data.keys import METADATA_VERTEX_REMOVED_COUNTER, METADATA_EDGE_REMOVED_COUNTER
+from grapheekdb.backends.data.keys import METADATA_EDGE_VERTEX_CENTRIC_LIST, VERTEX_CENTRIC_SUFFIX
 from grapheekdb.backends.data.keys import DATA_SUFFIX, IN_EDGES_SUFFIX, IN_VERTICES_SUFFIX, OUT_EDGES_SUFFIX, OUT_VERTICES_SUFFIX, BOTH_EDGES_SUFFIX, BOTH_VERTICES_SUFFIX
-from grapheekdb.backends.data.keys import COUNT_SUFFIX, KIND_VERTEX, KIND_EDGE, KIND_INDEX
+from grapheekdb.backends.data.keys import COUNT_SUFFIX, KIND_VERTEX, KIND_EDGE, KIND_INDEX, LIST_CHUNK_SUFFIX
 from grapheekdb.backends.data.keys import METADATA_EDGE_ID_LIST_PREFIX, METADATA_VERTEX_ID_LIST_PREFIX, CHUNK_SIZE
-from grapheekdb.backends.data.filtertools import build_filter_funcs, filter_entities
-from grapheekdb.backends.data.ordertools import build_order_func
-from grapheekdb.backends.data.indexes import ExactIndex, normalize_value
+from grapheekdb.backends.data.filtertools import build_filter_funcs, filter_entities, get_exact_values, entity_id_windows
+from grapheekdb.backends.data.ordertools import build_order_key
+from grapheekdb.backends.data.indexes import ExactIndex, RangeIndex, EXACT_INDEX, INDEX_CLASSES
+from grapheekdb.backends.data.indexes import normalize_value, index_signature, vertex_centric_items
 from grapheekdb.backends.data.operations import Addition, Removal
 from grapheekdb.backends.data.optimizer import Optimizer
 
@@ -34,18 +46,88 @@ PYTHON3 = sys.version_info.major == 3
 
 
 # misc iterators :
+def _jump_plan(_jumping_iterator, _graph, _kind, _entity_iterator, _traversal, _neighbors_cache, **filters):
+    return _jumping_iterator(_graph, _kind, _entity_iterator._iterate(), _traversal, _neighbors_cache, **filters)
+
+
 def _jump_iterator(_graph, _kind, _entity_id_iterator, _traversal, _neighbors_cache, **filters):
     for entity_id in _entity_id_iterator:
         for neighbor_id in iter(_graph._neighbors(_kind, entity_id, _traversal, _neighbors_cache, False, **filters)):
             yield neighbor_id
 
 
+def _degree_sum_plan(_graph, _kind, _entity_iterator, _traversal):
+    return sum(_graph._degree(_kind, entity_id, _traversal) for entity_id in _entity_iterator._iterate())
+
+
 def _random_iterator(_graph, _kind, _entity_id_iterator, _traversal, _neighbors_cache, **filters):
     for entity_id in _entity_id_iterator:
         for neighbor_id in iter(_graph._neighbors(_kind, entity_id, _traversal, _neighbors_cache, True, **filters)):
             yield neighbor_id
 
 
+def _call_write(func):
+    # returns a (result, exception) pair
+    try:
+        return func(), None
+    except Exception as e:
+        return None, e
+
+
+def retried_when_full(method):
+    # Write methods are run again when they failed because the backend storage was full and could be grown
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        graph = self._graph if isinstance(self, EntityIterator) else self
+        while True:
+            try:
+                return method(self, *args, **kwargs)
+            except Exception:
+                if not graph._grow_storage():
+                    raise
+                graph._reload_after_rollback()
+    return wrapper
+
+
+def in_read_snapshot(method):
+    # EntityIterator methods consuming a whole pipeline read the database through a single snapshot
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._graph.read_snapshot():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def remove_counted(lst, pending):
+    # Returns lst without the first occurences of values counted in pending (pending counters are decreased)
+    if not pending:
+        return lst
+    result = []
+    for value in lst:
+        if pending.get(value):
+            pending[value] -= 1
+            if not pending[value]:
+                del pending[value]
+        else:
+            result.append(value)
+    return result
+
+
+def remove_each(lst, values):
+    # Returns lst without ONE occurence of each value (a value given twice is removed twice), in a single pass
+    pending = Counter(values)
+    result = remove_counted(lst, pending)
+    if pending:
+        raise ValueError("list.remove(x): x not in list")
+    return result
+
+
+def unique_ids(entity_ids):
+    # entity_ids without duplicates (first occurence order is kept)
+    seen = set()
+    return [entity_id for entity_id in entity_ids if not(entity_id in seen or seen.add(entity_id))]
+
+
 def check_base_node(entity):
     if not(isinstance(entity, Node)):
         raise GrapheekInvalidDataTypeException('%s is not a node' % (entity,))
@@ -182,22 +264,7 @@ class EntityAggregate(object):
         else:
             counters = defaultdict(float)
         total = 0
-        entity_data_cache = {}
-        for entity_id in self._entity_iterator._iterate(on_item=False):
-            if self._expr is None:
-                value = 1
-            else:
-                # Safe eval of expression :
-                entity_data = entity_data_cache.get(entity_id, None)
-                if entity_data is None:
-                    entity_data = self._graph._item_from_id(self._entity_kind, entity_id).data()
-                    entity_data_cache[entity_id] = entity_data
-                context = entity_data
-                context['_'] = self._entity_iterator._context
-                try:
-                    value = eval_expr(context, self._expr)
-                finally:
-                    del context['_']
+        for entity_id, value in self._values():
             counters[entity_id] += value
             total += value
         if total and (self._agg == '%'):
@@ -210,6 +277,37 @@ class EntityAggregate(object):
             results.append((entity, count))
         return results
 
+    def _values(self):
+        # yields (entity_id, value) pairs
+        id_iterator = self._entity_iterator._iterate(on_item=False)
+        if self._expr is None:
+            for entity_id in id_iterator:
+                yield entity_id, 1
+            return
+        # Safe eval of expression (compiled once, only referenced fields are read) :
+        expression = compile_expr(self._expr)
+        fields = expression.fields
+        if expression.uses_context:
+            # iterator context changes while iterating, so each entity is evaluated as soon as it comes
+            windows = ([entity_id] for entity_id in id_iterator)
+        else:
+            windows = entity_id_windows(id_iterator)
+        field_values_cache = {}
+        for entity_ids in windows:
+            missing_ids = [entity_id for entity_id in entity_ids if entity_id not in field_values_cache]
+            if missing_ids:
+                datas = self._graph._bulk_get_data(None, self._entity_kind, missing_ids) if fields else [{}] * len(missing_ids)
+                for entity_id, data in zip(missing_ids, datas):
+                    if data == UNDEFINED:  # pragma : no cover
+                        data = {}
+                    field_values_cache[entity_id] = dict((field, data[field]) for field in fields if field in data)
+            for entity_id in entity_ids:
+                context = field_values_cache[entity_id]
+                if expression.uses_context:
+                    context = dict(context)
+                    context['_'] = self._entity_iterator._context
+                yield entity_id, expression(context)
+
     def __iter__(self):
         return self
 
@@ -230,7 +328,7 @@ class EntityAggregate(object):
         def entity_iterator(iterator):
             for entity, _ in iterator:
                 yield entity.get_id()
-        return EntityIterator(self._graph, self._entity_kind, {}, entity_iterator(self), parent=self._entity_iterator)
+        return EntityIterator(self._graph, self._entity_kind, {}, partial(entity_iterator, self), parent=self._entity_iterator)
 
     def limit(self, number):
         def limit_iterator(iterator, number):
@@ -245,14 +343,38 @@ class EntityAggregate(object):
 
 
 class EntityIterator(object):
+    """
+    An entity iterator holds a "plan" : a callable returning a new entity id iterator each time it is called
+    (typically, it iterates its parent again, then jumps to neighbours...)
+    So, each iteration re-runs the plan from its source instead of keeping every id in memory
+    (use materialize method to run the plan once and keep its ids)
+
+    For compatibility, id_iterator can also be a plain iterator : as it can't be re-run, its ids are buffered
+
+    count_plan is an optional callable returning the entity count without iterating the plan
+    (from denormalized counters) or None when it can't answer
+
+    limit_plan is an optional callable returning a plan for the first <count> entities only
+    (i.e : order_by followed by limit only keeps the <count> best entities)
+
+    projection is an optional (only, exclude) pair of field lists : it restricts the data sent
+    when entities are marshalled (by the server)
+    """
 
-    def __init__(self, graph, src_kind, filters, id_iterator, parent=None, neighbors_cache=None, context=None):
+    def __init__(self, graph, src_kind, filters, id_iterator, parent=None, neighbors_cache=None, context=None, count_plan=None, limit_plan=None, projection=None):
         assert(id_iterator is not None)
         self._graph = graph
         self._src_kind = src_kind
         self._filters = filters
         self._filter_funcs = build_filter_funcs(**filters)
-        self._initial_id_iterator, self._id_iterator = tee(id_iterator)
+        if callable(id_iterator):
+            self._plan = id_iterator
+        else:
+            self._initial_id_iterator = id_iterator
+            self._plan = self._buffered_ids
+        self._count_plan = count_plan
+        self._limit_plan = limit_plan
+        self._projection = projection if projection is not None else (None, None)
         self._parent = parent
         self._neighbors_cache = neighbors_cache if neighbors_cache is not None else {}
         self._release_neighbors_cache = neighbors_cache is None
@@ -314,13 +436,16 @@ class EntityIterator(object):
             self._neighbors_cache = {}
 
     def _iterate(self, on_item=False):
-        for item in filter_entities(self._graph, self._src_kind, self._id_iterator, self._filter_funcs, on_item=on_item):
+        for item in filter_entities(self._graph, self._src_kind, self._plan(), self._filter_funcs, on_item=on_item):
             yield item
         self._finalize()
 
-    def _clone_initial(self):
+    def _buffered_ids(self):
         self._initial_id_iterator, id_iterator = tee(self._initial_id_iterator)
-        return EntityIterator(self._graph, self._src_kind, self._filters, id_iterator, self._parent)
+        return id_iterator
+
+    def _clone_initial(self):
+        return EntityIterator(self._graph, self._src_kind, self._filters, self._plan, self._parent, count_plan=self._count_plan, limit_plan=self._limit_plan, projection=self._projection)
 
     def _jump(self, _kind, _traversal, _random, *args, **filters):
         jumping_iterator = _random_iterator if _random else _jump_iterator
@@ -333,19 +458,26 @@ class EntityIterator(object):
         # (potentially) recursive jumping
         #_jump_iterator(graph, kind, entity_id_iterator, traversal, neighbors_cache, filters)
         for _ in range(count):
+            count_plan = None
+            if count == 1 and not filters and not _random:
+                # Counting neighbours only needs the degree of every parent entity
+                count_plan = partial(_degree_sum_plan, self._graph, parent_kind, current_iterator, _traversal)
             current_iterator = EntityIterator(
                 self._graph,
                 current_kind,
                 filters,
-                jumping_iterator(
+                partial(
+                    _jump_plan,
+                    jumping_iterator,
                     self._graph,
                     parent_kind,
-                    current_iterator._iterate(),
+                    current_iterator,
                     _traversal,
                     self._neighbors_cache,
                     **filters
                 ),
-                parent=current_parent
+                parent=current_parent,
+                count_plan=count_plan
             )
             parent_kind = current_kind
             current_kind = KIND_VERTEX
@@ -404,7 +536,7 @@ class EntityIterator(object):
                 self._graph,
                 KIND_VERTEX,
                 {},
-                neighbor_iterator(self._graph, self._iterate(), filters, self._neighbors_cache, filter_funcs),
+                lambda: neighbor_iterator(self._graph, self._iterate(), filters, self._neighbors_cache, filter_funcs),
                 parent=self,
                 neighbors_cache=self._neighbors_cache
             )
@@ -413,7 +545,7 @@ class EntityIterator(object):
             self._graph,
             KIND_VERTEX,
             {},
-            neighbor_iterator(self._graph, entity_iterator._iterate(), filters, self._neighbors_cache, filter_funcs),
+            lambda: neighbor_iterator(self._graph, entity_iterator._iterate(), filters, self._neighbors_cache, filter_funcs),
             parent=entity_iterator,
             neighbors_cache=self._neighbors_cache
         )
@@ -483,7 +615,7 @@ class EntityIterator(object):
                     continue
                 known.add(entity_id)
                 yield entity_id
-        return EntityIterator(self._graph, self._src_kind, {}, dedup_iterator(self, aliases), parent=self)
+        return EntityIterator(self._graph, self._src_kind, {}, partial(dedup_iterator, self, aliases), parent=self)
 
     def without(self, *aliases):
         def without_iterator(entity_iterator, aliases):
@@ -497,12 +629,51 @@ class EntityIterator(object):
                         break
                 if not member:
                     yield entity_id
-        return EntityIterator(self._graph, self._src_kind, {}, without_iterator(self, aliases), parent=self)
+        return EntityIterator(self._graph, self._src_kind, {}, partial(without_iterator, self, aliases), parent=self)
 
     def idata(self, *args, **kwargs):
         for item in self:
             yield item.data(*args, **kwargs)
 
+    def _iterate_data(self, only=None, exclude=None):
+        # yields (entity id, data) pairs, data being read by windows (and restricted to <only> fields, without <exclude> fields)
+        graph = self._graph
+        for entity_ids in entity_id_windows(self._iterate()):
+            datas = graph._bulk_get_data(None, self._src_kind, entity_ids)
+            for entity_id, data in zip(entity_ids, datas):
+                if data == UNDEFINED:  # pragma : no cover
+                    continue
+                if only is not None:
+                    data = dict((field, value) for field, value in data.items() if field in only)
+                if exclude:
+                    data = dict((field, value) for field, value in data.items() if field not in exclude)
+                yield int(entity_id), data
+
+    def ivalues(self, *fields):
+        for _, data in self._iterate_data(only=fields):
+            yield [data.get(field, None) for field in fields]
+
+    @in_read_snapshot
+    def values(self, *fields):
+        return list(self.ivalues(*fields))
+
+    def project(self, only=None, exclude=None):
+        """
+        Same entities, but only <only> fields (or all fields but <exclude> ones) are sent by the server
+        (entities data is still fully available, missing fields are fetched when accessed)
+        """
+        return EntityIterator(
+            self._graph,
+            self._src_kind,
+            {},
+            self._iterate,
+            parent=self,
+            count_plan=self._count_plan,
+            limit_plan=self._limit_plan,
+            projection=(only, exclude)
+        )
+
+    @in_read_snapshot
     def data(self, *args, **kwargs):
         return list(self.idata(*args, **kwargs))
 
@@ -515,7 +686,9 @@ class EntityIterator(object):
                 else:
                     break  # This line is REALLY important (it stops outer iteration)
                 counter += 1
-        return EntityIterator(self._graph, self._src_kind, {}, limit_iterator(self._iterate(), count), parent=self)
+        if self._limit_plan is not None:
+            return EntityIterator(self._graph, self._src_kind, {}, partial(self._limit_plan, count), parent=self, projection=self._projection)
+        return EntityIterator(self._graph, self._src_kind, {}, lambda: limit_iterator(self._iterate(), count), parent=self, projection=self._projection)
 
     def aka(self, alias):
         def alias_iterator(entity_id_iterator, alias):
@@ -523,35 +696,55 @@ class EntityIterator(object):
             for entity_id in entity_id_iterator:
                 self._context[alias] = graph._item_from_id(self._src_kind, entity_id)
                 yield entity_id
-        return EntityIterator(self._graph, self._src_kind, {}, alias_iterator(self._iterate(), alias), parent=self)
+        return EntityIterator(self._graph, self._src_kind, {}, lambda: alias_iterator(self._iterate(), alias), parent=self)
 
     # Following methods don't return iterator :
 
+    @in_read_snapshot
     def count(self):
+        if self._count_plan is not None:
+            count = self._count_plan()
+            if count is not None:
+                return count
         return sum(1 for _ in self._iterate())  # space efficient counter
 
     def remove(self):
-        remove_func = self._graph._remove_node if self._src_kind == KIND_VERTEX else self._graph._remove_edge
-        for entity_id in self._iterate():
-            remove_func(entity_id)
+        # Ids are collected first, then every entity is removed in a single transaction
+        bulk_remove_func = self._graph._bulk_remove_node if self._src_kind == KIND_VERTEX else self._graph._bulk_remove_edge
+        bulk_remove_func(list(self._iterate()))
 
+    @retried_when_full
     def update(self, **updates):
-        # Do the update (not done while iterating because *every* entity must be updated before starting to yield)
-        txn = self._graph._transaction_begin()
+        # Ids are collected first (indexes used to find entities may be modified by the update)
+        # then every entity is updated in a single transaction
+        txn = self._graph._txn_begin()
         try:
-            for entity_id in self._iterate(on_item=False):
-                self._graph._bulk_update_data(txn, self._src_kind, entity_id, **updates)
-            self._graph._transaction_commit(txn)
+            entity_ids = unique_ids(self._iterate(on_item=False))
+            self._graph._update_entities(txn, self._src_kind, entity_ids, **updates)
+            self._graph._txn_commit(txn)
         except Exception as e:
-            self._graph._transaction_rollback(txn)
+            self._graph._txn_rollback(txn)
             raise GrapheekDataException(repr(e))
 
+    @in_read_snapshot
     def all(self):
         return list(self)
 
+    def iids(self):
+        return self._iterate(on_item=False)
+
+    @in_read_snapshot
     def ids(self):
-        return list(self._iterate(on_item=False))
+        return list(self.iids())
 
+    def materialize(self):
+        """
+        Runs the plan once and keeps resulting ids in memory : further iterations won't re-run the plan
+        """
+        ids = self.ids()
+        return EntityIterator(self._graph, self._src_kind, {}, lambda: iter(ids), parent=self)
+
+    @in_read_snapshot
     def collect(self, *aliases):
         result = []
         for entity in self:  # Iterating updates the context ...
@@ -566,20 +759,36 @@ class EntityIterator(object):
 
     def order_by(self, *clauses):
 
-        def order_iterator(entity_id_iterator, cmp_func):
-            lst = []
-            for item in self:
-                dic = item.data().copy()
-                dic['_id'] = item.get_id()
-                lst.append(dic)
-            if PYTHON3:
-                lst.sort(key=cmp_to_key(cmp_func))
-            else:
-                lst.sort(cmp_func)
-            for dic in lst:
-                yield dic['_id']
-        cmp_func = build_order_func(*clauses)
-        return EntityIterator(self._graph, self._src_kind, {}, order_iterator(order_iterator, cmp_func), parent=self)
+        def order_pairs(entity_iterator, order_key):
+            # (order key, entity id) pairs : only ordered fields of entity data are kept
+            graph = self._graph
+            for entity_ids in entity_id_windows(entity_iterator._iterate()):
+                datas = graph._bulk_get_data(None, self._src_kind, entity_ids)
+                for entity_id, data in zip(entity_ids, datas):
+                    if data != UNDEFINED:
+                        yield order_key(data), entity_id
+
+        def order_iterator(entity_iterator, order_key):
+            lst = list(order_pairs(entity_iterator, order_key))
+            lst.sort(key=itemgetter(0))
+            for _, entity_id in lst:
+                yield entity_id
+
+        def top_iterator(entity_iterator, order_key, count):
+            # bounded heap : at most <count> pairs are kept in memory
+            for _, entity_id in heapq.nsmallest(count, order_pairs(entity_iterator, order_key), key=itemgetter(0)):
+                yield entity_id
+
+        order_key = build_order_key(*clauses)
+        return EntityIterator(
+            self._graph,
+            self._src_kind,
+            {},
+            lambda: order_iterator(self, order_key),
+            parent=self,
+            count_plan=self._count_plan,
+            limit_plan=lambda count: top_iterator(self, order_key, count)
+        )
 
     def _context_iterator(self):
         for entity_id in self._iterate():  # Iterating updates the context ...
@@ -642,19 +851,26 @@ class Entity(object):
         count = 1
         if count_args == 1:
             count = args[0]
-        current_iterator = self._neighbors(_traversal, _random, **filters)
+        current_iterator = None
         parent_kind = self._kind
         current_kind = _tgt_kind
         current_parent = None
         # (potentially) recursive jumping
         for i in range(count):
-            IT = current_iterator if i == 0 else jumping_iterator(self._graph, parent_kind, current_iterator._iterate(), _traversal, {}, **filters)
+            count_plan = None
+            if i == 0:
+                IT = partial(self._neighbors, _traversal, _random, **filters)
+                if count == 1 and not filters and not _random:
+                    count_plan = partial(self._graph._degree, self._kind, self._entity_id, _traversal)
+            else:
+                IT = partial(_jump_plan, jumping_iterator, self._graph, parent_kind, current_iterator, _traversal, {}, **filters)
             current_iterator = EntityIterator(
                 self._graph,
                 current_kind,
                 filters,
                 IT,
-                parent=current_parent
+                parent=current_parent,
+                count_plan=count_plan
             )
             parent_kind = current_kind
             current_kind = KIND_VERTEX
@@ -699,7 +915,7 @@ class Entity(object):
     def aka(self, alias):
         def self_iterator(entity_id):
             yield entity_id
-        return EntityIterator(self._graph, self._kind, {}, self_iterator(self.get_id()), context={alias: self})
+        return EntityIterator(self._graph, self._kind, {}, partial(self_iterator, self.get_id()), context={alias: self})
 
 
 class Node(Entity):
@@ -732,10 +948,31 @@ class Node(Entity):
 
     def _remove_denorm_data(self):
         operation = Removal()
-        self.__change_denorm_data(operation.remove, operation.remove)
+        self.__change_denorm_data(operation.remove_lst, operation.remove)
+        return operation
+
+    def __change_vertex_centric_data(self, lst_method, edge_id, traversal, vertex_centric_items):
+        root_key = KIND_VERTEX + '/' + str(self._entity_id) + '/'
+        for field, value in vertex_centric_items:
+            lst_method(build_key(root_key + traversal, VERTEX_CENTRIC_SUFFIX, field, value), edge_id)
+            lst_method(build_key(root_key + BOTH_EDGES_SUFFIX, VERTEX_CENTRIC_SUFFIX, field, value), edge_id)
+
+    def _add_vertex_centric_data(self, edge, traversal, vertex_centric_items):
+        operation = Addition()
+        self.__change_vertex_centric_data(operation.append_to_lst, edge.get_id(), traversal, vertex_centric_items)
+        return operation
+
+    def _remove_vertex_centric_data(self, edge, traversal, vertex_centric_items, operation=None):
+        operation = Removal() if operation is None else operation
+
+        def remove_from_lst(key, edge_id):
+            # (a vertex centric list is dropped once empty)
+            operation.remove_from_lst(key, edge_id)
+            operation.drop_lst_if_empty(key)
+        self.__change_vertex_centric_data(remove_from_lst, edge.get_id(), traversal, vertex_centric_items)
         return operation
 
-    def _add_denorm_src_data(self, target, edge):
+    def _add_denorm_src_data(self, target, edge, vertex_centric_items=()):
         source_id = self._entity_id
         target_id = target.get_id()
         edge_id = edge.get_id()
@@ -759,10 +996,12 @@ class Node(Entity):
         operation.set(root_key + BOTH_EDGES_SUFFIX + '/' + s_edge_id, 1)
         operation.set(root_key + OUT_VERTICES_SUFFIX + '/' + s_target_id, 1)
         operation.set(root_key + BOTH_VERTICES_SUFFIX + '/' + s_target_id, 1)
+        # vertex centric lists
+        operation.merge(self._add_vertex_centric_data(edge, OUT_EDGES_SUFFIX, vertex_centric_items))
         # ---
         return operation
 
-    def _remove_denorm_src_data(self, target, edge):
+    def _remove_denorm_src_data(self, target, edge, vertex_centric_items=(), operation=None):
         source_id = self._entity_id
         target_id = target.get_id()
         edge_id = edge.get_id()
@@ -770,7 +1009,7 @@ class Node(Entity):
         s_edge_id = str(edge_id)
         s_target_id = str(target_id)
         # building operation :
-        operation = Removal()
+        operation = Removal() if operation is None else operation
         # lists
         operation.remove_from_lst(root_key + OUT_EDGES_SUFFIX, edge_id)
         operation.remove_from_lst(root_key + BOTH_EDGES_SUFFIX, edge_id)
@@ -786,10 +1025,12 @@ class Node(Entity):
         operation.remove(root_key + BOTH_EDGES_SUFFIX + '/' + s_edge_id)
         operation.remove(root_key + OUT_VERTICES_SUFFIX + '/' + s_target_id)
         operation.remove(root_key + BOTH_VERTICES_SUFFIX + '/' + s_target_id)
+        # vertex centric lists
+        self._remove_vertex_centric_data(edge, OUT_EDGES_SUFFIX, vertex_centric_items, operation)
         # ---
         return operation
 
-    def _add_denorm_tgt_data(self, source, edge):
+    def _add_denorm_tgt_data(self, source, edge, vertex_centric_items=()):
         target_id = self._entity_id
         source_id = source.get_id()
         edge_id = edge.get_id()
@@ -813,10 +1054,12 @@ class Node(Entity):
         operation.set(root_key + BOTH_EDGES_SUFFIX + '/' + s_edge_id, 1)
         operation.set(root_key + IN_VERTICES_SUFFIX + '/' + s_source_id, 1)
         operation.set(root_key + BOTH_VERTICES_SUFFIX + '/' + s_source_id, 1)
+        # vertex centric lists
+        operation.merge(self._add_vertex_centric_data(edge, IN_EDGES_SUFFIX, vertex_centric_items))
         # ---
         return operation
 
-    def _remove_denorm_tgt_data(self, source, edge):
+    def _remove_denorm_tgt_data(self, source, edge, vertex_centric_items=(), operation=None):
         target_id = self._entity_id
         source_id = source.get_id()
         edge_id = edge.get_id()
@@ -824,7 +1067,7 @@ class Node(Entity):
         s_edge_id = str(edge_id)
         s_source_id = str(source_id)
         # building operation :
-        operation = Removal()
+        operation = Removal() if operation is None else operation
         # lists
         operation.remove_from_lst(root_key + IN_EDGES_SUFFIX, edge_id)
         operation.remove_from_lst(root_key + BOTH_EDGES_SUFFIX, edge_id)
@@ -840,25 +1083,27 @@ class Node(Entity):
         operation.remove(root_key + BOTH_EDGES_SUFFIX + '/' + s_edge_id)
         operation.remove(root_key + IN_VERTICES_SUFFIX + '/' + s_source_id)
         operation.remove(root_key + BOTH_VERTICES_SUFFIX + '/' + s_source_id)
+        # vertex centric lists
+        self._remove_vertex_centric_data(edge, IN_EDGES_SUFFIX, vertex_centric_items, operation)
         # ---
         return operation
 
     def in_(self, *args, **filters):
         def self_iterator(entity_id):
             yield entity_id
-        entity_iterator = EntityIterator(self._graph, KIND_VERTEX, {}, self_iterator(self.get_id()), context={})
+        entity_iterator = EntityIterator(self._graph, KIND_VERTEX, {}, partial(self_iterator, self.get_id()), context={})
         return entity_iterator.in_(*args, **filters)
 
     def out_(self, *args, **filters):
         def self_iterator(entity_id):
             yield entity_id
-        entity_iterator = EntityIterator(self._graph, KIND_VERTEX, {}, self_iterator(self.get_id()), context={})
+        entity_iterator = EntityIterator(self._graph, KIND_VERTEX, {}, partial(self_iterator, self.get_id()), context={})
         return entity_iterator.out_(*args, **filters)
 
     def both_(self, *args, **filters):
         def self_iterator(entity_id):
             yield entity_id
-        entity_iterator = EntityIterator(self._graph, KIND_VERTEX, {}, self_iterator(self.get_id()), context={})
+        entity_iterator = EntityIterator(self._graph, KIND_VERTEX, {}, partial(self_iterator, self.get_id()), context={})
         return entity_iterator.both_(*args, **filters)
 
     def inE(self, **filters):
@@ -895,10 +1140,10 @@ class Edge(Entity):
         self._kind = KIND_EDGE
 
     def _src_id(self):
-        return self._graph._get_lst(None, build_key(KIND_EDGE, self._entity_id, IN_VERTICES_SUFFIX))[0]
+        return self._graph._cached_get_lst(None, build_key(KIND_EDGE, self._entity_id, IN_VERTICES_SUFFIX))[0]
 
     def _tgt_id(self):
-        return self._graph._get_lst(None, build_key(KIND_EDGE, self._entity_id, OUT_VERTICES_SUFFIX))[0]
+        return self._graph._cached_get_lst(None, build_key(KIND_EDGE, self._entity_id, OUT_VERTICES_SUFFIX))[0]
 
     def _add_denorm_data(self, source, target):
         edge_id = self._entity_id
@@ -922,7 +1167,7 @@ class Edge(Entity):
         # ---
         return operation
 
-    def _remove_denorm_data(self, source, target):
+    def _remove_denorm_data(self, source, target, operation=None):
         edge_id = self._entity_id
         source_id = source.get_id()
         target_id = target.get_id()
@@ -930,12 +1175,11 @@ class Edge(Entity):
         s_source_id = str(source_id)
         s_target_id = str(target_id)
         # building operation
-        operation = Removal()
+        operation = Removal() if operation is None else operation
         # traversal denormalized lists
-        operation.remove(root_key + IN_VERTICES_SUFFIX)
-        operation.remove(root_key + OUT_VERTICES_SUFFIX)
-        operation.remove(root_key + BOTH_VERTICES_SUFFIX)
-        operation.remove(root_key + BOTH_VERTICES_SUFFIX)
+        operation.remove_lst(root_key + IN_VERTICES_SUFFIX)
+        operation.remove_lst(root_key + OUT_VERTICES_SUFFIX)
+        operation.remove_lst(root_key + BOTH_VERTICES_SUFFIX)
         # remove key/value for links between source, target and current edge (aimed to be used with indexes)
         operation.remove(root_key + IN_VERTICES_SUFFIX + '/' + s_source_id)
         operation.remove(root_key + OUT_VERTICES_SUFFIX + '/' + s_target_id)
@@ -950,6 +1194,20 @@ class Edge(Entity):
 
 class BaseGraph(GraphReadWrite, GraphNx):
 
+    # Read-through cache for entity data and adjacency lists (disabled by default, see enable_cache)
+    _cache = None
+    # Number of committed writes (tells if a read snapshot may use the cache)
+    _write_epoch = 0
+
+    # True when read-only requests can safely run concurrently (in server worker threads)
+    _concurrent_reads = False
+
+    # True when a rolled back transaction leaves no change (writes of a failed group commit can then be run again)
+    _transactional = False
+
+    # Transaction shared by writes during a group commit (see _group_commit)
+    _group_txn = None
+
     def close(self):
         if not self._closed:
             self._db_close()
@@ -957,7 +1215,7 @@ class BaseGraph(GraphReadWrite, GraphNx):
 
     def __initialize__(self):
         # "Rebuilding" indexes :
-        txn = self._transaction_begin()
+        txn = self._txn_begin()
         try:
             # Get vertex and edge count (useful for queries where we need to compare index perf and seq scan) :
             self._node_count = self._get(txn, METADATA_VERTEX_COUNTER) - self._get(txn, METADATA_VERTEX_REMOVED_COUNTER)
@@ -968,22 +1226,27 @@ class BaseGraph(GraphReadWrite, GraphNx):
             #   1st vertex indexes :
             index_count = self._get(txn, METADATA_VERTEX_INDEX_COUNTER)
             for index_id in range(0, index_count):
-                fields, filter_tuples = self._get(txn, build_key(METADATA_VERTEX_INDEX_FIELDS_PREFIX, index_id))
-                filters = dict(filter_tuples)
-                if fields != UNDEFINED:
+                signature = self._get(txn, build_key(METADATA_VERTEX_INDEX_FIELDS_PREFIX, index_id))
+                if signature != UNDEFINED:
+                    fields, filters = signature[0], dict(signature[1])
+                    index_type = signature[2] if len(signature) > 2 else EXACT_INDEX
                     prefix = build_key(KIND_INDEX, KIND_VERTEX, index_id)
-                    self._node_indexes.append(ExactIndex(self, KIND_VERTEX, prefix, *fields, **filters))
+                    self._node_indexes.append(INDEX_CLASSES[index_type](self, KIND_VERTEX, prefix, *fields, **filters))
             #   2nd edge indexes (~ same code, but I'm not sure it makes sense to factor...)
             index_count = self._get(txn, METADATA_EDGE_INDEX_COUNTER)
             for index_id in range(0, index_count):
-                fields, filter_tuples = self._get(txn, build_key(METADATA_EDGE_INDEX_FIELDS_PREFIX, index_id))
-                filters = dict(filter_tuples)
-                if fields != UNDEFINED:
+                signature = self._get(txn, build_key(METADATA_EDGE_INDEX_FIELDS_PREFIX, index_id))
+                if signature != UNDEFINED:
+                    fields, filters = signature[0], dict(signature[1])
+                    index_type = signature[2] if len(signature) > 2 else EXACT_INDEX
                     prefix = build_key(KIND_INDEX, KIND_EDGE, index_id)
-                    self._edge_indexes.append(ExactIndex(self, KIND_EDGE, prefix, *fields, **filters))
-            self._transaction_commit(txn)
+                    self._edge_indexes.append(INDEX_CLASSES[index_type](self, KIND_EDGE, prefix, *fields, **filters))
+            # Edge fields having a vertex centric index (key may be missing in databases created by older versions) :
+            vertex_centric_fields = self._get(txn, METADATA_EDGE_VERTEX_CENTRIC_LIST)
+            self._vertex_centric_fields = [] if vertex_centric_fields == UNDEFINED else list(vertex_centric_fields)
+            self._txn_commit(txn)
         except Exception as e:  # pragma : no cover
-            self._transaction_rollback(txn)
+            self._txn_rollback(txn)
             raise GrapheekDataException(repr(e))
         # Instantiate an optimizer (which will choose between scan and sequential scan AND (in the future) cache best index for most runned queries)
         self._optimizer = Optimizer(self)
@@ -996,18 +1259,80 @@ class BaseGraph(GraphReadWrite, GraphNx):
         self._set(txn, METADATA_EDGE_COUNTER, 0)
         self._set(txn, METADATA_EDGE_REMOVED_COUNTER, 0)
         self._set(txn, METADATA_EDGE_INDEX_COUNTER, 0)
+        self._set(txn, METADATA_EDGE_VERTEX_CENTRIC_LIST, [])
 
     def _ensure_prepared(self):
         if not(self._has_key(PREPARED)):
-            txn = self._transaction_begin()
+            txn = self._txn_begin()
             try:
                 self._prepare_database(txn)
-                self._transaction_commit(txn)
+                self._txn_commit(txn)
             except Exception as e:
-                self._transaction_rollback(txn)
+                self._txn_rollback(txn)
                 raise GrapheekDataPreparationFailedException(repr(e))
         self.__initialize__()
 
+    # Transactions used by write methods (inside a group commit, they all share the group transaction) :
+
+    def _txn_begin(self):
+        if self._group_txn is not None:
+            return self._group_txn
+        return self._transaction_begin()
+
+    def _txn_commit(self, txn):
+        if self._group_txn is None:
+            try:
+                self._transaction_commit(txn)
+            finally:
+                self._invalidate_uncommitted()
+            self._write_epoch += 1
+
+    def _txn_rollback(self, txn):
+        if self._group_txn is None:
+            self._transaction_rollback(txn)
+            self._invalidate_uncommitted()
+
+    def _group_commit(self, funcs):
+        """
+        Runs write functions in a single transaction (so, with a single commit)
+        Returns a (result, exception) pair for each function
+
+        If a function fails, the whole transaction is rolled back and functions are run again, each one in its own transaction
+        (backends without real transactions always run them one by one)
+        """
+        if not self._transactional or len(funcs) < 2:
+            return [_call_write(func) for func in funcs]
+        txn = self._group_txn = self._transaction_begin()
+        try:
+            results = [func() for func in funcs]
+        except Exception:
+            self._group_txn = None
+            self._transaction_rollback(txn)
+            self._invalidate_uncommitted()
+            self._reload_after_rollback()
+            return [_call_write(func) for func in funcs]
+        self._group_txn = None
+        try:
+            self._transaction_commit(txn)
+        except Exception as e:  # pragma : no cover
+            self._invalidate_uncommitted()
+            self._reload_after_rollback()
+            return [(None, e) for _ in funcs]
+        self._invalidate_uncommitted()
+        self._write_epoch += 1
+        return [(result, None) for result in results]
+
+    def _grow_storage(self):
+        # Called after a failed write (once its transaction is rolled back) :
+        # returns True if it failed because the storage was full and the storage has been grown (so the write can be run again)
+        return False
+
+    def _reload_after_rollback(self):
+        # In memory state (counters, indexes, cache) may hold changes that have been rolled back
+        if self._cache is not None:
+            self._cache.clear()
+        self.__initialize__()
+
     # Following methods MUST be overriden by child classes :
 
     def _db_close(self):
@@ -1050,48 +1375,161 @@ class BaseGraph(GraphReadWrite, GraphNx):
     # BUT overriding them in child classes is a path to performance :)
     # See for instance, kyotocab.KyotoCabinetGraph _init_lst, _get_lst & _append_to_lst overriding
 
+    # Lists are stored as a plain list as long as they contain at most <CHUNK_SIZE> values
+    # Bigger lists (typically adjacency lists of "supernodes") are stored by chunks :
+    #   <key>         : a header {'n': next chunk number, 'c': [[chunk number, length, min value, max value], ...]}
+    #   <key>/lc/<n>  : chunk values (at most <CHUNK_SIZE> values)
+    # so that appending only rewrites the last chunk and removing a value only rewrites the chunk that contains it
+
+    # Every value stored at a list key (plain list, chunked list header or chunk) is read and written
+    # through _load_lst, _bulk_load_lst and _store_lst : persistent backends override them to use the
+    # binary codec (see listcodec module) instead of their generic serialization
+
+    def _load_lst(self, txn, key):
+        return self._get(txn, key)
+
+    def _bulk_load_lst(self, txn, keys):
+        return self._bulk_get(txn, keys)
+
+    def _store_lst(self, txn, key, value):
+        self._set(txn, key, value)
+
     def _init_lst(self, txn, key):
         # Create an empty list
-        self._set(txn, key, [])
+        self._store_lst(txn, key, [])
+
+    def _get_lst_chunks(self, txn, keys):
+        # Returns values of the chunks stored at keys (in keys order)
+        chunks = self._bulk_load_lst(txn, keys)
+        return [chunks.get(key, []) for key in keys]
+
+    def _set_lst_chunk(self, txn, key, values):
+        self._store_lst(txn, key, values)
+
+    def _lst_chunk_keys(self, key, header):
+        return [build_key(key, LIST_CHUNK_SUFFIX, chunk[0]) for chunk in header['c']]
+
+    def _unchunk_lst(self, txn, key, value):
+        if isinstance(value, dict):
+            lst = []
+            for chunk in self._get_lst_chunks(txn, self._lst_chunk_keys(key, value)):
+                lst.extend(chunk)
+            return lst
+        return value
 
     def _get_lst(self, txn, key):
-        res = self._get(txn, key)  # if _get returns UNDEFINED, that's also ok, I return it...
-        return res
+        res = self._load_lst(txn, key)  # if _load_lst returns UNDEFINED, that's also ok, I return it...
+        if res == UNDEFINED:
+            return res
+        return self._unchunk_lst(txn, key, res)
 
     def _set_lst(self, txn, key, values):
-        self._set(txn, key, values)
+        old = self._load_lst(txn, key)
+        if isinstance(old, dict):
+            self._bulk_remove(txn, self._lst_chunk_keys(key, old))
+        self._extend_lst(txn, key, [], list(values))
 
     def _bulk_get_lst(self, txn, keys):
-        return [self._get(txn, key) for key in keys]
+        values = self._bulk_load_lst(txn, keys)
+        return [self._unchunk_lst(txn, key, values[key]) if key in values else UNDEFINED for key in keys]
 
     def _append_to_lst(self, txn, key, value):
-        lst = self._get(txn, key)
-        if lst == UNDEFINED:
-            lst = []
-        self._set(txn, key, lst + [value])
+        self._bulk_append_to_lst(txn, key, [value])
 
     def _bulk_append_to_lst(self, txn, key, values):
-        lst = self._get(txn, key)
+        lst = self._load_lst(txn, key)
         if lst == UNDEFINED:
             lst = []
-        self._set(txn, key, lst + values)
+        self._extend_lst(txn, key, lst, values)
+
+    def _extend_lst(self, txn, key, lst, values):
+        # lst is the current list (or list header) stored at key
+        if not isinstance(lst, dict):
+            if len(lst) + len(values) <= CHUNK_SIZE:
+                self._store_lst(txn, key, lst + values)
+                return
+            # list becomes too big, chunking it :
+            header = {'n': 0, 'c': []}
+            values = lst + values
+        else:
+            header = lst
+            # 1st, filling last chunk :
+            if header['c'] and header['c'][-1][1] < CHUNK_SIZE:
+                last = header['c'][-1]
+                chunk_key = build_key(key, LIST_CHUNK_SUFFIX, last[0])
+                chunk = self._get_lst_chunks(txn, [chunk_key])[0] + values[:CHUNK_SIZE - last[1]]
+                values = values[CHUNK_SIZE - last[1]:]
+                self._set_lst_chunk(txn, chunk_key, chunk)
+                header['c'][-1] = [last[0], len(chunk), min(chunk), max(chunk)]
+        # then creating new chunks :
+        for idx in range(0, len(values), CHUNK_SIZE):
+            chunk = values[idx:idx + CHUNK_SIZE]
+            self._set_lst_chunk(txn, build_key(key, LIST_CHUNK_SUFFIX, header['n']), chunk)
+            header['c'].append([header['n'], len(chunk), min(chunk), max(chunk)])
+            header['n'] += 1
+        self._store_lst(txn, key, header)
 
     def _remove_from_lst(self, txn, key, value):
-        old = self._get(txn, key)
-        # Caution : we are only removing ONE occurence
+        self._bulk_remove_from_lst(txn, key, [value])
+
+    def _bulk_remove_from_lst(self, txn, key, values):
+        # Caution : we are only removing ONE occurence of each value (a value given twice is removed twice)
         # This is voluntary
         # For instance, it lst contains neighbour node, we need to remove only one occurence
         # cause current entity and neighbour node can be linked multiple time
-        new = old[:]
-        new.remove(value)
-        self._set(txn, key, new)
+        # (removed values are counted, so that each list or chunk is filtered in a single pass)
+        old = self._load_lst(txn, key)
+        if not isinstance(old, dict):
+            self._store_lst(txn, key, remove_each(old, values))
+            return
+        pending = Counter(values)
+        header = old
+        # Only loading chunks that may contain values (thanks to chunk min and max values) :
+        sorted_values = sorted(pending)
+        candidates = [chunk_info for chunk_info in header['c'] if bisect_left(sorted_values, chunk_info[2]) < bisect_right(sorted_values, chunk_info[3])]
+        chunk_keys = [build_key(key, LIST_CHUNK_SUFFIX, chunk_info[0]) for chunk_info in candidates]
+        chunks = {}
+        for chunk_info, chunk_key, chunk in zip(candidates, chunk_keys, self._get_lst_chunks(txn, chunk_keys)):
+            if not pending:
+                break
+            new_chunk = remove_counted(chunk, pending)
+            if len(new_chunk) < len(chunk):
+                chunks[chunk_info[0]] = new_chunk
+        if pending:
+            raise ValueError("list.remove(x): x not in list")
+        # Saving modified chunks and header :
+        remaining = []
+        for chunk_info in header['c']:
+            chunk_no = chunk_info[0]
+            if chunk_no not in chunks:
+                remaining.append(chunk_info)
+                continue
+            chunk = chunks[chunk_no]
+            chunk_key = build_key(key, LIST_CHUNK_SUFFIX, chunk_no)
+            if chunk:
+                self._set_lst_chunk(txn, chunk_key, chunk)
+                remaining.append([chunk_no, len(chunk), min(chunk), max(chunk)])
+            else:
+                self._remove(txn, chunk_key)
+        header['c'] = remaining
+        if sum(chunk_info[1] for chunk_info in remaining) <= CHUNK_SIZE // 2:
+            # list is small again, no need to keep it chunked :
+            lst = self._unchunk_lst(txn, key, header)
+            self._bulk_remove(txn, self._lst_chunk_keys(key, header))
+            self._store_lst(txn, key, lst)
+        else:
+            self._store_lst(txn, key, header)
 
-    def _bulk_remove_from_lst(self, txn, key, values):
-        old = self._get(txn, key)
-        new = old[:]
-        for value in values:
-            new.remove(value)
-        self._set(txn, key, new)
+    def _remove_lst(self, txn, key):
+        self._bulk_remove_lst(txn, [key])
+
+    def _bulk_remove_lst(self, txn, keys):
+        keys = list(keys)
+        chunk_keys = []
+        for key, value in self._bulk_load_lst(txn, keys).items():
+            if isinstance(value, dict):
+                chunk_keys.extend(self._lst_chunk_keys(key, value))
+        self._bulk_remove(txn, keys + chunk_keys)
 
     def _update_inc(self, txn, key, value=1):
         oldval_ = self._get(txn, key)
@@ -1113,7 +1551,7 @@ class BaseGraph(GraphReadWrite, GraphNx):
 
     def _get_data(self, txn, kind, entity_id, *args, **kwargs):
         key = build_key(kind, entity_id, DATA_SUFFIX)
-        result = self._get(txn, key)  # if _get returns UNDEFINED, that's also ok, I return it...
+        result = self._cached_get(txn, key)  # if _get returns UNDEFINED, that's also ok, I return it...
         if args:
             tmpres = dict((k, v) for k, v in result.items() if k in args)
             result = tmpres
@@ -1124,29 +1562,80 @@ class BaseGraph(GraphReadWrite, GraphNx):
                     result = tmpres
         return result
 
+    def _bulk_get_data(self, txn, kind, entity_ids):
+        # Returns entities data in entity_ids order (UNDEFINED for missing entities) with a single _bulk_get call
+        keys = [build_key(kind, entity_id, DATA_SUFFIX) for entity_id in entity_ids]
+        cache = self._cache
+        if not self._cache_usable(txn):
+            datas = self._bulk_get(txn, keys)
+            return [datas.get(key, UNDEFINED) for key in keys]
+        results = [cache.get(key) for key in keys]
+        missing_keys = [key for key, result in zip(keys, results) if result == UNDEFINED]
+        if missing_keys:
+            generation = cache.generation
+            datas = self._bulk_get(txn, missing_keys)
+            for key, data in datas.items():
+                cache.set(key, data, generation)
+            results = [datas.get(key, UNDEFINED) if result == UNDEFINED else result for key, result in zip(keys, results)]
+        return [copy_value(result) for result in results]
+
+    @retried_when_full
     def _bulk_update_data(self, _txn, _kind, _entity_id, **updates):
         check_valid_data(updates)
         release_txn = False
         if _txn is None:
-            _txn = self._transaction_begin()
+            _txn = self._txn_begin()
             release_txn = True
         try:
-            data = self._get_data(_txn, _kind, _entity_id)
-            # Remove entity from indexes before updating data (we'll re-add it just after with new values)
-            self._remove_from_all_entity_indexes(_txn, _kind, _entity_id)
-            # Do the update :
-            data.update(**updates)
-            key = build_key(_kind, _entity_id, DATA_SUFFIX)
-            self._set(_txn, key, data)
-            # Readding entity to indexes :
-            self._add_to_all_entity_indexes(_txn, _kind, _entity_id, data)
+            self._update_entities(_txn, _kind, [_entity_id], **updates)
             if release_txn:
-                self._transaction_commit(_txn)
+                self._txn_commit(_txn)
         except Exception as e:
             if release_txn:
-                self._transaction_rollback(_txn)
+                self._txn_rollback(_txn)
             raise GrapheekDataException(repr(e))
 
+    def _update_entities(self, txn, kind, entity_ids, **updates):
+        # Updates entities by windows of <CHUNK_SIZE> ids
+        # Only indexes depending on updated fields are maintained : entities of a window are removed from them
+        # before updating data and re-added just after (so that each index chunk is rewritten once per window)
+        check_valid_data(updates)
+        indexes = [index for index in self._get_indexes(kind) if index.depends_on(updates)]
+        update_vertex_centric = kind == KIND_EDGE and any(field in updates for field in self._vertex_centric_fields)
+        for window in entity_id_windows(iter(entity_ids), CHUNK_SIZE):
+            datas = self._bulk_get_data(txn, kind, window)
+            for index in indexes:
+                index.bulk_remove(txn, window)
+            new_datas = {}
+            for entity_id, data in zip(window, datas):
+                new_data = dict(data)
+                new_data.update(updates)
+                new_datas[build_key(kind, entity_id, DATA_SUFFIX)] = new_data
+                if update_vertex_centric:
+                    old_vc_items = vertex_centric_items(self._vertex_centric_fields, data)
+                    new_vc_items = vertex_centric_items(self._vertex_centric_fields, new_data)
+                    self._update_vertex_centric_data(txn, entity_id, old_vc_items, new_vc_items)
+            self._bulk_set(txn, new_datas)
+            self._invalidate_cache(new_datas)
+            # Readding entities to indexes :
+            for index in indexes:
+                index.bulk_add(txn, iter(window))
+
+    def _update_vertex_centric_data(self, txn, edge_id, old_items, new_items):
+        # Moving edge from its old vertex centric lists to the new ones (only for items that changed)
+        old_items, new_items = [item for item in old_items if item not in new_items], [item for item in new_items if item not in old_items]
+        if not(old_items or new_items):
+            return
+        edge = Edge(edge_id, self)
+        source = Node(self._get_lst(txn, build_key(KIND_EDGE, edge_id, IN_VERTICES_SUFFIX))[0], self)
+        target = Node(self._get_lst(txn, build_key(KIND_EDGE, edge_id, OUT_VERTICES_SUFFIX))[0], self)
+        removal = source._remove_vertex_centric_data(edge, OUT_EDGES_SUFFIX, old_items)
+        removal.merge(target._remove_vertex_centric_data(edge, IN_EDGES_SUFFIX, old_items))
+        removal.apply(txn, self)
+        addition = source._add_vertex_centric_data(edge, OUT_EDGES_SUFFIX, new_items)
+        addition.merge(target._add_vertex_centric_data(edge, IN_EDGES_SUFFIX, new_items))
+        addition.apply(txn, self)
+
     def _update_data(self, kind, entity_id, subkey, value):
         self._bulk_update_data(None, kind, entity_id, **{subkey: value})  # Don't create a txn, it will be created by _bulk_update_data
 
@@ -1170,12 +1659,13 @@ class BaseGraph(GraphReadWrite, GraphNx):
             raise GrapheekUnknownScriptException('%s method cannot be found' % (_fname,))
         return func
 
+    @retried_when_full
     def _add_node(self, txn, data, node_id=None):
         assert(isinstance(data, dict))
         release_txn = False
         if txn is None:
             release_txn = True
-            txn = self._transaction_begin()
+            txn = self._txn_begin()
         try:
             operation = Addition()
             if node_id is None:
@@ -1192,17 +1682,18 @@ class BaseGraph(GraphReadWrite, GraphNx):
                 self._add_to_all_entity_indexes(txn, KIND_VERTEX, node_id, data)
                 # Updating denorm node count
                 self._node_count += 1
-                self._transaction_commit(txn)
+                self._txn_commit(txn)
                 return node
             else:
                 return operation
         except Exception as e:
             if release_txn:
-                self._transaction_rollback(txn)
+                self._txn_rollback(txn)
             raise GrapheekDataException(repr(e))
 
+    @retried_when_full
     def _bulk_add_node(self, node_defns, silent=False):
-        txn = self._transaction_begin()
+        txn = self._txn_begin()
         try:
             operation = Addition()
             node_count = len(node_defns)
@@ -1217,52 +1708,70 @@ class BaseGraph(GraphReadWrite, GraphNx):
             # update denormalized node count
             self._node_count += node_count
             # all is ok, commit :)
-            self._transaction_commit(txn)
+            self._txn_commit(txn)
             if not(silent):
                 res = [Node(node_id, self) for node_id in range_ids]
                 return res
         except Exception as e:
-            self._transaction_rollback(txn)
+            self._txn_rollback(txn)
             raise GrapheekDataException(repr(e))
 
     def _remove_node(self, node_id):
-        txn = self._transaction_begin()
+        self._bulk_remove_node([node_id])
+
+    @retried_when_full
+    def _bulk_remove_node(self, node_ids):
+        # Removes nodes (and their edges) in a single transaction : removals are merged in a single operation
+        # so that a list shared by several removed entities (neighbor lists, id lists, ...) is only rewritten once
+        node_ids = unique_ids(node_ids)
+        if not node_ids:
+            return
+        txn = self._txn_begin()
         try:
             operation = Removal()
-            node = Node(node_id, self)
-            # edges attached to this node must be removed before removing any node data
+            # edges attached to those nodes must be removed before removing any node data
             # (this will infer some denorm data modifications on related outer and inner nodes)
-            out_edge_ids = self._get_lst(txn, build_key(KIND_VERTEX, node_id, OUT_EDGES_SUFFIX))
-            for out_edge_id in out_edge_ids:
-                operation.merge(self._remove_edge(out_edge_id, txn=txn))
-            in_edge_ids = self._get_lst(txn, build_key(KIND_VERTEX, node_id, IN_EDGES_SUFFIX))
-            for in_edge_id in in_edge_ids[:]:
-                operation.merge(self._remove_edge(in_edge_id, txn=txn))
+            # (an edge linking two removed nodes - or a node to itself - is only removed once)
+            edge_lst_keys = []
+            for node_id in node_ids:
+                edge_lst_keys.append(build_key(KIND_VERTEX, node_id, OUT_EDGES_SUFFIX))
+                edge_lst_keys.append(build_key(KIND_VERTEX, node_id, IN_EDGES_SUFFIX))
+            edge_ids = unique_ids(chain.from_iterable(self._bulk_get_lst(txn, edge_lst_keys)))
+            if edge_ids:
+                operation.merge(self._bulk_remove_edge(edge_ids, txn=txn))
             # now, removing node related data and denorm data :
-            operation.merge(node._remove_denorm_data())
-            # Removing node id from proper node ids list :
-            operation.remove_from_lst(build_key(METADATA_VERTEX_ID_LIST_PREFIX, int(node_id) // CHUNK_SIZE), node_id)
+            for node_id in node_ids:
+                operation.merge(Node(node_id, self)._remove_denorm_data())
+                # Removing node id from proper node ids list :
+                operation.remove_from_lst(build_key(METADATA_VERTEX_ID_LIST_PREFIX, int(node_id) // CHUNK_SIZE), node_id)
+                # Now removing data
+                operation.remove(build_key(KIND_VERTEX, node_id, DATA_SUFFIX))
+            # (vertex centric lists of those nodes are now empty, removing them too)
+            removed_ids = set(str(node_id) for node_id in node_ids)
+            for key in list(operation._remove_from_lst_registry.keys()):
+                parts = key.split('/')
+                if parts[0] == KIND_VERTEX and parts[1] in removed_ids and VERTEX_CENTRIC_SUFFIX in parts:
+                    operation.remove_lst(key)
             # Updating vertex indexes before removing data
-            self._remove_from_all_entity_indexes(txn, KIND_VERTEX, node_id)
-            # Now removing data
-            operation.remove(build_key(KIND_VERTEX, node_id, DATA_SUFFIX))
+            self._bulk_remove_from_all_entity_indexes(txn, KIND_VERTEX, node_ids)
             # Incrementing removed vertex counter :
-            operation.update_inc(METADATA_VERTEX_REMOVED_COUNTER)
+            operation.update_inc(METADATA_VERTEX_REMOVED_COUNTER, len(node_ids))
             # Applying operation
             operation.apply(txn, self)
             # Update denorm counter :
-            self._node_count -= 1
-            self._transaction_commit(txn)
+            self._node_count -= len(node_ids)
+            self._txn_commit(txn)
         except Exception as e:
-            self._transaction_rollback(txn)
+            self._txn_rollback(txn)
             raise GrapheekDataException(repr(e))
 
+    @retried_when_full
     def _add_edge(self, txn, source, target, data=None, edge_id=None):
         assert(isinstance(data, dict))
         release_txn = False
         if txn is None:
             release_txn = True
-            txn = self._transaction_begin()
+            txn = self._txn_begin()
         try:
             operation = Addition()
             if edge_id is None:
@@ -1279,10 +1788,11 @@ class BaseGraph(GraphReadWrite, GraphNx):
             # Edge data denormalization
             edge = Edge(edge_id, self)
             operation.merge(edge._add_denorm_data(source, target))
+            vc_items = vertex_centric_items(self._vertex_centric_fields, data)
             # source data denormalization
-            operation.merge(source._add_denorm_src_data(target, edge))
+            operation.merge(source._add_denorm_src_data(target, edge, vc_items))
             # target data denormalization
-            operation.merge(target._add_denorm_tgt_data(source, edge))
+            operation.merge(target._add_denorm_tgt_data(source, edge, vc_items))
             if release_txn:
                 # Applying operation (before updating indexes as indexes needs key to be updated)
                 operation.apply(txn, self)
@@ -1290,18 +1800,19 @@ class BaseGraph(GraphReadWrite, GraphNx):
                 self._add_to_all_entity_indexes(txn, KIND_EDGE, edge_id, data)
                 # Updating edge count denorm :
                 self._edge_count += 1
-                self._transaction_commit(txn)
+                self._txn_commit(txn)
                 # Persistence and denormalization - END
                 return edge
             else:
                 return operation
         except Exception as e:
             if release_txn:
-                self._transaction_rollback(txn)
+                self._txn_rollback(txn)
             raise GrapheekDataException(repr(e))
 
+    @retried_when_full
     def _bulk_add_edge(self, edge_defns, silent=False):
-        txn = self._transaction_begin()
+        txn = self._txn_begin()
         try:
             operation = Addition()
             edge_count = len(edge_defns)
@@ -1317,11 +1828,11 @@ class BaseGraph(GraphReadWrite, GraphNx):
             # update denormalized node count
             self._edge_count += edge_count
             # all is ok, commit :)
-            self._transaction_commit(txn)
+            self._txn_commit(txn)
             if not(silent):
                 return [Edge(edge_id, self) for edge_id in range_ids]
         except Exception as e:
-            self._transaction_rollback(txn)
+            self._txn_rollback(txn)
             raise GrapheekDataException(repr(e))
 
     def _bulk_add_edge_by_ids(self, edge_id_defns, silent=False):
@@ -1336,57 +1847,165 @@ class BaseGraph(GraphReadWrite, GraphNx):
         return self._add_edge(None, source, target, data)
 
     def _remove_edge(self, edge_id, txn=None):
-        def remove_vertex_denorm_data(node, other, node_suffix):
-            rm_denorm_method = node._remove_denorm_src_data if node_suffix == OUT_VERTICES_SUFFIX else node._remove_denorm_tgt_data
-            return rm_denorm_method(other, edge)
+        return self._bulk_remove_edge([edge_id], txn=txn)
 
+    def _edge_removal(self, operation, edge_id, source_id, target_id, vc_items):
+        # Adds edge removal to operation (edge indexes and counters are not updated)
+        edge = Edge(edge_id, self)
+        source = Node(source_id, self)
+        target = Node(target_id, self)
+        source._remove_denorm_src_data(target, edge, vc_items, operation)
+        target._remove_denorm_tgt_data(source, edge, vc_items, operation)
+        # Removing edge id from proper edge ids list :
+        operation.remove_from_lst(build_key(METADATA_EDGE_ID_LIST_PREFIX, int(edge_id) // CHUNK_SIZE), edge_id)
+        # Removing edge related lists
+        operation.remove_lst(build_key(KIND_EDGE, edge_id, IN_VERTICES_SUFFIX))
+        operation.remove_lst(build_key(KIND_EDGE, edge_id, OUT_VERTICES_SUFFIX))
+        operation.remove_lst(build_key(KIND_EDGE, edge_id, BOTH_VERTICES_SUFFIX))
+        # Now removing edge data
+        operation.remove(build_key(KIND_EDGE, edge_id, DATA_SUFFIX))
+        # Removing edge denormalized data
+        edge._remove_denorm_data(source, target, operation)
+
+    @retried_when_full
+    def _bulk_remove_edge(self, edge_ids, txn=None):
+        # Removes edges with a single (merged) operation
+        # When txn is given, the operation is returned instead of being applied
+        edge_ids = unique_ids(edge_ids)
         release_txn = False
         if txn is None:
+            if not edge_ids:
+                return
             release_txn = True
-            txn = self._transaction_begin()
+            txn = self._txn_begin()
         try:
             operation = Removal()
-            edge = Edge(edge_id, self)
-            source = target = None
-            source_id = self._get_lst(txn, build_key(KIND_EDGE, edge_id, IN_VERTICES_SUFFIX))[0]
-            source = Node(source_id, self)
-            target_id = self._get_lst(txn, build_key(KIND_EDGE, edge_id, OUT_VERTICES_SUFFIX))[0]
-            target = Node(target_id, self)
-            operation.merge(remove_vertex_denorm_data(source, target, OUT_VERTICES_SUFFIX))
-            operation.merge(remove_vertex_denorm_data(target, source, IN_VERTICES_SUFFIX))
-            # Removing edge id from proper edge ids list :
-            operation.remove_from_lst(build_key(METADATA_EDGE_ID_LIST_PREFIX, edge_id // CHUNK_SIZE), edge_id)
-            # Removing edge related lists
-            operation.remove(build_key(KIND_EDGE, edge_id, IN_VERTICES_SUFFIX))
-            operation.remove(build_key(KIND_EDGE, edge_id, OUT_VERTICES_SUFFIX))
-            operation.remove(build_key(KIND_EDGE, edge_id, BOTH_VERTICES_SUFFIX))
+            source_keys = [build_key(KIND_EDGE, edge_id, IN_VERTICES_SUFFIX) for edge_id in edge_ids]
+            target_keys = [build_key(KIND_EDGE, edge_id, OUT_VERTICES_SUFFIX) for edge_id in edge_ids]
+            sources = self._bulk_get_lst(txn, source_keys)
+            targets = self._bulk_get_lst(txn, target_keys)
+            datas = [{}] * len(edge_ids)
+            if self._vertex_centric_fields:
+                datas = self._bulk_get_data(txn, KIND_EDGE, edge_ids)
+            for edge_id, source_ids, target_ids, data in zip(edge_ids, sources, targets, datas):
+                vc_items = vertex_centric_items(self._vertex_centric_fields, data)
+                self._edge_removal(operation, edge_id, source_ids[0], target_ids[0], vc_items)
             # Updating edge indexes before removing data
-            self._remove_from_all_entity_indexes(txn, KIND_EDGE, edge_id)
-            # Now removing edge data
-            operation.remove(build_key(KIND_EDGE, edge_id, DATA_SUFFIX))
-            # Removing edge denormalized data
-            assert((source or target) is not None)  # Both source and target must NOT be None
-            operation.merge(edge._remove_denorm_data(source, target))
+            self._bulk_remove_from_all_entity_indexes(txn, KIND_EDGE, edge_ids)
             # Incrementing removed edge counter :
-            operation.update_inc(METADATA_EDGE_REMOVED_COUNTER)
+            operation.update_inc(METADATA_EDGE_REMOVED_COUNTER, len(edge_ids))
             # Updating edge counter denorm :
-            self._edge_count -= 1
+            self._edge_count -= len(edge_ids)
             if release_txn:
                 operation.apply(txn, self)
-                self._transaction_commit(txn)
+                self._txn_commit(txn)
             else:
                 return operation
         except Exception as e:
             if release_txn:
-                self._transaction_rollback(txn)
+                self._txn_rollback(txn)
             raise GrapheekDataException(repr(e))
 
+    # Read snapshots :
+
+    @contextmanager
+    def read_snapshot(self):
+        """
+        Reads done by current thread inside this context (outside of a transaction) all see the same state of the database
+        (on backends supporting it, others simply read the current state)
+        """
+        snapshot = self._snapshot_acquire()
+        try:
+            yield
+        finally:
+            self._snapshot_release(snapshot)
+
+    def _snapshot_acquire(self):
+        return None
+
+    def _snapshot_release(self, snapshot):
+        pass
+
+    def _snapshot_txn(self):
+        # Read transaction of current thread snapshot (None if there's none)
+        return None
+
+    def _snapshot_epoch(self):
+        # Write epoch (see _write_epoch) when current thread snapshot began
+        return None
+
+    # Read-through cache helpers :
+    # Only reads done outside of a transaction use the cache (a transaction may read its own uncommitted writes)
+    # and inside a snapshot, only as long as no write has been committed since it began (cache holds the latest state)
+    # Write paths (Addition.apply, Removal.apply, _bulk_update_data...) invalidate the keys they modify : at once,
+    # and again when their transaction ends (a concurrent read may have cached the previously committed value meanwhile)
+
+    def _cache_usable(self, txn):
+        if self._cache is None or txn is not None:
+            return False
+        return self._snapshot_txn() is None or self._snapshot_epoch() == self._write_epoch
+
+    def _cached_get(self, txn, key):
+        cache = self._cache
+        if not self._cache_usable(txn):
+            return self._get(txn, key)
+        value = cache.get(key)
+        if value == UNDEFINED:
+            generation = cache.generation
+            value = self._get(txn, key)
+            if value != UNDEFINED:
+                cache.set(key, value, generation)
+        return copy_value(value)
+
+    def _cached_get_lst(self, txn, key):
+        cache = self._cache
+        if not self._cache_usable(txn):
+            return self._get_lst(txn, key)
+        # (lists are cached as tuples : they can be shared without being copied)
+        value = cache.get(key)
+        if value == UNDEFINED:
+            generation = cache.generation
+            value = self._get_lst(txn, key)
+            if value != UNDEFINED:
+                value = tuple(value)
+                cache.set(key, value, generation)
+        return value
+
+    def _invalidate_cache(self, keys):
+        if self._cache is not None:
+            keys = set(keys)
+            self._cache.bulk_invalidate(keys)
+            self._uncommitted_keys.update(keys)
+
+    def _invalidate_uncommitted(self):
+        # Called when a write transaction ends (readers that read a key before are then prevented from caching it)
+        if self._cache is not None:
+            self._cache.bulk_invalidate(self._uncommitted_keys, new_generation=True)
+            self._uncommitted_keys = set()
+
     # Item id -> Item helper
 
     def _item_from_id(self, kind, entity_id):
         Klass = Node if kind == KIND_VERTEX else Edge
         return Klass(entity_id, self)
 
+    # Denormalized counters :
+
+    def _entity_count(self, _kind):
+        if _kind == KIND_VERTEX:
+            keys = [METADATA_VERTEX_COUNTER, METADATA_VERTEX_REMOVED_COUNTER]
+        else:
+            keys = [METADATA_EDGE_COUNTER, METADATA_EDGE_REMOVED_COUNTER]
+        counters = self._bulk_get(None, keys)
+        return int(counters[keys[0]]) - int(counters[keys[1]])
+
+    def _degree(self, _kind, _entity_id, _traversal):
+        if _kind == KIND_EDGE:
+            # an edge always has 1 source and 1 target
+            return 2 if _traversal == BOTH_VERTICES_SUFFIX else 1
+        count = self._get(None, build_key(_kind, _entity_id, _traversal, COUNT_SUFFIX))
+        return 0 if count == UNDEFINED else int(count)
+
     # Traversals given entity ids :
 
     def _neighbors(self, _kind, _entity_id, _traversal, _cache=None, _random=False, **filters):
@@ -1405,21 +2024,32 @@ class BaseGraph(GraphReadWrite, GraphNx):
         #   building neighbour_ids
         has_cache = _cache is not None
         neighbour_ids = None
+        # When traversing edges with an exact filter on a field having a vertex centric index,
+        # only the matching sub lists are read (instead of the whole adjacency list) :
+        vertex_centric_keys = self._vertex_centric_keys(_kind, _entity_id, _traversal, **filters)
         if has_cache:
-            cache_key = (_kind, _entity_id, _traversal)
+            cache_key = (_kind, _entity_id, _traversal, vertex_centric_keys)
             neighbour_ids = _cache.get(cache_key, None)
         if neighbour_ids is None:
             # no cache..
-            key = build_key(_kind, _entity_id, _traversal)
-            neighbour_ids = self._get_lst(None, key)
+            if vertex_centric_keys is None:
+                key = build_key(_kind, _entity_id, _traversal)
+                neighbour_ids = self._cached_get_lst(None, key)
+            else:
+                neighbour_ids = []
+                for key in vertex_centric_keys:
+                    lst = self._cached_get_lst(None, key)
+                    if lst != UNDEFINED:
+                        neighbour_ids.extend(lst)
             if has_cache:
                 _cache[cache_key] = neighbour_ids
         # Special case when filters is empty or kind is edge (no need to look in index in the case of edge)
-        if (_kind == KIND_EDGE) or not filters:
+        # (nor when neighbours already come from vertex centric lists : they are already narrowed)
+        if (_kind == KIND_EDGE) or not filters or vertex_centric_keys is not None:
             if not(_random):
                 for entity_id in iter(neighbour_ids):
                     yield entity_id
-            else:
+            elif neighbour_ids:
                 yield random.choice(neighbour_ids)
         else:
             # Preparing metrics that will allow to choose between sequential access and index access :
@@ -1458,6 +2088,30 @@ class BaseGraph(GraphReadWrite, GraphNx):
                 else:  # pragma : no cover
                     yield random.choice(indexed_ids.intersection(neighbour_ids))
 
+    def _vertex_centric_keys(self, _kind, _entity_id, _traversal, **filters):
+        """
+        Returns the tuple of vertex centric list keys that contain all the edges
+        of <_traversal> matching filters, or None if no vertex centric index can be used
+        """
+        if _kind != KIND_VERTEX or not filters or not self._vertex_centric_fields:
+            return None
+        if _traversal not in (IN_EDGES_SUFFIX, OUT_EDGES_SUFFIX, BOTH_EDGES_SUFFIX):
+            return None
+        try:
+            exact_values = get_exact_values(**filters)
+        except TypeError:
+            return None
+        for field in self._vertex_centric_fields:
+            if field in exact_values:
+                values = []
+                for value in exact_values[field]:
+                    if value is not None:
+                        value = normalize_value(value)
+                        if value not in values:
+                            values.append(value)
+                return tuple(build_key(_kind, _entity_id, _traversal, VERTEX_CENTRIC_SUFFIX, field, value) for value in values)
+        return None
+
     # Don't override next methods : it's the public interface
     # (or some "private" helper methods for public methods)
 
@@ -1465,15 +2119,22 @@ class BaseGraph(GraphReadWrite, GraphNx):
 
         if self._closed:
             raise GrapheekDataException('Graph is closed')
-        if _kind == KIND_VERTEX:
-            seq_count = self._node_count
-        else:
-            seq_count = self._edge_count
-        iterator = self._optimizer.index_or_seq_scan_iterator(_kind, seq_count, **filters)
-        if iterator is None:  # no index is better than sequential scan, so choose it
-            iterator = self._optimizer.get_kind_ids(None, _kind)
+        def plan():
+            if _kind == KIND_VERTEX:
+                seq_count = self._node_count
+            else:
+                seq_count = self._edge_count
+            iterator = self._optimizer.index_or_seq_scan_iterator(_kind, seq_count, **filters)
+            if iterator is None:  # no index is better than sequential scan, so choose it
+                iterator = self._optimizer.get_kind_ids(None, _kind)
+            return iterator
 
-        return EntityIterator(self, _kind, filters, iterator)
+        def count_plan():
+            if not filters:
+                return self._entity_count(_kind)
+            return self._optimizer.index_count(_kind, **filters)
+
+        return EntityIterator(self, _kind, filters, plan, count_plan=count_plan)
 
     def V(self, **filters):
         return self.__X(KIND_VERTEX, **filters)
@@ -1527,6 +2188,9 @@ class BaseGraph(GraphReadWrite, GraphNx):
     def update_data(self, kind, entity_id, attr, value):
         self._update_data(kind, entity_id, attr, value)
 
+    def _get_indexes(self, kind):
+        return self._node_indexes if kind == KIND_VERTEX else self._edge_indexes
+
     def _add_to_all_entity_indexes(self, txn, kind, entity_id, data):
         indexes = self._node_indexes if kind == KIND_VERTEX else self._edge_indexes
         for index in indexes:
@@ -1542,13 +2206,25 @@ class BaseGraph(GraphReadWrite, GraphNx):
         for index in indexes:
             index.remove(txn, entity_id)
 
+    def _bulk_remove_from_all_entity_indexes(self, txn, kind, entity_ids):
+        indexes = self._node_indexes if kind == KIND_VERTEX else self._edge_indexes
+        for index in indexes:
+            index.bulk_remove(txn, entity_ids)
+
     def _add_entity_index(self, _kind, *args, **filters):
+        self._add_typed_entity_index(_kind, ExactIndex, args, filters)
+
+    def _add_entity_range_index(self, _kind, field):
+        self._add_typed_entity_index(_kind, RangeIndex, [field], {})
+
+    @retried_when_full
+    def _add_typed_entity_index(self, _kind, _index_class, args, filters):
         fields = list(args)
         fields.sort()
         filter_tuples = list(filters.items())
         filter_tuples.sort()
-        index_signature = [fields, filter_tuples]
-        index_signature_string = normalize_value(index_signature)
+        signature = index_signature(_index_class._index_type, fields, filter_tuples)
+        index_signature_string = normalize_value(signature)
         assert(_kind in (KIND_VERTEX, KIND_EDGE))
         if _kind == KIND_VERTEX:
             METADATA_INDEX_PREFIX = METADATA_VERTEX_INDEX_PREFIX
@@ -1570,18 +2246,17 @@ class BaseGraph(GraphReadWrite, GraphNx):
         if index_id != UNDEFINED:
             # Index already exists
             raise GrapheekIndexAlreadyExistsException
-        txn = self._transaction_begin()
+        txn = self._txn_begin()
         try:
             index_id = self._new_id_for_key(txn, METADATA_INDEX_COUNTER)
             self._set(txn, index_key, index_id)
             self._append_to_lst(txn, METADATA_INDEX_LIST, index_id)  # "Registering" index in index list
-            self._set(txn, build_key(METADATA_INDEX_FIELDS_PREFIX, index_id), index_signature)
+            self._set(txn, build_key(METADATA_INDEX_FIELDS_PREFIX, index_id), signature)
             entity_count = self._get(txn, METADATA_COUNTER)
             if entity_count == UNDEFINED:
                 raise GrapheekDataException
             prefix = build_key(KIND_INDEX, _kind, index_id)
-            # NOTE : So far, only ExactIndex is supported :
-            index = ExactIndex(self, _kind, prefix, *fields, **filters)
+            index = _index_class(self, _kind, prefix, *fields, **filters)
             # Entity iterator : index will iterate on it to create denormalized data
             # that will (should ;)) speedup query
             id_iterator = self._optimizer.get_kind_ids(txn, _kind)
@@ -1589,9 +2264,9 @@ class BaseGraph(GraphReadWrite, GraphNx):
             index.bulk_add(txn, id_iterator)
             # Everything seems to be ok, adding index to proper list
             entity_indexes.append(index)
-            self._transaction_commit(txn)
+            self._txn_commit(txn)
         except Exception as e:
-            self._transaction_rollback(txn)
+            self._txn_rollback(txn)
             raise GrapheekIndexCreationFailedException(repr(e))
 
     def add_node_index(self, *fields, **filters):
@@ -1600,20 +2275,33 @@ class BaseGraph(GraphReadWrite, GraphNx):
     def add_edge_index(self, *fields, **filters):
         self._add_entity_index(KIND_EDGE, *fields, **filters)
 
+    def add_node_range_index(self, field):
+        self._add_entity_range_index(KIND_VERTEX, field)
+
+    def add_edge_range_index(self, field):
+        self._add_entity_range_index(KIND_EDGE, field)
+
     def get_node_indexes(self):
-        return [[index._fields, dict(index._filter_items)] for index in self._node_indexes]
+        return [index.description() for index in self._node_indexes]
 
     def get_edge_indexes(self):
-        return [[index._fields, dict(index._filter_items)] for index in self._edge_indexes]
+        return [index.description() for index in self._edge_indexes]
 
     def _remove_entity_index(self, _kind, *args, **kwargs):
+        self._remove_typed_entity_index(_kind, ExactIndex, args, kwargs)
+
+    def _remove_entity_range_index(self, _kind, field):
+        self._remove_typed_entity_index(_kind, RangeIndex, [field], {})
+
+    @retried_when_full
+    def _remove_typed_entity_index(self, _kind, _index_class, args, kwargs):
         assert(_kind in (KIND_VERTEX, KIND_EDGE))
         fields = list(args)
         fields.sort()
         filter_tuples = list(kwargs.items())
         filter_tuples.sort()
-        index_signature = [fields, filter_tuples]
-        index_signature_string = normalize_value(index_signature)
+        signature = index_signature(_index_class._index_type, fields, filter_tuples)
+        index_signature_string = normalize_value(signature)
         if _kind == KIND_VERTEX:
             indexes = self._node_indexes
             METADATA_INDEX_PREFIX = METADATA_VERTEX_INDEX_PREFIX
@@ -1628,12 +2316,12 @@ class BaseGraph(GraphReadWrite, GraphNx):
             METADATA_INDEX_COUNTER = METADATA_EDGE_INDEX_COUNTER
         index_to_remove = None
         for index in indexes:
-            if index._fields == fields and index._filter_items == set(kwargs.items()):
+            if index._index_type == _index_class._index_type and index._fields == fields and index._filter_items == set(kwargs.items()):
                 index_to_remove = index
                 break
         if index_to_remove is None:
             raise GrapheekIndexRemovalFailedException
-        txn = self._transaction_begin()
+        txn = self._txn_begin()
         try:
             # Removing index
             index.delete(txn)  # it is the responsability of the index to remove everything it created
@@ -1650,9 +2338,9 @@ class BaseGraph(GraphReadWrite, GraphNx):
             self._remove(txn, build_key(METADATA_INDEX_FIELDS_PREFIX, index_id))
             # Removing index from index list :
             self._remove_from_lst(txn, METADATA_INDEX_LIST, index_id)
-            self._transaction_commit(txn)
+            self._txn_commit(txn)
         except Exception as e:
-            self._transaction_rollback(txn)
+            self._txn_rollback(txn)
             raise GrapheekIndexRemovalFailedException(repr(e))
 
     def remove_node_index(self, *fields, **filters):
@@ -1661,6 +2349,95 @@ class BaseGraph(GraphReadWrite, GraphNx):
     def remove_edge_index(self, *fields, **filters):
         self._remove_entity_index(KIND_EDGE, *fields, **filters)
 
+    def remove_node_range_index(self, field):
+        self._remove_entity_range_index(KIND_VERTEX, field)
+
+    def remove_edge_range_index(self, field):
+        self._remove_entity_range_index(KIND_EDGE, field)
+
+    def _vertex_centric_operation(self, txn, operation, field):
+        # Registering (in operation) every vertex centric list changes needed for field
+        # (edges are loaded by chunk of <CHUNK_SIZE>)
+        id_iterator = self._optimizer.get_kind_ids(txn, KIND_EDGE)
+        for edge_ids in zip_longest(*([id_iterator] * CHUNK_SIZE), fillvalue=None):
+            edge_ids = [edge_id for edge_id in edge_ids if edge_id is not None]
+            edge_datas = self._bulk_get(txn, [build_key(KIND_EDGE, edge_id, DATA_SUFFIX) for edge_id in edge_ids])
+            for edge_id in edge_ids:
+                data = edge_datas.get(build_key(KIND_EDGE, edge_id, DATA_SUFFIX), None)
+                if data is None:  # pragma : no cover
+                    continue
+                items = vertex_centric_items([field], data)
+                if not items:
+                    continue
+                edge = Edge(edge_id, self)
+                source, target = self._bulk_get_lst(txn, [build_key(KIND_EDGE, edge_id, suffix) for suffix in (IN_VERTICES_SUFFIX, OUT_VERTICES_SUFFIX)])
+                operation.merge(Node(source[0], self)._add_vertex_centric_data(edge, OUT_EDGES_SUFFIX, items))
+                operation.merge(Node(target[0], self)._add_vertex_centric_data(edge, IN_EDGES_SUFFIX, items))
+
+    @retried_when_full
+    def add_vertex_centric_index(self, field):
+        """
+        Index the edges of every node by <field> value, so that traversals
+        like node.outE(field=value) only read the matching edges
+        """
+        if field in self._vertex_centric_fields:
+            raise GrapheekIndexAlreadyExistsException
+        txn = self._txn_begin()
+        try:
+            operation = Addition()
+            self._vertex_centric_operation(txn, operation, field)
+            operation.apply(txn, self)
+            self._set(txn, METADATA_EDGE_VERTEX_CENTRIC_LIST, self._vertex_centric_fields + [field])
+            self._txn_commit(txn)
+            self._vertex_centric_fields.append(field)
+        except Exception as e:
+            self._txn_rollback(txn)
+            raise GrapheekIndexCreationFailedException(repr(e))
+
+    def get_vertex_centric_indexes(self):
+        return list(self._vertex_centric_fields)
+
+    @retried_when_full
+    def remove_vertex_centric_index(self, field):
+        if field not in self._vertex_centric_fields:
+            raise GrapheekIndexRemovalFailedException
+        txn = self._txn_begin()
+        try:
+            # Same traversal as creation, but only keeping the keys that were created :
+            operation = Addition()
+            self._vertex_centric_operation(txn, operation, field)
+            vertex_centric_keys = list(operation._append_to_lst_registry.keys())
+            self._bulk_remove_lst(txn, vertex_centric_keys)
+            self._invalidate_cache(vertex_centric_keys)
+            self._set(txn, METADATA_EDGE_VERTEX_CENTRIC_LIST, [f for f in self._vertex_centric_fields if f != field])
+            self._txn_commit(txn)
+            self._vertex_centric_fields.remove(field)
+        except Exception as e:
+            self._txn_rollback(txn)
+            raise GrapheekIndexRemovalFailedException(repr(e))
+
+    def enable_cache(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Cache entity data and adjacency lists read by this graph instance (in a LRU cache
+        bounded by <max_entries> entries and ~<max_bytes> bytes)
+        CAUTION : cache is local to this instance, it can't see writes done by another process
+        -> only enable it when this instance is the only one to write into the database
+        """
+        self._cache = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+        # keys invalidated by the current write transaction (see _invalidate_uncommitted)
+        self._uncommitted_keys = set()
+
+    def disable_cache(self):
+        self._cache = None
+
+    def get_cache_stats(self):
+        """
+        Returns a dictionary containing cache hits, misses, entries and bytes (or None if cache is disabled)
+        """
+        if self._cache is None:
+            return None
+        return self._cache.stats()
+
     def _operator_kind_and_checks(self, *entity_iterators):
         # ensure entity iterators are of the same kind :
         kinds = set([it._src_kind for it in entity_iterators])
@@ -1680,7 +2457,7 @@ class BaseGraph(GraphReadWrite, GraphNx):
                 if entity_id not in known_ids:
                     known_ids.add(entity_id)
                     yield entity_id
-        return EntityIterator(self, kind, {}, id_iterator(*entity_iterators))
+        return EntityIterator(self, kind, {}, partial(id_iterator, *entity_iterators))
 
     def _marshalled_operator_helper(self, commands):  # pragma : no cover
         entity_iterators = []
@@ -1698,9 +2475,11 @@ class BaseGraph(GraphReadWrite, GraphNx):
 
     def _set_operation(self, func, *entity_iterators):
         kind = self._operator_kind_and_checks(*entity_iterators)
-        id_sets = [set(it._clone_initial().ids()) for it in entity_iterators]
-        ids = reduce(func, id_sets)
-        return EntityIterator(self, kind, {}, iter(ids))
+
+        def id_iterator(*entity_iterators):
+            id_sets = [set(it._clone_initial().ids()) for it in entity_iterators]
+            return iter(reduce(func, id_sets))
+        return EntityIterator(self, kind, {}, partial(id_iterator, *entity_iterators))
 
     def issubset(self, *entity_iterators):
         self._operator_kind_and_checks(*entity_iterators)
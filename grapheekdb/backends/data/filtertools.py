@@ -1,17 +1,18 @@
 # -*- coding:utf-8 -*-
 
 from functools import partial
-from itertools import tee
+from itertools import islice
 
 from . import lookups
 
 from grapheekdb.lib.undef import UNDEFINED
 
-from grapheekdb.backends.data.keys import DATA_SUFFIX
-
 from grapheekdb.lib.exceptions import GrapheekSubLookupNotImplementedException
 from grapheekdb.lib.exceptions import GrapheekInvalidLookupException
 
+# Number of entity ids whose data are fetched at once when filtering entities
+FILTER_WINDOW_SIZE = 256
+
 
 def get_exact_filters(**filters):
     exact_filters = {}
@@ -32,6 +33,24 @@ def get_exact_filters(**filters):
     return exact_filters
 
 
+def get_exact_values(**filters):
+    # Contrary to get_exact_filters, always returns a list of candidate values for each field
+    # (so that an exact lookup on a list value can't be mistaken for an __in lookup)
+    exact_values = {}
+    for key, value in list(filters.items()):
+        lst = key.split('__')
+        len_lst = len(lst)
+        if len_lst == 1:
+            exact_values.setdefault(lst[0], [value])
+        elif len_lst == 2:
+            field, clause = lst
+            if clause == 'exact':
+                exact_values.setdefault(field, [value])
+            elif clause == 'in':
+                exact_values.setdefault(field, list(value))
+    return exact_values
+
+
 def build_filter_funcs(**filters):
     field = clause = None
     filter_funcs = []
@@ -81,27 +100,29 @@ def entity_match(filter_funcs, data, internals=None):
     return True
 
 
+def entity_id_windows(iterator, size=FILTER_WINDOW_SIZE):
+    while True:
+        window = list(islice(iterator, size))
+        if not window:
+            return
+        yield window
+
+
 def filter_entities(graph, kind, iterator, filter_funcs, on_item=False):
-    _, cloned_iterator = tee(iterator)
     if filter_funcs:
-        if on_item:
-            for entity_id in cloned_iterator:
-                data = graph._get(None, kind + '/' + str(entity_id) + '/' + DATA_SUFFIX)
-                match = entity_match(filter_funcs, data, {'_id': entity_id})
-                if match:
-                    yield graph._item_from_id(kind, entity_id)
-        else:
-            for entity_id in cloned_iterator:
-                data = graph._get(None, kind + '/' + str(entity_id) + '/' + DATA_SUFFIX)
+        # Entity data are fetched by windows of <FILTER_WINDOW_SIZE> ids (1 bulk call instead of 1 call per entity)
+        for entity_ids in entity_id_windows(iterator):
+            datas = graph._bulk_get_data(None, kind, entity_ids)
+            for entity_id, data in zip(entity_ids, datas):
                 match = entity_match(filter_funcs, data, {'_id': entity_id})
                 if match:
-                    yield entity_id
+                    yield graph._item_from_id(kind, entity_id) if on_item else entity_id
     else:
         # I don't do : yield item if on_item else entity_id
         # Because item is not computed (when on_item is False, this is not useful to instantiate an Entity)
         if on_item:
-            for entity_id in cloned_iterator:
+            for entity_id in iterator:
                 yield graph._item_from_id(kind, entity_id)
         else:
-            for entity_id in cloned_iterator:
+            for entity_id in iterator:
                 yield entity_id
@@ -6,9 +6,19 @@ try:  # pragma : no cover
 except ImportError:  # pragma : no cover
     from itertools import zip_longest
 
+try:  # pragma : no cover
+    NUMBER_TYPES = (int, long, float)
+    STRING_TYPES = (str, unicode)
+except NameError:  # pragma : no cover
+    NUMBER_TYPES = (int, float)
+    STRING_TYPES = (str,)
+    unichr = chr
+
 from itertools import product
 from collections import defaultdict
+from bisect import bisect_left, bisect_right
 
+import sys
 import json
 
 from grapheekdb.lib.undef import UNDEFINED
@@ -19,22 +29,96 @@ from grapheekdb.backends.data.keys import COUNT_SUFFIX
 from grapheekdb.backends.data.keys import DATA_SUFFIX
 from grapheekdb.backends.data.keys import build_key
 
-from grapheekdb.backends.data.filtertools import get_exact_filters, build_filter_funcs, entity_match
+from grapheekdb.backends.data.filtertools import get_exact_filters, get_exact_values, build_filter_funcs, entity_match
 
 from grapheekdb.lib.exceptions import GrapheekIncompetentIndexException
 
+EXACT_INDEX                         = 'exact'
+RANGE_INDEX                         = 'range'
+
+# Number of entities currently indexed for a value (<prefix>/c/<value> only grows : it allocates chunks)
+EXACT_LIVE_COUNT_SUFFIX             = 'n'
+
+RANGE_HEADER_SUFFIX                 = 'h'
+RANGE_RUN_SUFFIX                    = 'r'
+
+# Ranks make values of different types comparable inside a range index
+# (numbers and strings are kept in separate, contiguous, parts of the index) :
+NUMBER_RANK                         = 0
+STRING_RANK                         = 1
+RANK_COUNT                          = 2
+# Greater than any entity id (used to build "after this value" bounds) :
+AFTER_ANY_ID                        = float('inf')
+
+RANGE_LOOKUPS                       = ('exact', 'in', 'gt', 'gte', 'lt', 'lte', 'startswith')
+
 
 def normalize_value(obj):
     return json.dumps(obj)
 
 
+def vertex_centric_items(fields, data):
+    """
+    Returns the (field, normalized value) pairs under which an edge must be
+    referenced in its source and target vertex centric lists
+    """
+    items = []
+    for field in fields:
+        value = data.get(field, None)
+        if value is not None:
+            items.append((field, normalize_value(value)))
+    return items
+
+
+def index_signature(index_type, fields, filter_tuples):
+    # (exact index signatures are kept unchanged to stay compatible with existing databases)
+    signature = [fields, filter_tuples]
+    if index_type != EXACT_INDEX:
+        signature.append(index_type)
+    return signature
+
+
+def rank_value(value):
+    """
+    Returns the rank of value in a range index or None if value can't be range indexed
+    """
+    if isinstance(value, bool) or isinstance(value, NUMBER_TYPES):
+        if value != value:  # NaN can't be ordered
+            return None
+        return NUMBER_RANK
+    if isinstance(value, STRING_TYPES):
+        return STRING_RANK
+    return None
+
+
+def prefix_upper_bound(prefix):
+    """
+    Returns the smallest string greater than every string starting with prefix
+    (or None if there is no such string)
+    """
+    while prefix and ord(prefix[-1]) == sys.maxunicode:
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    return prefix[:-1] + unichr(ord(prefix[-1]) + 1)
+
+
 class BaseIndex(object):
 
+    _index_type = None
+
     def __init__(self, _graph, _kind, _prefix):
         self._graph = _graph
         self._kind = _kind
         self._prefix = _prefix
 
+    def description(self):
+        return index_signature(self._index_type, self._fields, dict(self._filter_items))
+
+    def depends_on(self, fields):
+        # True if changing (one of) fields may change entries of this index
+        return any(field in self._dependencies for field in fields)
+
     def bulk_add(self, txn, id_iterator):
         raise NotImplementedError
 
@@ -44,15 +128,24 @@ class BaseIndex(object):
     def remove(self, txn, entity, data):
         raise NotImplementedError
 
+    def bulk_remove(self, txn, entity_ids):
+        raise NotImplementedError
+
     def estimate(self, txn, filters):
         raise NotImplementedError
 
     def ids(self, txn, filters):
         raise NotImplementedError
 
+    def count(self, txn, filters):
+        # Number of entities matching filters, or None if this index can't count them without reading entities
+        return None
+
 
 class ExactIndex(BaseIndex):
 
+    _index_type = EXACT_INDEX
+
     def __init__(self, _graph, _kind, _prefix, *fields, **filters):
         super(ExactIndex, self).__init__(_graph, _kind, _prefix)
         self._fields = list(fields)
@@ -63,6 +156,7 @@ class ExactIndex(BaseIndex):
         self._filter_length = len(filters)
         self._filter_funcs = build_filter_funcs(**filters)
         self._fields.sort()
+        self._dependencies = self._set_fields.union(key.split('__')[0] for key in filters)
 
     def delete(self, txn):
         """
@@ -70,11 +164,20 @@ class ExactIndex(BaseIndex):
         """
         self._graph._remove_prefix(txn, self._prefix)
 
+    def _inc_live_count(self, txn, value, new_value, increment):
+        live_count_key = build_key(self._prefix, EXACT_LIVE_COUNT_SUFFIX, value)
+        if new_value:
+            self._graph._set(txn, live_count_key, increment)
+        elif self._graph._get(txn, live_count_key) != UNDEFINED:
+            self._graph._update_inc(txn, live_count_key, increment)
+        # else : value was indexed before live counters existed, it stays uncounted
+
     def bulk_add(self, txn, id_iterator):
 
         def save_lst(txn, chunk_idx, value, lst):
             lst_key = build_key(self._prefix, chunk_idx, value)
-            self._graph._set_lst(txn, lst_key, lst)
+            # (1st chunk may already be partially filled)
+            self._graph._bulk_append_to_lst(txn, lst_key, lst)
 
         kind = self._kind
         values_to_id = defaultdict(list)
@@ -96,7 +199,8 @@ class ExactIndex(BaseIndex):
             lst = []
             value_count_key = build_key(self._prefix, COUNT_SUFFIX, value)
             value_count = self._graph._get(txn, value_count_key)
-            if value_count == UNDEFINED:
+            new_value = value_count == UNDEFINED
+            if new_value:
                 value_count = 0
             chunk_idx = value_count // CHUNK_SIZE
             for entity_id in entity_ids:
@@ -110,6 +214,7 @@ class ExactIndex(BaseIndex):
             if lst:
                 save_lst(txn, chunk_idx, value, lst)
             self._graph._set(txn, value_count_key, value_count)
+            self._inc_live_count(txn, value, new_value, len(entity_ids))
         self._graph._bulk_set(txn, entity_dict)
 
     def add(self, txn, entity_id, data):
@@ -124,6 +229,7 @@ class ExactIndex(BaseIndex):
             value_count = int(value_count_current)
         # Incrementing entity count for value
         self._graph._set(txn, value_count_key, value_count + 1)
+        self._inc_live_count(txn, value, value_count_current == UNDEFINED, 1)
         #  1st adding entity_id to good chunk :
         chunk_idx = value_count // CHUNK_SIZE
         chunk_key = build_key(self._prefix, chunk_idx, value)
@@ -134,13 +240,38 @@ class ExactIndex(BaseIndex):
         self._graph._set(txn, build_key(self._prefix, entity_id), build_key(chunk_idx, value))
 
     def remove(self, txn, entity_id):
-        entity_chunk_sub_key = self._graph._get(txn, build_key(self._prefix, entity_id))
+        entity_key = build_key(self._prefix, entity_id)
+        entity_chunk_sub_key = self._graph._get(txn, entity_key)
         if entity_chunk_sub_key != UNDEFINED:
             # remove entity_id from chunk
             chunk_key = build_key(self._prefix, entity_chunk_sub_key)
             self._graph._remove_from_lst(txn, chunk_key, entity_id)
-            # Finally remove entity_chunk_sub_key
-            self._graph._remove(txn, entity_chunk_sub_key)
+            value = entity_chunk_sub_key.split('/', 1)[1]
+            live_count_key = build_key(self._prefix, EXACT_LIVE_COUNT_SUFFIX, value)
+            if self._graph._get(txn, live_count_key) != UNDEFINED:
+                self._graph._update_dec(txn, live_count_key)
+            # Finally remove the entity -> chunk relation
+            self._graph._remove(txn, entity_key)
+
+    def bulk_remove(self, txn, entity_ids):
+        # Same as remove for many entities, but each value chunk (and live counter) is only rewritten once
+        entity_keys = [build_key(self._prefix, entity_id) for entity_id in entity_ids]
+        entity_chunk_sub_keys = self._graph._bulk_get(txn, entity_keys)
+        ids_by_chunk = defaultdict(list)
+        for entity_id, entity_key in zip(entity_ids, entity_keys):
+            if entity_key in entity_chunk_sub_keys:
+                ids_by_chunk[entity_chunk_sub_keys[entity_key]].append(entity_id)
+        if not ids_by_chunk:
+            return
+        removed_by_value = defaultdict(int)
+        for entity_chunk_sub_key, chunk_entity_ids in ids_by_chunk.items():
+            self._graph._bulk_remove_from_lst(txn, build_key(self._prefix, entity_chunk_sub_key), chunk_entity_ids)
+            removed_by_value[entity_chunk_sub_key.split('/', 1)[1]] += len(chunk_entity_ids)
+        for value, removed_count in removed_by_value.items():
+            live_count_key = build_key(self._prefix, EXACT_LIVE_COUNT_SUFFIX, value)
+            if self._graph._get(txn, live_count_key) != UNDEFINED:
+                self._graph._update_dec(txn, live_count_key, removed_count)
+        self._graph._bulk_remove(txn, list(entity_chunk_sub_keys.keys()))
 
     def _compatible_filters(self, filters):
         # FIXME : This code works but is hard to understand (for me)
@@ -183,6 +314,39 @@ class ExactIndex(BaseIndex):
                 total += int(value_count_current)
         return total  # note : this is an over estimation
 
+    def count(self, txn, filters):
+        # Only possible when filters are exactly : index partial filters + exact/in lookups on every index field
+        # (and only for string values : other values may be equal without having the same normalized value, i.e 1 and 1.0)
+        filters = dict(filters)
+        for key, value in self._filter_items:
+            if key not in filters or filters.pop(key) != value:
+                return None
+        fields = [key.split('__')[0] for key in filters]
+        if len(fields) != len(set(fields)) or set(fields) != self._set_fields:
+            return None
+        for key in filters:
+            lst = key.split('__')
+            if len(lst) > 2 or (len(lst) == 2 and lst[1] not in ('exact', 'in')):
+                return None
+        try:
+            exact_values = get_exact_values(**filters)
+        except TypeError:
+            return None
+        for values in exact_values.values():
+            for value in values:
+                if not isinstance(value, STRING_TYPES):
+                    return None
+        normalized_values = set(normalize_value(list(values)) for values in product(*[exact_values[field] for field in self._fields]))
+        total = 0
+        for value in normalized_values:
+            live_count = self._graph._get(txn, build_key(self._prefix, EXACT_LIVE_COUNT_SUFFIX, value))
+            if live_count == UNDEFINED:
+                if self._graph._get(txn, build_key(self._prefix, COUNT_SUFFIX, value)) != UNDEFINED:
+                    return None  # index built before live counters existed
+                continue
+            total += int(live_count)
+        return total
+
     def ids(self, txn, filters):
         resulting_filters = self._compatible_filters(filters)
         if resulting_filters is False:
@@ -198,3 +362,267 @@ class ExactIndex(BaseIndex):
                     if entity_ids != UNDEFINED:
                         for entity_id in entity_ids:
                             yield entity_id
+
+
+class RangeIndex(BaseIndex):
+    """
+    Index on a single field, usable for exact, in, gt, gte, lt, lte and startswith lookups
+
+    Entries are [rank, value, entity_id] lists, kept sorted in chunks (called runs) :
+      <prefix>/h          : header [next run number, [[run number, first entry, entry count], ...]] (runs are in entry order)
+      <prefix>/r/<number> : a sorted run (between 1 and 2 * CHUNK_SIZE entries)
+      <prefix>/<id>       : [rank, value] of an entity (needed to find it back in runs when it is removed)
+    """
+
+    _index_type = RANGE_INDEX
+
+    def __init__(self, _graph, _kind, _prefix, field):
+        super(RangeIndex, self).__init__(_graph, _kind, _prefix)
+        self._field = field
+        self._fields = [field]
+        self._filter_items = set()
+        self._dependencies = set([field])
+
+    def delete(self, txn):
+        """
+        delete the index
+        """
+        self._graph._remove_prefix(txn, build_key(self._prefix, ''))
+
+    def _entry(self, entity_id, data):
+        value = data.get(self._field, None)
+        rank = rank_value(value)
+        if rank is None:
+            return None
+        return [rank, value, entity_id]
+
+    def _get_header(self, txn):
+        header = self._graph._get(txn, build_key(self._prefix, RANGE_HEADER_SUFFIX))
+        if header == UNDEFINED:
+            header = [0, []]
+        return header
+
+    def _get_run(self, txn, number):
+        return self._graph._get(txn, build_key(self._prefix, RANGE_RUN_SUFFIX, number))
+
+    def _first_entries(self, directory):
+        # first entry of each run (built once, then bisected by _run_position for every entry)
+        return [first for _, first, _ in directory]
+
+    def _run_position(self, first_entries, entry):
+        # position of the run that should contain entry
+        return max(0, bisect_right(first_entries, entry) - 1)
+
+    def _save_runs(self, txn, header, position, entries):
+        # Replacing directory[position] (if it exists) with runs made of (sorted) entries
+        # A run is splitted as soon as it exceeds 2 * CHUNK_SIZE entries
+        directory = header[1]
+        pieces = [entries]
+        if len(entries) > 2 * CHUNK_SIZE:
+            pieces = [entries[i:i + CHUNK_SIZE] for i in range(0, len(entries), CHUNK_SIZE)]
+        new_directory_items = []
+        for idx, piece in enumerate(pieces):
+            if idx == 0 and position < len(directory):
+                number = directory[position][0]
+            else:
+                number = header[0]
+                header[0] += 1
+            self._graph._set(txn, build_key(self._prefix, RANGE_RUN_SUFFIX, number), piece)
+            new_directory_items.append([number, piece[0], len(piece)])
+        directory[position:position + 1] = new_directory_items
+
+    def bulk_add(self, txn, id_iterator):
+        kind = self._kind
+        entries = []
+        entity_dict = {}
+        for entity_ids in zip_longest(*([id_iterator] * CHUNK_SIZE), fillvalue=FORBIDDEN_KEY):
+            entity_ids = [entity_id for entity_id in entity_ids if entity_id != FORBIDDEN_KEY]
+            entity_datas = self._graph._bulk_get(txn, [build_key(kind, entity_id, DATA_SUFFIX) for entity_id in entity_ids])
+            for entity_id in entity_ids:
+                data = entity_datas.get(build_key(kind, entity_id, DATA_SUFFIX), None)
+                if data is None:  # pragma : no cover
+                    continue
+                entry = self._entry(entity_id, data)
+                if entry is not None:
+                    entries.append(entry)
+                    entity_dict[build_key(self._prefix, entity_id)] = entry[:2]
+        if not entries:
+            return
+        entries.sort()
+        header = self._get_header(txn)
+        directory = header[1]
+        if not directory:
+            self._save_runs(txn, header, 0, entries)
+        else:
+            # Grouping new entries by run, then merging each run (starting from the last one, so that
+            # splitting a run doesn't shift positions of runs that have not been merged yet)
+            first_entries = self._first_entries(directory)
+            entries_by_position = defaultdict(list)
+            for entry in entries:
+                entries_by_position[self._run_position(first_entries, entry)].append(entry)
+            for position in sorted(entries_by_position.keys(), reverse=True):
+                run = self._get_run(txn, directory[position][0]) + entries_by_position[position]
+                run.sort()
+                self._save_runs(txn, header, position, run)
+        self._graph._set(txn, build_key(self._prefix, RANGE_HEADER_SUFFIX), header)
+        self._graph._bulk_set(txn, entity_dict)
+
+    def add(self, txn, entity_id, data):
+        entry = self._entry(entity_id, data)
+        if entry is None:
+            return
+        header = self._get_header(txn)
+        directory = header[1]
+        run = []
+        position = 0
+        if directory:
+            position = self._run_position(self._first_entries(directory), entry)
+            run = self._get_run(txn, directory[position][0])
+        run.insert(bisect_left(run, entry), entry)
+        self._save_runs(txn, header, position, run)
+        self._graph._set(txn, build_key(self._prefix, RANGE_HEADER_SUFFIX), header)
+        self._graph._set(txn, build_key(self._prefix, entity_id), entry[:2])
+
+    def remove(self, txn, entity_id):
+        entity_key = build_key(self._prefix, entity_id)
+        rank_and_value = self._graph._get(txn, entity_key)
+        if rank_and_value == UNDEFINED:
+            return
+        entry = list(rank_and_value) + [entity_id]
+        header = self._get_header(txn)
+        directory = header[1]
+        if directory:
+            position = self._run_position(self._first_entries(directory), entry)
+            number = directory[position][0]
+            run = self._get_run(txn, number)
+            idx = bisect_left(run, entry)
+            if idx < len(run) and run[idx] == entry:
+                del run[idx]
+                if run:
+                    self._save_runs(txn, header, position, run)
+                else:
+                    self._graph._remove(txn, build_key(self._prefix, RANGE_RUN_SUFFIX, number))
+                    del directory[position]
+                self._graph._set(txn, build_key(self._prefix, RANGE_HEADER_SUFFIX), header)
+        self._graph._remove(txn, entity_key)
+
+    def bulk_remove(self, txn, entity_ids):
+        # Same as remove for many entities, but each run is only rewritten once
+        entity_keys = [build_key(self._prefix, entity_id) for entity_id in entity_ids]
+        ranks_and_values = self._graph._bulk_get(txn, entity_keys)
+        if not ranks_and_values:
+            return
+        header = self._get_header(txn)
+        directory = header[1]
+        if directory:
+            first_entries = self._first_entries(directory)
+            entries_by_position = defaultdict(set)
+            for entity_id, entity_key in zip(entity_ids, entity_keys):
+                if entity_key in ranks_and_values:
+                    entry = list(ranks_and_values[entity_key]) + [entity_id]
+                    entries_by_position[self._run_position(first_entries, entry)].add(tuple(entry))
+            # (starting from the last run, so that removing a run doesn't shift positions of runs that have not been processed yet)
+            for position in sorted(entries_by_position.keys(), reverse=True):
+                number = directory[position][0]
+                removed_entries = entries_by_position[position]
+                run = [entry for entry in self._get_run(txn, number) if tuple(entry) not in removed_entries]
+                if run:
+                    self._save_runs(txn, header, position, run)
+                else:
+                    self._graph._remove(txn, build_key(self._prefix, RANGE_RUN_SUFFIX, number))
+                    del directory[position]
+            self._graph._set(txn, build_key(self._prefix, RANGE_HEADER_SUFFIX), header)
+        self._graph._bulk_remove(txn, list(ranks_and_values.keys()))
+
+    def _ranges(self, filters):
+        """
+        Returns the (sorted, disjoint) list of [low, high[ entry intervals matching filters on index field
+        or None if this index can't be used for those filters
+        """
+        low, high = [NUMBER_RANK], [RANK_COUNT]
+        points = None
+        competent = False
+        for key, value in list(filters.items()):
+            lst = key.split('__')
+            if len(lst) > 2 or lst[0] != self._field:
+                continue
+            clause = lst[1] if len(lst) == 2 else 'exact'
+            if clause not in RANGE_LOOKUPS:
+                continue
+            if clause in ('exact', 'in'):
+                try:
+                    values = [value] if clause == 'exact' else list(value)
+                except TypeError:
+                    return None
+                ranks = [rank_value(v) for v in values]
+                if None in ranks:
+                    # value(s) that can't be found in index (but that may match some entities)
+                    return None
+                if points is None:
+                    points = [[[rank, v], [rank, v, AFTER_ANY_ID]] for rank, v in zip(ranks, values)]
+            else:
+                rank = rank_value(value)
+                if rank is None:
+                    return None
+                if clause == 'gt':
+                    bounds = [rank, value, AFTER_ANY_ID], [rank + 1]
+                elif clause == 'gte':
+                    bounds = [rank, value], [rank + 1]
+                elif clause == 'lt':
+                    bounds = [rank], [rank, value]
+                elif clause == 'lte':
+                    bounds = [rank], [rank, value, AFTER_ANY_ID]
+                else:  # startswith
+                    if rank != STRING_RANK:
+                        return None
+                    upper_bound = prefix_upper_bound(value)
+                    bounds = [rank, value], ([rank + 1] if upper_bound is None else [rank, upper_bound])
+                low, high = max(low, bounds[0]), min(high, bounds[1])
+            competent = True
+        if not competent:
+            return None
+        if points is None:
+            points = [[low, high]]
+        intervals = []
+        for point_low, point_high in sorted([max(low, l), min(high, h)] for l, h in points):
+            if point_low >= point_high:
+                continue
+            if intervals and point_low <= intervals[-1][1]:
+                intervals[-1][1] = max(intervals[-1][1], point_high)
+            else:
+                intervals.append([point_low, point_high])
+        return intervals
+
+    def _runs_for_intervals(self, directory, intervals):
+        # yields (directory position, low, high) for every run that may contain entries of intervals
+        first_entries = self._first_entries(directory)
+        for low, high in intervals:
+            position = self._run_position(first_entries, low)
+            while position < len(directory) and directory[position][1] < high:
+                yield position, low, high
+                position += 1
+
+    def estimate(self, txn, filters):
+        intervals = self._ranges(filters)
+        if intervals is None:
+            return -1  # -1 says that this index shouldn't be used
+        directory = self._get_header(txn)[1]
+        return sum(directory[position][2] for position, _, _ in self._runs_for_intervals(directory, intervals))  # note : this is an over estimation
+
+    def ids(self, txn, filters):
+        intervals = self._ranges(filters)
+        if intervals is None:
+            raise GrapheekIncompetentIndexException("This index shouldn't have been used")
+        directory = self._get_header(txn)[1]
+        for position, low, high in self._runs_for_intervals(directory, intervals):
+            run = self._get_run(txn, directory[position][0])
+            if run == UNDEFINED:  # pragma : no cover
+                continue
+            for entry in run[bisect_left(run, low):bisect_left(run, high)]:
+                yield entry[2]
+
+
+INDEX_CLASSES = {
+    EXACT_INDEX: ExactIndex,
+    RANGE_INDEX: RangeIndex,
+}
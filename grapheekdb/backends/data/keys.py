@@ -20,6 +20,7 @@ Here is the keys tree :
 │   │   ├── il                (m/e/il) edge indexes list
 │   │   ├── if                (m/e/if) edge indexes fields
 │   │   │   └── <id>          (m/e/i/<id>) edge index id fields
+│   │   ├── vc                (m/e/vc) edge fields having a vertex centric index
 │   │   └── i                 index
 │   │       └── *key sorted   (m/e/i/*sorted_key)  indexes
 │   └── v                     vertex (aka node)
@@ -54,16 +55,23 @@ Here is the keys tree :
     └── <id>                  vertex id
         ├── d                 vertex data
         ├── i                 vertex indexes containing this vertex (this is a list of index ids)
-        ├── ie                incoming edges
-        │   └── c             incoming edges count
+        ├── ie                incoming edges (when more than 1000 edges : a header describing chunks)
+        │   ├── c             incoming edges count
+        │   ├── lc            list chunks (only for big lists)
+        │   │   └── <n>       (v/<id>/ie/lc/<n>) a chunk of max 1000 edge ids
+        │   └── vc            vertex centric lists (same as v/<id>/oe/vc, for incoming edges)
         ├── iv                incoming vertices
         │   └── c             incoming vertices count
         ├── oe                outgoing edges
-        │   └── c             outgoing edges count
+        │   ├── c             outgoing edges count
+        │   └── vc            vertex centric lists (only if some vertex centric indexes exist)
+        │       └── <field>   edge field
+        │           └── <val> (v/<id>/oe/vc/<field>/<normalized value>) outgoing edges having this value
         ├── ov                outgoing vertices
         │   └── c             outgoing vertices count
         ├── be                both edges
-        │   └── c             both edges count
+        │   ├── c             both edges count
+        │   └── vc            vertex centric lists (same as v/<id>/oe/vc, for both edges)
         └── bv                both vertices
             └── c             both vertices count
 
@@ -83,6 +91,7 @@ METADATA_EDGE_INDEX_COUNTER         = 'm/e/ci'
 METADATA_EDGE_INDEX_LIST            = 'm/e/il'
 METADATA_EDGE_INDEX_FIELDS_PREFIX   = 'm/e/if'
 METADATA_EDGE_INDEX_PREFIX          = 'm/e/i'
+METADATA_EDGE_VERTEX_CENTRIC_LIST   = 'm/e/vc'
 METADATA_VERTEX_COUNTER             = 'm/v/c'
 METADATA_VERTEX_REMOVED_COUNTER     = 'm/v/r'
 METADATA_VERTEX_ID_LIST_PREFIX      = 'm/v/id'
@@ -100,6 +109,8 @@ BOTH_EDGES_SUFFIX                   = 'be'
 BOTH_VERTICES_SUFFIX                = 'bv'
 COUNT_SUFFIX                        = 'c'
 COUNT_REMOVE_SUFFIX                 = 'r'
+VERTEX_CENTRIC_SUFFIX               = 'vc'
+LIST_CHUNK_SUFFIX                   = 'lc'
 
 KIND_EDGE                           = 'e'
 KIND_VERTEX                         = 'v'
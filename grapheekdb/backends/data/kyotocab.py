@@ -6,7 +6,8 @@ import msgpack
 
 from kyotocabinet import DB
 
-from grapheekdb.backends.data.base import BaseGraph
+from grapheekdb.backends.data.base import BaseGraph, remove_each
+from grapheekdb.backends.data.listcodec import pack_ints, unpack_ints
 from grapheekdb.lib.exceptions import GrapheekDataException
 
 from grapheekdb.lib.undef import UNDEFINED
@@ -23,6 +24,9 @@ class GrapheekDataKyotoCabinetInitFailureException(GrapheekDataKyotoCabinetExcep
 
 class KyotoCabinetGraph(BaseGraph):
 
+    _concurrent_reads = True
+    _transactional = True
+
     def __init__(self, path):
         # create the database object
         self._path = path
@@ -103,12 +107,12 @@ class KyotoCabinetGraph(BaseGraph):
         self._db.remove_bulk(keys)
 
     # overriding list methods
-    # looks like a bucket of hacks, and yes indeed it is :)
-    # btw, it REALLY improves performance if we compare to default implementation which,
-    # in the case of KyotoCabinet would involve msgpack deserialization followed by a serialization
+    # lists are stored as raw packed integers (see listcodec module) and are never chunked :
+    # KyotoCabinet can append to an existing value, so appending an id never requires reading the list
+    # and decoding a list is a single struct.unpack call (no msgpack deserialization, no string parsing)
 
     def _init_lst(self, txn, key):
-        res = self._db.set(key, '')
+        res = self._db.set(key, b'')
         if not(res):  # pragma : no cover
             raise GrapheekDataKyotoCabinetException('KyotoCabinet : error while saving')
         return res
@@ -117,15 +121,10 @@ class KyotoCabinetGraph(BaseGraph):
         value = self._db.get(key)
         if value is None:
             return UNDEFINED
-        # look _append_to_lst code below to understand why a split is done
-        # And why resulting list is sliced from 1
-        if PYTHON2:  # pragma : no cover
-            return list(map(int, value.split('|')[1:]))
-        return list(map(int, str(value, encoding='utf8').split('|')[1:]))  # pragma : no cover
+        return unpack_ints(value)
 
     def _set_lst(self, txn, key, values):
-        newval = '|'.join([str(value) for value in values])
-        res = self._db.set(key, '|' + newval)
+        res = self._db.set(key, pack_ints(values))
         if not(res):  # pragma : no cover
             raise GrapheekDataKyotoCabinetException('KyotoCabinet : error while saving')
         return res
@@ -141,47 +140,32 @@ class KyotoCabinetGraph(BaseGraph):
             if values == UNDEFINED:
                 results.append([])
             else:
-                if PYTHON2:  # pragma : no cover
-                    results.append(list(map(int, values.split('|')[1:])))
-                else:  # pragma : no cover
-                    results.append(list(map(int, str(values, encoding='utf8').split('|')[1:])))
+                results.append(unpack_ints(values))
         return results
 
     def _append_to_lst(self, txn, key, value):
-        self._db.append(key, '|' + str(value))
+        self._db.append(key, pack_ints([value]))
 
     def _bulk_append_to_lst(self, txn, key, values):
-        newval = '|'.join([str(value) for value in values])
-        self._db.append(key, '|' + newval)
+        self._db.append(key, pack_ints(values))
 
     def _remove_from_lst(self, txn, key, value):
-        old = self._db.get(key)
-        if not PYTHON2:  # pragma : no cover
-            old = str(old, encoding='utf8')
+        self._bulk_remove_from_lst(txn, key, [value])
+
+    def _bulk_remove_from_lst(self, txn, key, values):
+        lst = unpack_ints(self._db.get(key))
         # Caution : we are only removing ONE occurence
         # This is voluntary
         # For instance, it lst contains neighbour node, we need to remove only one occurence
         # cause current entity and neighbour node can be linked multiple time
-        new = old.replace('|%s' % value, '', 1)
-        if new == old:
-            raise ValueError("list.remove(x): x not in list")
-        res = self._db.set(key, new)
+        lst = remove_each(lst, values)
+        res = self._db.set(key, pack_ints(lst))
         if not(res):  # pragma : no cover
             raise GrapheekDataKyotoCabinetException('KyotoCabinet : error while saving')
         return res
 
-    def _bulk_remove_from_lst(self, txn, key, values):
-        assert(len(values))
-        old = self._db.get(key)
-        if PYTHON2:  # pragma : no cover
-            new = old
-        else:  # pragma : no cover
-            new = str(old, encoding='utf8')
-        for value in values:
-            new = new.replace('|%s' % value, '', 1)
-        if new == old:  # pragma : no cover
-            raise ValueError("list.remove(x): x not in list")
-        res = self._db.set(key, new)
-        if not(res):  # pragma : no cover
-            raise GrapheekDataKyotoCabinetException('KyotoCabinet : error while saving')
-        return res
+    def _remove_lst(self, txn, key):
+        self._remove(txn, key)
+
+    def _bulk_remove_lst(self, txn, keys):
+        self._bulk_remove(txn, keys)
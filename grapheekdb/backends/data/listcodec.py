@@ -0,0 +1,49 @@
+# -*- coding:utf-8 -*-
+
+"""
+Binary codec for id lists (adjacency lists, id lists, index chunks...)
+
+All values stored in these lists are integers, so instead of serializing them
+with msgpack or json, persistent backends store them as fixed width (8 bytes)
+little endian signed integers :
+
+- a plain list is just the packed values (thus its length is a multiple of 8),
+  which also means that a value can be appended to a raw list by appending its packed form
+- a chunked list header {'n': next chunk number, 'c': [[chunk number, length, min value, max value], ...]}
+  is packed as [next chunk number, chunk number, length, min value, max value, ...]
+  followed by a single marker byte (thus its length is NOT a multiple of 8)
+"""
+
+import struct
+
+INT_SIZE = 8
+HEADER_MARKER = b'h'
+
+
+def pack_ints(values):
+    return struct.pack('<%dq' % len(values), *values)
+
+
+def unpack_ints(raw, length=None):
+    # raw may be bytes or any object supporting the buffer protocol (memoryview, lmdb buffer...)
+    # -> values are decoded without copying raw data
+    if length is None:
+        length = len(raw)
+    return list(struct.unpack_from('<%dq' % (length // INT_SIZE), raw))
+
+
+def pack_lst(value):
+    if isinstance(value, dict):
+        ints = [value['n']]
+        for chunk_info in value['c']:
+            ints.extend(chunk_info)
+        return pack_ints(ints) + HEADER_MARKER
+    return pack_ints(value)
+
+
+def unpack_lst(raw):
+    length = len(raw)
+    if length % INT_SIZE == 0:
+        return unpack_ints(raw, length)
+    ints = unpack_ints(raw, length - 1)
+    return {'n': ints[0], 'c': [ints[idx:idx + 4] for idx in range(1, len(ints), 4)]}
@@ -1,12 +1,14 @@
 # -*- coding:utf-8 -*-
 
-from grapheekdb.backends.data.base import BaseGraph
+from grapheekdb.backends.data.base import BaseGraph, remove_each
 
 from grapheekdb.lib.undef import UNDEFINED
 
 
 class LocalMemoryGraph(BaseGraph):
 
+    _concurrent_reads = True
+
     def __init__(self):
         self._dic = {}
         super(LocalMemoryGraph, self).__init__()
@@ -65,6 +67,33 @@ class LocalMemoryGraph(BaseGraph):
         for key in remove_keys:
             self._remove(txn, key)
 
+    # Lists are kept as plain (in memory) lists, there's no need to chunk them :
+
+    def _get_lst(self, txn, key):
+        return self._get(txn, key)
+
+    def _set_lst(self, txn, key, values):
+        self._set(txn, key, values)
+
+    def _bulk_get_lst(self, txn, keys):
+        return [self._get(txn, key) for key in keys]
+
+    def _remove_from_lst(self, txn, key, value):
+        # (removal is not done in place, iterators may be iterating on current list)
+        new = self._get(txn, key)[:]
+        new.remove(value)
+        self._set(txn, key, new)
+
+    def _bulk_remove_from_lst(self, txn, key, values):
+        # (a new list is built : current list is left untouched)
+        self._set(txn, key, remove_each(self._get(txn, key), values))
+
+    def _remove_lst(self, txn, key):
+        self._remove(txn, key)
+
+    def _bulk_remove_lst(self, txn, keys):
+        self._bulk_remove(txn, keys)
+
     def _append_to_lst(self, txn, key, value):
         lst = self._get(txn, key)
         if lst == UNDEFINED:
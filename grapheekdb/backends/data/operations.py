@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from collections import defaultdict
+from itertools import chain
 
 
 class Addition(object):
@@ -43,6 +44,7 @@ class Addition(object):
             graph._bulk_append_to_lst(txn, key, entity_ids)
         # Adding key value :
         graph._bulk_set(txn, self._set_registry)
+        graph._invalidate_cache(chain(self._init_lst_registry, self._append_to_lst_registry, self._set_registry))
         # ---
         self._applied = True
         # Increasing value
@@ -57,6 +59,8 @@ class Removal(object):
         self._update_inc_registry = defaultdict(int)
         self._update_dec_registry = defaultdict(int)
         self._remove_registry = set()
+        self._remove_lst_registry = set()
+        self._drop_empty_lst_registry = set()
         self._applied = False
 
     def merge(self, other):
@@ -67,31 +71,49 @@ class Removal(object):
         for key, value in other._update_dec_registry.items():
             self._update_dec_registry[key] += value
         self._remove_registry.update(other._remove_registry)
+        self._remove_lst_registry.update(other._remove_lst_registry)
+        self._drop_empty_lst_registry.update(other._drop_empty_lst_registry)
 
     def remove_from_lst(self, key, entity_id):
         self._remove_from_lst_registry[key].append(entity_id)
 
-    def update_inc(self, key):
-        self._update_inc_registry[key] += 1
+    def update_inc(self, key, value=1):
+        self._update_inc_registry[key] += value
 
-    def update_dec(self, key):
-        self._update_dec_registry[key] += 1
+    def update_dec(self, key, value=1):
+        self._update_dec_registry[key] += value
 
     def remove(self, key):
         self._remove_registry.add(key)
 
+    def remove_lst(self, key):
+        self._remove_lst_registry.add(key)
+
+    def drop_lst_if_empty(self, key):
+        # list is removed if it is empty once values are removed
+        self._drop_empty_lst_registry.add(key)
+
     def apply(self, txn, graph):
         assert(not(self._applied))
-        # Removing entity_ids from lists
+        # Removing entity_ids from lists (lists that are removed as a whole are left untouched)
         for key, entity_ids in self._remove_from_lst_registry.items():
-            graph._bulk_remove_from_lst(txn, key, entity_ids)
-        # Increasing value
+            if key not in self._remove_lst_registry:
+                graph._bulk_remove_from_lst(txn, key, entity_ids)
+        for key in self._drop_empty_lst_registry - self._remove_lst_registry:
+            if graph._load_lst(txn, key) == []:
+                self._remove_lst_registry.add(key)
+        # Increasing value (same thing for removed keys)
         for key, value in self._update_inc_registry.items():
-            graph._update_inc(txn, key, value)
+            if key not in self._remove_registry:
+                graph._update_inc(txn, key, value)
         # Decreasing value
         for key, value in self._update_dec_registry.items():
-            graph._update_dec(txn, key, value)
+            if key not in self._remove_registry:
+                graph._update_dec(txn, key, value)
         # Removing keys :
         graph._bulk_remove(txn, self._remove_registry)
+        if self._remove_lst_registry:
+            graph._bulk_remove_lst(txn, self._remove_lst_registry)
+        graph._invalidate_cache(chain(self._remove_from_lst_registry, self._remove_registry, self._remove_lst_registry))
         # ---
         self._applied = True
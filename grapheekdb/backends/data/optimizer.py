@@ -9,6 +9,9 @@ from grapheekdb.backends.data.keys import METADATA_EDGE_ID_LIST_PREFIX, METADATA
 from grapheekdb.backends.data.keys import CHUNK_SIZE
 from grapheekdb.backends.data.keys import build_key
 
+# Number of id lists (of at most <CHUNK_SIZE> ids) read at once when scanning every entity
+ID_LIST_WINDOW_SIZE = 16
+
 
 def choose_index_or_scan(seq_count, indexes, filters):
     """
@@ -51,11 +54,25 @@ class Optimizer(object):
         METADATA_ID_LIST_PREFIX = METADATA_VERTEX_ID_LIST_PREFIX if kind == KIND_VERTEX else METADATA_EDGE_ID_LIST_PREFIX
         limit = int(self._graph._get(None, ENTITY_COUNTER)) // CHUNK_SIZE
         keys = [build_key(METADATA_ID_LIST_PREFIX, i) for i in range(0, limit + 1)]
-        list_entity_ids = self._graph._bulk_get_lst(txn, keys)
-        for entity_ids in list_entity_ids:
-            if entity_ids != UNDEFINED:
-                for entity_id in entity_ids:
-                    yield entity_id
+        # Reading id lists by windows (so that scanning every entity doesn't load every id at once) :
+        for idx in range(0, len(keys), ID_LIST_WINDOW_SIZE):
+            list_entity_ids = self._graph._bulk_get_lst(txn, keys[idx:idx + ID_LIST_WINDOW_SIZE])
+            for entity_ids in list_entity_ids:
+                if entity_ids != UNDEFINED:
+                    for entity_id in entity_ids:
+                        yield entity_id
+
+    def index_count(self, _kind, **filters):
+        """
+        Returns the number of entities matching filters, as counted by an index,
+        or None if no index is able to count them without reading entities
+        """
+        indexes = self._graph._node_indexes if _kind == KIND_VERTEX else self._graph._edge_indexes
+        for index in indexes:
+            count = index.count(None, filters)
+            if count is not None:
+                return count
+        return None
 
     def index_or_seq_scan_iterator(self, _kind, _seq_count, **filters):
 
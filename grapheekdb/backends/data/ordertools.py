@@ -6,15 +6,56 @@ from grapheekdb.lib.exceptions import GrapheekInvalidExpression
 CLAUSE_REGEXP = re.compile(r'''(?P<direction>\-|\+)?(?P<field>[a-zA-Z][a-zA-Z_]*)''')
 
 
-def build_order_func(*clauses):
-    comparers = []
+def parse_order_clauses(*clauses):
+    """
+    Returns the list of (field, ascending) pairs described by clauses ('field', '+field' or '-field')
+    """
+    order_fields = []
     for clause in clauses:
         m = CLAUSE_REGEXP.match(clause)
         if m is None:
             raise GrapheekInvalidExpression
-        ascending = m.group('direction') != '-'
-        field = m.group('field')
-        comparers.append((field, 1 if ascending else -1))
+        order_fields.append((m.group('field'), m.group('direction') != '-'))
+    return order_fields
+
+
+class Descending(object):
+    """
+    Wraps a value so that it is sorted in reverse order inside an order key
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __ne__(self, other):
+        return self.value != other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __gt__(self, other):
+        return other.value > self.value
+
+
+def build_order_key(*clauses):
+    """
+    Returns a key function turning entity data into a tuple made of ordered fields only
+    """
+    order_fields = parse_order_clauses(*clauses)
+
+    def order_key(data):
+        return tuple(data.get(field, None) if ascending else Descending(data.get(field, None)) for field, ascending in order_fields)
+
+    return order_key
+
+
+def build_order_func(*clauses):
+    comparers = [(field, 1 if ascending else -1) for field, ascending in parse_order_clauses(*clauses)]
 
     def comparer(item1, item2):
         for field, multiplier in comparers:
@@ -7,6 +7,7 @@ CAUTION : shelve is missing transactions, so graph can progressively become inco
 
 import shelve
 from grapheekdb.backends.data.base import BaseGraph
+from grapheekdb.backends.data.listcodec import pack_lst, unpack_lst
 from grapheekdb.lib.undef import UNDEFINED
 
 
@@ -77,21 +78,21 @@ class ShelveGraph(BaseGraph):
         for key in remove_keys:
             self._remove(txn, key)
 
-    def _append_to_lst(self, txn, key, value):
-        lst = self._get(txn, key)
-        if lst == UNDEFINED:
-            lst = [value]
-            self._set(txn, key, lst)
-        else:
-            lst.append(value)
-            self._set(txn, key, lst)
-
-    def _bulk_append_to_lst(self, txn, key, value):
-        lst = self._get(txn, key)
-        if lst == UNDEFINED:
-            lst = []
-            lst.extend(value)
-            self._set(txn, key, lst)
-        else:
-            lst.extend(value)
-            self._set(txn, key, lst)
+    # overriding list storage : id lists are pickled as bytes (binary list codec) rather than as python lists
+
+    def _load_lst(self, txn, key):
+        try:
+            return unpack_lst(self._db[key])
+        except KeyError:
+            return UNDEFINED
+
+    def _bulk_load_lst(self, txn, keys):
+        result = {}
+        for key in keys:
+            value = self._load_lst(txn, key)
+            if value != UNDEFINED:
+                result[key] = value
+        return result
+
+    def _store_lst(self, txn, key, value):
+        self._db[key] = pack_lst(value)
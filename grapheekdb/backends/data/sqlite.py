@@ -2,26 +2,75 @@
 
 """
 Initially contributed by Edwin Cox
-CAUTION : given the sqlite3 autocommit feature, I (raphael) cannot ensure that graph won't become inconsistent
+Transactions are explicit (BEGIN / COMMIT / ROLLBACK) : the sqlite3 module autocommit feature is disabled
 """
 
+import re
 import sys
 import sqlite3
 import json
+from collections import defaultdict
+
+import msgpack
+
 from grapheekdb.backends.data.base import BaseGraph
+from grapheekdb.backends.data.indexes import prefix_upper_bound
+from grapheekdb.backends.data.keys import KIND_EDGE, KIND_VERTEX, DATA_SUFFIX
+from grapheekdb.backends.data.keys import IN_EDGES_SUFFIX, IN_VERTICES_SUFFIX, OUT_EDGES_SUFFIX, OUT_VERTICES_SUFFIX
+from grapheekdb.backends.data.keys import BOTH_EDGES_SUFFIX, BOTH_VERTICES_SUFFIX
+from grapheekdb.backends.data.listcodec import pack_lst, unpack_lst
+from grapheekdb.lib.exceptions import GrapheekDataException
 from grapheekdb.lib.undef import UNDEFINED
 
 PYTHON2 = sys.version_info.major == 2
 
+# Number of keys bound in a single "in (...)" statement (SQLite limits the number of variables per statement) :
+MAX_VARIABLES = 500
+
+# UPSERT is available since SQLite 3.24 :
+if sqlite3.sqlite_version_info >= (3, 24, 0):
+    SET_STATEMENT = "insert into storage (key, value) values (?,?) on conflict(key) do update set value = excluded.value"
+else:  # pragma : no cover
+    SET_STATEMENT = "insert or replace into storage (key, value) values (?,?)"
+
+
+# Keys stored in vertices and edges tables by RelationalSqliteGraph (entity data and adjacency lists) :
+RELATIONAL_KEY_REGEXP = re.compile('^(%s)/([0-9]+)/(%s)$' % (
+    '|'.join([KIND_VERTEX, KIND_EDGE]),
+    '|'.join([DATA_SUFFIX, IN_EDGES_SUFFIX, IN_VERTICES_SUFFIX, OUT_EDGES_SUFFIX, OUT_VERTICES_SUFFIX, BOTH_EDGES_SUFFIX, BOTH_VERTICES_SUFFIX])))
+
+ENTITY_TABLES = {KIND_VERTEX: 'vertices', KIND_EDGE: 'edges'}
+
+# Vertex lists built from out edges (src = vertex) and from in edges (tgt = vertex) :
+OUT_SUFFIXES = (OUT_EDGES_SUFFIX, OUT_VERTICES_SUFFIX, BOTH_EDGES_SUFFIX, BOTH_VERTICES_SUFFIX)
+IN_SUFFIXES = (IN_EDGES_SUFFIX, IN_VERTICES_SUFFIX, BOTH_EDGES_SUFFIX, BOTH_VERTICES_SUFFIX)
+
+
+def in_chunks(values):
+    # Yields (chunk, "?,?,...") : values by chunks of at most MAX_VARIABLES values, with their placeholders
+    values = list(values)
+    for idx in range(0, len(values), MAX_VARIABLES):
+        chunk = values[idx:idx + MAX_VARIABLES]
+        yield chunk, ",".join("?" * len(chunk))
+
 
 class SqliteGraph(BaseGraph):
 
-    def __init__(self, filename):
+    _transactional = True
+
+    def __init__(self, filename, fast=False):
+        """
+        With fast=True, the database uses a WAL journal and values are stored as msgpack blobs instead of json text
+        (a database must always be opened with the same fast value)
+        """
         # create the database object
         self._filename = filename
+        self._fast = fast
         # open the database
 
-        self._db = sqlite3.connect(filename)
+        # (the connection may be used by server worker threads, one request at a time)
+        # isolation_level=None : transactions are managed by _transaction_begin/commit/rollback
+        self._db = sqlite3.connect(filename, check_same_thread=False, isolation_level=None)
         self._initialize_db()
         super(SqliteGraph, self).__init__()
         self._ensure_prepared()
@@ -29,21 +78,50 @@ class SqliteGraph(BaseGraph):
 
     def _initialize_db(self):
         self._c = self._db.cursor()
+        if self._fast:
+            self._c.execute("pragma journal_mode = wal")
+            self._c.execute("pragma synchronous = normal")
         self._c.execute("create table if not exists storage (key text PRIMARY KEY not null, value text)")
 
+    def _dumps(self, value):
+        if self._fast:
+            return sqlite3.Binary(msgpack.dumps(value, encoding='utf8'))
+        if PYTHON2:
+            return sqlite3.Binary(json.dumps(value, encoding='utf8'))
+        return json.dumps(value)
+
+    def _loads(self, raw_data):
+        if self._fast:
+            return msgpack.loads(raw_data, encoding='utf8')
+        if PYTHON2:
+            return json.loads(str(raw_data), encoding='utf8')
+        return json.loads(str(raw_data))
+
+    def _select(self, keys):
+        # Yields (key, raw value) of existing keys
+        c = self._db.cursor()
+        for chunk, placeholders in in_chunks(keys):
+            for line in c.execute("select key,value from storage where key in (%s)" % (placeholders,), chunk):
+                yield line
+
     # Start method overriding :
 
     def _db_close(self):
         self._db.close()
 
     def _transaction_begin(self):
+        # immediate : the write lock is acquired at once (instead of failing at first write if another connection writes)
+        self._c.execute("begin immediate")
         return True
 
     def _transaction_commit(self, txn):
-        self._db.commit()
+        self._c.execute("commit")
 
     def _transaction_rollback(self, txn):
-        self._db.rollback()
+        try:
+            self._c.execute("rollback")
+        except sqlite3.OperationalError:
+            pass  # transaction was not started (or was already rolled back by SQLite)
 
     def _has_key(self, key):
         c = self._c
@@ -56,49 +134,18 @@ class SqliteGraph(BaseGraph):
         c.execute("select value from storage where key= ?", (key,))
         raw_data = c.fetchone()
         if not (raw_data is None):
-            data = str(raw_data[0])
-            if PYTHON2:
-                return json.loads(data, encoding='utf8')
-            else:
-                return json.loads(data)
+            return self._loads(raw_data[0])
         else:
             return UNDEFINED  # Not returning None, as None is a valid value
 
     def _bulk_get(self, txn, keys):
-        c = self._c
-        result = {}
-        for line in c.execute("select key,value from storage where key in (" + ",".join("'{0}'".format(w) for w in keys) + ")"):
-            k = line[0]
-            if PYTHON2:
-                result[k] = json.loads(str(line[1]), encoding='utf8')
-            else:
-                result[k] = json.loads(str(line[1]))
-        return result
+        return dict((key, self._loads(raw_data)) for key, raw_data in self._select(keys))
 
     def _set(self, txn, key, value):
-        if PYTHON2:
-            d = json.dumps(value, encoding='utf8')
-        else:
-            d = json.dumps(value)
-        c = self._c
-        c.execute("delete from storage where key = ?", (key,))
-        if PYTHON2:
-            c.execute("insert into storage (key, value) values (?,?)", (key, sqlite3.Binary(d)))
-        else:
-            c.execute("insert into storage (key, value) values (?,?)", (key, d))
+        self._c.execute(SET_STATEMENT, (key, self._dumps(value)))
 
     def _bulk_set(self, txn, updates):
-        keys = list()
-        values = list()
-        for key, value in list(updates.items()):
-            keys.append("'" + key + "'")
-            if PYTHON2:
-                values.append((key, sqlite3.Binary(json.dumps(value, encoding='utf8'))))
-            else:
-                values.append((key, json.dumps(value)))
-        c = self._c
-        c.execute("delete from storage where key in (" + ",".join(keys) + ")")
-        c.executemany("insert into storage (key, value) values (?,?)", values)
+        self._c.executemany(SET_STATEMENT, [(key, self._dumps(value)) for key, value in updates.items()])
 
     def _remove(self, txn, key):
         c = self._c
@@ -106,27 +153,207 @@ class SqliteGraph(BaseGraph):
 
     def _bulk_remove(self, txn, keys):
         c = self._c
-        c.execute("delete from storage where key in (" + ",".join("'{0}'".format(w) for w in keys) + ")")
+        for chunk, placeholders in in_chunks(keys):
+            c.execute("delete from storage where key in (%s)" % (placeholders,), chunk)
 
     def _remove_prefix(self, txn, prefix):
         c = self._c
-        c.execute("delete from storage where key like '" + prefix + "%'")
-
-    def _append_to_lst(self, txn, key, value):
-        lst = self._get(txn, key)
-        if lst == UNDEFINED:
-            lst = [value]
-            self._set(txn, key, lst)
-        else:
-            lst.append(value)
-            self._set(txn, key, lst)
-
-    def _bulk_append_to_lst(self, txn, key, value):
-        lst = self._get(txn, key)
-        if lst == UNDEFINED:
-            lst = []
-            lst.extend(value)
-            self._set(txn, key, lst)
+        if not prefix:
+            c.execute("delete from storage")
+            return
+        # A range predicate (unlike "like") uses the primary key index
+        upper_bound = prefix_upper_bound(prefix)
+        if upper_bound is None:
+            # (prefix only made of the greatest code point : matching keys are the last ones)
+            c.execute("delete from storage where key >= ?", (prefix,))
         else:
-            lst.extend(value)
-            self._set(txn, key, lst)
+            c.execute("delete from storage where key >= ? and key < ?", (prefix, upper_bound))
+
+    # overriding list storage : id lists are stored as blobs (binary list codec) instead of json
+
+    def _load_lst(self, txn, key):
+        c = self._c
+        c.execute("select value from storage where key= ?", (key,))
+        raw_data = c.fetchone()
+        if raw_data is None:
+            return UNDEFINED
+        return unpack_lst(raw_data[0])
+
+    def _bulk_load_lst(self, txn, keys):
+        return dict((key, unpack_lst(raw_data)) for key, raw_data in self._select(keys))
+
+    def _store_lst(self, txn, key, value):
+        self._c.execute(SET_STATEMENT, (key, sqlite3.Binary(pack_lst(value))))
+
+
+class RelationalSqliteGraph(SqliteGraph):
+    """
+    Same as SqliteGraph, but entities are stored in relational tables instead of the key/value storage table :
+      vertices (id, data)
+      edges (id, src, tgt, data)  with covering indexes on (src, id, tgt) and (tgt, id, src)
+
+    Adjacency lists (v/<id>/oe, v/<id>/iv, e/<id>/ov...) are not stored : they are answered by indexed selects on edges table,
+    so adding or removing an edge only inserts or deletes a row (instead of rewriting the lists of both nodes)
+    Other keys (counters, indexes, metadata...) are still stored in storage table
+    """
+
+    def __init__(self, filename, fast=False):
+        if sqlite3.sqlite_version_info < (3, 24, 0):  # pragma : no cover
+            raise GrapheekDataException('RelationalSqliteGraph needs SQLite 3.24 or later')
+        super(RelationalSqliteGraph, self).__init__(filename, fast)
+
+    def _initialize_db(self):
+        super(RelationalSqliteGraph, self)._initialize_db()
+        c = self._c
+        c.execute("create table if not exists vertices (id integer PRIMARY KEY, data blob)")
+        c.execute("create table if not exists edges (id integer PRIMARY KEY, src integer, tgt integer, data blob)")
+        c.execute("create index if not exists edges_src on edges (src, id, tgt)")
+        c.execute("create index if not exists edges_tgt on edges (tgt, id, src)")
+
+    def _split_keys(self, keys):
+        # Returns ({key: (kind, id, suffix)} for keys stored in entity tables, [other keys])
+        relational = {}
+        others = []
+        for key in keys:
+            match = RELATIONAL_KEY_REGEXP.match(key)
+            if match is None:
+                others.append(key)
+            else:
+                kind, entity_id, suffix = match.groups()
+                relational[key] = (kind, int(entity_id), suffix)
+        return relational, others
+
+    def _entity_data(self, kind, entity_ids):
+        # Returns {entity id: data} for existing entities
+        c = self._db.cursor()
+        result = {}
+        for chunk, placeholders in in_chunks(entity_ids):
+            query = "select id, data from %s where id in (%s) and data is not null" % (ENTITY_TABLES[kind], placeholders)
+            for entity_id, raw_data in c.execute(query, chunk):
+                result[entity_id] = self._loads(raw_data)
+        return result
+
+    def _has_key(self, key):
+        relational, _ = self._split_keys([key])
+        if not relational:
+            return super(RelationalSqliteGraph, self)._has_key(key)
+        if relational[key][2] == DATA_SUFFIX:
+            return self._get(None, key) != UNDEFINED
+        return self._load_lst(None, key) != UNDEFINED
+
+    def _get(self, txn, key):
+        return self._bulk_get(txn, [key]).get(key, UNDEFINED)
+
+    def _bulk_get(self, txn, keys):
+        relational, others = self._split_keys(keys)
+        result = super(RelationalSqliteGraph, self)._bulk_get(txn, others) if others else {}
+        for kind in ENTITY_TABLES:
+            data_keys = dict((entity_id, key) for key, (k, entity_id, suffix) in relational.items() if k == kind and suffix == DATA_SUFFIX)
+            if data_keys:
+                for entity_id, data in self._entity_data(kind, data_keys).items():
+                    result[data_keys[entity_id]] = data
+        return result
+
+    def _set(self, txn, key, value):
+        self._bulk_set(txn, {key: value})
+
+    def _bulk_set(self, txn, updates):
+        relational, others = self._split_keys(updates)
+        for kind, table in ENTITY_TABLES.items():
+            rows = [(entity_id, self._dumps(updates[key])) for key, (k, entity_id, suffix) in relational.items() if k == kind and suffix == DATA_SUFFIX]
+            if rows:
+                self._c.executemany("insert into %s (id, data) values (?,?) on conflict(id) do update set data = excluded.data" % (table,), rows)
+        if others:
+            super(RelationalSqliteGraph, self)._bulk_set(txn, dict((key, updates[key]) for key in others))
+
+    def _remove(self, txn, key):
+        self._bulk_remove(txn, [key])
+
+    def _bulk_remove(self, txn, keys):
+        relational, others = self._split_keys(keys)
+        # Removing the data of an entity removes its row (and so, for an edge, its links)
+        for kind, table in ENTITY_TABLES.items():
+            entity_ids = [entity_id for k, entity_id, suffix in relational.values() if k == kind and suffix == DATA_SUFFIX]
+            for chunk, placeholders in in_chunks(entity_ids):
+                self._c.execute("delete from %s where id in (%s)" % (table, placeholders), chunk)
+        if others:
+            super(RelationalSqliteGraph, self)._bulk_remove(txn, others)
+
+    # Adjacency lists :
+
+    def _load_lst(self, txn, key):
+        return self._bulk_load_lst(txn, [key]).get(key, UNDEFINED)
+
+    def _bulk_load_lst(self, txn, keys):
+        relational, others = self._split_keys(keys)
+        result = super(RelationalSqliteGraph, self)._bulk_load_lst(txn, others) if others else {}
+        if not relational:
+            return result
+        c = self._db.cursor()
+        # Edge lists : e/<id>/iv (source), e/<id>/ov (target), e/<id>/bv (source and target)
+        edge_ids = set(entity_id for kind, entity_id, _ in relational.values() if kind == KIND_EDGE)
+        links = {}
+        for chunk, placeholders in in_chunks(edge_ids):
+            for edge_id, source_id, target_id in c.execute("select id, src, tgt from edges where id in (%s)" % (placeholders,), chunk):
+                links[edge_id] = (source_id, target_id)
+        # Vertex lists, in edge id order (only the directions needed by the requested suffixes are selected) :
+        out_node_ids = set(entity_id for kind, entity_id, suffix in relational.values() if kind == KIND_VERTEX and suffix in OUT_SUFFIXES)
+        in_node_ids = set(entity_id for kind, entity_id, suffix in relational.values() if kind == KIND_VERTEX and suffix in IN_SUFFIXES)
+        outs = defaultdict(list)
+        ins = defaultdict(list)
+        for chunk, placeholders in in_chunks(out_node_ids):
+            for source_id, edge_id, target_id in c.execute("select src, id, tgt from edges where src in (%s)" % (placeholders,), chunk):
+                outs[source_id].append((edge_id, target_id))
+        for chunk, placeholders in in_chunks(in_node_ids):
+            for target_id, edge_id, source_id in c.execute("select tgt, id, src from edges where tgt in (%s)" % (placeholders,), chunk):
+                ins[target_id].append((edge_id, source_id))
+        # A vertex having edges exists : existence is only checked for the others
+        existing = set(outs) | set(ins)
+        unknown = out_node_ids.union(in_node_ids).difference(existing)
+        for chunk, placeholders in in_chunks(unknown):
+            existing.update(row[0] for row in c.execute("select id from vertices where id in (%s)" % (placeholders,), chunk))
+        for key, (kind, entity_id, suffix) in relational.items():
+            if kind == KIND_EDGE:
+                if entity_id not in links:
+                    continue
+                source_id, target_id = links[entity_id]
+                result[key] = {IN_VERTICES_SUFFIX: [source_id], OUT_VERTICES_SUFFIX: [target_id], BOTH_VERTICES_SUFFIX: [source_id, target_id]}[suffix]
+                continue
+            if entity_id not in existing:
+                continue
+            if suffix in (OUT_EDGES_SUFFIX, OUT_VERTICES_SUFFIX):
+                pairs = sorted(outs[entity_id])
+            elif suffix in (IN_EDGES_SUFFIX, IN_VERTICES_SUFFIX):
+                pairs = sorted(ins[entity_id])
+            else:
+                pairs = sorted(outs[entity_id] + ins[entity_id])
+            position = 0 if suffix in (OUT_EDGES_SUFFIX, IN_EDGES_SUFFIX, BOTH_EDGES_SUFFIX) else 1
+            result[key] = [pair[position] for pair in pairs]
+        return result
+
+    def _init_lst(self, txn, key):
+        relational, _ = self._split_keys([key])
+        if not relational:
+            super(RelationalSqliteGraph, self)._init_lst(txn, key)
+
+    def _bulk_append_to_lst(self, txn, key, values):
+        relational, _ = self._split_keys([key])
+        if not relational:
+            super(RelationalSqliteGraph, self)._bulk_append_to_lst(txn, key, values)
+            return
+        kind, entity_id, suffix = relational[key]
+        # Only edge sources and targets are written, vertex lists follow from them :
+        if kind == KIND_EDGE and suffix in (IN_VERTICES_SUFFIX, OUT_VERTICES_SUFFIX):
+            column = 'src' if suffix == IN_VERTICES_SUFFIX else 'tgt'
+            self._c.execute("insert into edges (id, %s) values (?,?) on conflict(id) do update set %s = excluded.%s" % (column, column, column), (entity_id, values[-1]))
+
+    def _bulk_remove_from_lst(self, txn, key, values):
+        # (adjacency lists lose their values when edge rows are removed)
+        relational, _ = self._split_keys([key])
+        if not relational:
+            super(RelationalSqliteGraph, self)._bulk_remove_from_lst(txn, key, values)
+
+    def _bulk_remove_lst(self, txn, keys):
+        _, others = self._split_keys(keys)
+        if others:
+            super(RelationalSqliteGraph, self)._bulk_remove_lst(txn, others)
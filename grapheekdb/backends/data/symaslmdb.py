@@ -1,23 +1,72 @@
 # -*- coding:utf-8 -*-
 
-import sys
+import threading
 
 import lmdb
 import msgpack
 
+from contextlib import contextmanager
+from functools import wraps
+
 from grapheekdb.backends.data.base import BaseGraph
+from grapheekdb.backends.data.keys import KIND_EDGE, KIND_INDEX, KIND_VERTEX
+from grapheekdb.backends.data.listcodec import pack_lst, unpack_lst
 
 from grapheekdb.lib.undef import UNDEFINED
 
-PYTHON3 = sys.version_info.major == 3
+
+# Key families stored in their own sub-database (with sub_databases=True) :
+SUB_DATABASES = [KIND_VERTEX, KIND_EDGE, KIND_INDEX, 'm']
+
+
+def encode_key(key):
+    # lmdb keys are bytes
+    return key.encode('utf-8')
+
+
+def detects_map_full(method):
+    # Remembers that a write failed because the memory map is full (see LmdbGraph._grow_storage)
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except lmdb.MapFullError:
+            self._map_full = True
+            raise
+    return wrapper
+
 
 class LmdbGraph(BaseGraph):
 
-    def __init__(self, path, map_size=1024 * 1024):
+    _concurrent_reads = True
+    _transactional = True
+
+    def __init__(self, path, map_size=1024 * 1024, max_map_size=None, sub_databases=False):
+        """
+        The memory map grows (its size doubles, up to max_map_size if given) when a write transaction fills it :
+        the transaction is then run again. The map only grows when no transaction (of any thread) is open : otherwise
+        the write fails
+
+        With sub_databases, vertices, edges, indexes and metadata are stored in separate sub-databases
+        (a database must always be opened with the same sub_databases value)
+        """
         # create the database object
         self._path = path
+        self._max_map_size = max_map_size
         # open the database
-        self._env = lmdb.open(path, map_size=map_size)
+        self._env = lmdb.open(path, map_size=map_size, max_dbs=len(SUB_DATABASES) if sub_databases else 0)
+        # sub-database of each key family (keys of other families are stored in main database) :
+        self._dbs = {}
+        if sub_databases:
+            for family in SUB_DATABASES:
+                self._dbs[family + '/'] = self._env.open_db(encode_key(family))
+        self._write_txn = None
+        self._map_full = False
+        # number of open transactions (read, write and snapshots) of all threads (see _grow_storage) :
+        self._open_txns = 0
+        self._open_txns_lock = threading.Lock()
+        # read snapshot of each thread (see read_snapshot) :
+        self._local = threading.local()
         super(LmdbGraph, self).__init__()
         self._ensure_prepared()
         self._closed = False
@@ -28,76 +77,184 @@ class LmdbGraph(BaseGraph):
         if not self._closed:
             self._env.close()
 
+    def _begin(self, **kwargs):
+        # Every transaction is counted until _end is called
+        with self._open_txns_lock:
+            self._open_txns += 1
+        try:
+            return self._env.begin(**kwargs)
+        except Exception:
+            self._end()
+            raise
+
+    def _end(self):
+        with self._open_txns_lock:
+            self._open_txns -= 1
+
+    @contextmanager
+    def _read_txn(self, buffers=False):
+        txn = self._begin(buffers=buffers)
+        try:
+            with txn:
+                yield txn
+        finally:
+            self._end()
+
     def _transaction_begin(self):
-        return self._env.begin(write=True)
+        self._write_txn = self._begin(write=True)
+        self._map_full = False
+        return self._write_txn
 
+    @detects_map_full
     def _transaction_commit(self, txn):
-        txn.commit()
+        try:
+            txn.commit()
+        finally:
+            self._write_txn = None
+            self._end()
 
     def _transaction_rollback(self, txn):
+        if self._write_txn is None:
+            return  # already ended by a failed commit
+        self._write_txn = None
+        self._end()
         txn.abort()
 
+    def _grow_storage(self):
+        if not self._map_full:
+            return False
+        # The lock is held while the map is resized : no transaction can begin meanwhile
+        with self._open_txns_lock:
+            if self._open_txns:
+                # set_mapsize requires that no transaction is open in the process (including an outer write
+                # or a read snapshot of the current thread)
+                return False
+            map_size = self._env.info()['map_size']
+            if self._max_map_size is not None and map_size >= self._max_map_size:
+                return False
+            self._map_full = False
+            self._env.set_mapsize(map_size * 2 if self._max_map_size is None else min(map_size * 2, self._max_map_size))
+        return True
+
+    def _db(self, key):
+        return self._dbs.get(key[:2])
+
+    # Read snapshots : a single read transaction is used by every read done (without transaction) in its scope
+
+    def _snapshot_acquire(self):
+        if self._snapshot_txn() is not None:
+            return None  # nested scope : outer snapshot is used
+        # (epoch is read before the transaction begins : a commit in between only makes the cache look stale)
+        self._local.epoch = self._write_epoch
+        # (buffers=True : raw data is decoded straight from the memory map, see _load_lst)
+        txn = self._local.txn = self._begin(buffers=True)
+        return txn
+
+    def _snapshot_release(self, snapshot):
+        if snapshot is not None:
+            self._local.txn = None
+            snapshot.abort()
+            self._end()
+
+    def _snapshot_txn(self):
+        return getattr(self._local, 'txn', None)
+
+    def _snapshot_epoch(self):
+        return getattr(self._local, 'epoch', None)
+
     def _has_key(self, key):
-        k = key
-        if PYTHON3:  # pragma : no cover
-            k = bytes(k, encoding='utf8')
-        with self._env.begin() as txn:
-            return txn.get(k, UNDEFINED) != UNDEFINED
+        k = encode_key(key)
+        txn = self._snapshot_txn()
+        if txn is not None:
+            return txn.get(k, UNDEFINED, db=self._db(key)) != UNDEFINED
+        with self._read_txn() as txn:
+            return txn.get(k, UNDEFINED, db=self._db(key)) != UNDEFINED
 
     def _get(self, txn, key):
-        k = key
-        if PYTHON3:  # pragma : no cover
-            k = bytes(k, encoding='utf8')
-        if txn is not None:
-            raw_data = txn.get(k, UNDEFINED)
-            if raw_data == UNDEFINED:
-                return UNDEFINED
-            res = msgpack.loads(raw_data, encoding='utf8')
-            return res
-        else:
-            with self._env.begin() as txn:
-                raw_data = txn.get(k, UNDEFINED)
-                if raw_data == UNDEFINED:
-                    return UNDEFINED
-                res = msgpack.loads(raw_data, encoding='utf8')
-                return res
+        if txn is None:
+            txn = self._snapshot_txn()
+        if txn is None:
+            with self._read_txn() as txn:
+                return self._get(txn, key)
+        raw_data = txn.get(encode_key(key), UNDEFINED, db=self._db(key))
+        if raw_data == UNDEFINED:
+            return UNDEFINED
+        return msgpack.loads(raw_data, encoding='utf8')
 
-    def _bulk_get(self, txn, keys):
-        dic = {}
+    def _get_multi(self, txn, keys):
+        # Yields (key, raw data) for every existing key (keys are encoded once and read with a single cursor per sub-database)
+        for db, encoded in self._encoded_by_db(keys).items():
+            for k, raw_data in txn.cursor(db=db).getmulti(list(encoded)):
+                yield encoded[bytes(k)], raw_data
+
+    def _encoded_by_db(self, keys):
+        # Returns {sub-database: {encoded key: key}}
+        by_db = {}
         for key in keys:
-            value = self._get(txn, key)
-            if value != UNDEFINED:
-                dic[key] = value
-        return dic
+            by_db.setdefault(self._db(key), {})[encode_key(key)] = key
+        return by_db
+
+    def _bulk_get(self, txn, keys):
+        if txn is None:
+            txn = self._snapshot_txn()
+        if txn is None:
+            # One read transaction for all keys (instead of one per key)
+            with self._read_txn(buffers=True) as txn:
+                return self._bulk_get(txn, keys)
+        return dict((key, msgpack.loads(raw_data, encoding='utf8')) for key, raw_data in self._get_multi(txn, keys))
 
+    @detects_map_full
     def _set(self, txn, key, value):
-        k = key
-        if PYTHON3:  # pragma : no cover
-            k = bytes(k, encoding='utf8')
-        else:
-            k = k.encode('utf-8')
-        txn.put(k, msgpack.dumps(value, encoding='utf8'))
+        txn.put(encode_key(key), msgpack.dumps(value, encoding='utf8'), db=self._db(key))
 
+    @detects_map_full
     def _bulk_set(self, txn, updates):
-        for key, value in list(updates.items()):
-            self._set(txn, key, value)
+        for db, encoded in self._encoded_by_db(updates).items():
+            txn.cursor(db=db).putmulti([(k, msgpack.dumps(updates[key], encoding='utf8')) for k, key in encoded.items()])
 
+    @detects_map_full
     def _remove(self, txn, key):
-        k = key
-        if PYTHON3:  # pragma : no cover
-            k = bytes(k, encoding='utf8')
-        else:
-            k = k.encode('utf-8')
-        txn.delete(k)
+        txn.delete(encode_key(key), db=self._db(key))
 
+    @detects_map_full
     def _bulk_remove(self, txn, keys):
         for key in keys:
-            self._remove(txn, key)
+            txn.delete(encode_key(key), db=self._db(key))
 
+    @detects_map_full
     def _remove_prefix(self, txn, prefix):
-        cursor = txn.cursor()
-        for key, _ in cursor:
-            if PYTHON3:  # pragma : no cover
-                key = str(key, encoding='utf8')
-            if key.startswith(prefix):
-                cursor.delete()
+        # Keys are sorted : matching keys are contiguous, starting at the first key >= prefix
+        p = encode_key(prefix)
+        cursor = txn.cursor(db=self._db(prefix))
+        if not cursor.set_range(p):
+            return
+        while cursor.key().startswith(p):
+            # (delete moves the cursor to the next key)
+            if not cursor.delete():
+                break
+
+    # overriding list storage : id lists are stored with the binary list codec instead of msgpack
+
+    def _load_lst(self, txn, key):
+        if txn is None:
+            txn = self._snapshot_txn()
+        if txn is None:
+            # buffers=True : raw data is decoded straight from the memory map (no copy)
+            with self._read_txn(buffers=True) as txn:
+                return self._load_lst(txn, key)
+        raw_data = txn.get(encode_key(key), UNDEFINED, db=self._db(key))
+        if raw_data == UNDEFINED:
+            return UNDEFINED
+        return unpack_lst(raw_data)
+
+    def _bulk_load_lst(self, txn, keys):
+        if txn is None:
+            txn = self._snapshot_txn()
+        if txn is None:
+            with self._read_txn(buffers=True) as txn:
+                return self._bulk_load_lst(txn, keys)
+        return dict((key, unpack_lst(raw_data)) for key, raw_data in self._get_multi(txn, keys))
+
+    @detects_map_full
+    def _store_lst(self, txn, key, value):
+        txn.put(encode_key(key), pack_lst(value), db=self._db(key))
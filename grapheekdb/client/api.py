@@ -1,12 +1,16 @@
 # -*- coding:utf-8 -*-
 
-import zmq
+from collections import namedtuple
+
 import msgpack
 
 from grapheekdb.backends.data.keys import KIND_VERTEX, KIND_EDGE
 
 from grapheekdb.lib.validations import check_valid_data
 
+from grapheekdb.client.pool import get_connection_pool, close_connection_pool
+from grapheekdb.server.cursors import CURSOR_OPEN, CURSOR_FETCH, CURSOR_CLOSE, DEFAULT_CURSOR_BATCH_SIZE
+
 from grapheekdb.lib.readwrite import GraphReadWrite
 from grapheekdb.lib.nx import GraphNx
 
@@ -25,13 +29,16 @@ try:  # pragma : no cover
 except NameError:  # pragma : no cover
     UNICODE = str
 
+# A batch of results sent by a server side cursor
+CursorBatch = namedtuple('CursorBatch', ['cursor_id', 'items', 'finished'])
+
 
 def unmarshall(graph, item):
     if isinstance(item, (bool, float, int, str, LONG, NONETYPE, UNICODE)):
         return item
     if isinstance(item, bytes):  # pragma : no cover
         return str(item, encoding='utf8')
-    if isinstance(item, (ProxyNode, ProxyEdge)):
+    if isinstance(item, (ProxyNode, ProxyEdge, BatchResult)):
         return item
     elif isinstance(item, dict):
         # Check if item is in fact a "special" dict (<-> handling an instance serialization)
@@ -50,6 +57,8 @@ def unmarshall(graph, item):
                 return ProxyEdge(graph, item['_i'], **unmarshall(graph, item['d']))
             elif kind == 'd':
                 return dict((unmarshall(graph, key), unmarshall(graph, value)) for key, value in item['d'])
+            elif kind == 'c':
+                return CursorBatch(item['i'], unmarshall(graph, item['d']), item['f'])
         else:
             items = [(unmarshall(graph, key), unmarshall(graph, value)) for key, value in list(item.items())]
             return dict(items)
@@ -123,14 +132,20 @@ class ProxyIteratorCommon(object):
 
     def __next__(self):
         if self._current_iteration is None:
-            response = self._request()
-            self._current_iteration = iter(response)
+            # Results are fetched lazily, by batches
+            self._current_iteration = self._graph._cursor_iterator(self._commands)
         try:
             return next(self._current_iteration)
         except StopIteration:
             self._current_iteration = None
         raise StopIteration
 
+    def close(self):
+        # Stops current iteration (and closes server side cursor)
+        if self._current_iteration is not None:
+            self._current_iteration.close()
+            self._current_iteration = None
+
     def _do(self, _method, *args, **kwargs):
         command = [_method, args, kwargs]
         return self.__class__(self._graph, self._commands + [command])
@@ -140,6 +155,11 @@ class ProxyIteratorCommon(object):
         response = self._graph._request(self._commands + [command])
         return unmarshall(self._graph, response)
 
+    def _streamed(self, _method, *args, **kwargs):
+        # Same as _raw, but results are fetched by batches
+        command = [_method, args, kwargs]
+        return self._graph._stream(self._commands + [command])
+
 
 class ProxyEntityAggregate(ProxyIteratorCommon):
 
@@ -215,7 +235,7 @@ class ProxyEntityIterator(ProxyIteratorCommon):
         return self._do('aka', alias)
 
     def count(self):
-        return int(self._raw('count'))
+        return self._raw('count')
 
     def remove(self):
         self._raw('remove')
@@ -227,7 +247,13 @@ class ProxyEntityIterator(ProxyIteratorCommon):
         return self._raw('all')
 
     def ids(self):
-        return self._raw('ids')
+        return self._streamed('iids')
+
+    def values(self, *fields):
+        return self._streamed('ivalues', *fields)
+
+    def project(self, only=None, exclude=None):
+        return self._do('project', only=only, exclude=exclude)
 
     def collect(self, *aliases):
         return self._raw('collect', *aliases)
@@ -372,21 +398,56 @@ class ProxyEdge(ProxyEntity):
 
 class ProxyGraph(GraphReadWrite, GraphNx):
 
-    def __init__(self, address):  # pragma : no cover
+    # Seconds to wait for a reply (None : wait forever)
+    _timeout = None
+    # Number of results fetched at once when iterating
+    _batch_size = DEFAULT_CURSOR_BATCH_SIZE
+
+    def __init__(self, address, timeout=None, batch_size=DEFAULT_CURSOR_BATCH_SIZE):  # pragma : no cover
         self._address = address
-        #self._zmq_context = zmq.Context()
-        #self._zmq_socket = self._zmq_context.socket(zmq.REQ)
-        #self._zmq_socket.connect(address)
+        self._timeout = timeout
+        self._batch_size = batch_size
 
-    def _request(self, commands):
+    def _send(self, commands):
         data = msgpack.dumps(sanitize(commands), encoding='utf8')
-        zmq_context = zmq.Context()
-        zmq_socket = zmq_context.socket(zmq.REQ)
-        zmq_socket.connect(self._address)
-        zmq_socket.send(data)
-        raw = zmq_socket.recv()
-        msg = msgpack.loads(raw, encoding='utf8')
-        return unmarshall(self, msg)
+        # Connected sockets are reused (pooled by address) instead of connecting for each request
+        raw = get_connection_pool(self._address).request(data, self._timeout)
+        return msgpack.loads(raw, encoding='utf8')
+
+    def _request(self, commands):
+        return unmarshall(self, self._send(commands))
+
+    def batch(self):
+        return ProxyBatch(self)
+
+    def close(self):
+        # Closes pooled connections to server (they will be re-opened by next request)
+        close_connection_pool(self._address)
+
+    def _stream(self, commands):
+        return list(self._cursor_iterator(commands))
+
+    def _cursor_iterator(self, commands):
+        batch = self._request(commands + [[CURSOR_OPEN, [self._batch_size], {}]])
+        if not isinstance(batch, CursorBatch):
+            # Server sent the whole result at once
+            for item in batch:
+                yield item
+            return
+        try:
+            while True:
+                for item in batch.items:
+                    yield item
+                if batch.finished:
+                    return
+                batch = self._request([[CURSOR_FETCH, [batch.cursor_id, self._batch_size], {}]])
+        finally:
+            if not batch.finished:
+                # Iteration stopped before the end
+                try:
+                    self._request([[CURSOR_CLOSE, [batch.cursor_id], {}]])
+                except Exception:
+                    pass  # server will forget cursor when it expires
 
     def v(self, entity_id):
         return ProxyNode(self, entity_id)
@@ -448,6 +509,17 @@ class ProxyGraph(GraphReadWrite, GraphNx):
     def add_edge_index(self, *fields, **filters):
         return self._add_entity_index(KIND_EDGE, *fields, **filters)
 
+    def _add_entity_range_index(self, _kind, field):
+        assert(_kind in (KIND_EDGE, KIND_VERTEX))
+        command = ['add_node_range_index' if _kind == KIND_VERTEX else 'add_edge_range_index', [field], {}]
+        return self._request([command])
+
+    def add_node_range_index(self, field):
+        return self._add_entity_range_index(KIND_VERTEX, field)
+
+    def add_edge_range_index(self, field):
+        return self._add_entity_range_index(KIND_EDGE, field)
+
     def get_node_indexes(self):
         command = ['get_node_indexes', [], {}]
         return self._request([command])
@@ -467,6 +539,41 @@ class ProxyGraph(GraphReadWrite, GraphNx):
     def remove_edge_index(self, *fields, **filters):
         return self._remove_entity_index(KIND_EDGE, *fields, **filters)
 
+    def _remove_entity_range_index(self, _kind, field):
+        assert(_kind in (KIND_EDGE, KIND_VERTEX))
+        command = ['remove_node_range_index' if _kind == KIND_VERTEX else 'remove_edge_range_index', [field], {}]
+        return self._request([command])
+
+    def remove_node_range_index(self, field):
+        return self._remove_entity_range_index(KIND_VERTEX, field)
+
+    def remove_edge_range_index(self, field):
+        return self._remove_entity_range_index(KIND_EDGE, field)
+
+    def add_vertex_centric_index(self, field):
+        command = ['add_vertex_centric_index', [field], {}]
+        return self._request([command])
+
+    def get_vertex_centric_indexes(self):
+        command = ['get_vertex_centric_indexes', [], {}]
+        return self._request([command])
+
+    def remove_vertex_centric_index(self, field):
+        command = ['remove_vertex_centric_index', [field], {}]
+        return self._request([command])
+
+    def enable_cache(self, **kwargs):
+        command = ['enable_cache', [], kwargs]
+        return self._request([command])
+
+    def disable_cache(self):
+        command = ['disable_cache', [], {}]
+        return self._request([command])
+
+    def get_cache_stats(self):
+        command = ['get_cache_stats', [], {}]
+        return self._request([command])
+
     def _operation_helper(self, operation, *entity_iterators):
         command = [operation, [entity_iterator._commands for entity_iterator in entity_iterators], {}]
         return ProxyEntityIterator(self, [command])
@@ -490,3 +597,100 @@ class ProxyGraph(GraphReadWrite, GraphNx):
 
     def symmetric_difference(self, *entity_iterators):
         return self._operation_helper('_marshalled_symmetric_difference', *entity_iterators)
+
+
+class BatchResult(object):
+    """
+    Result of a request recorded by a batch : available once the batch has been executed
+    """
+
+    def __init__(self):
+        self._executed = False
+        self._value = None
+        self._error = None
+
+    def __repr__(self):
+        if not self._executed:
+            return '<batch result (not executed)>'
+        return '<batch result %r>' % (self._error if self._error is not None else self._value,)
+
+    def _set(self, value=None, error=None):
+        self._executed = True
+        self._value = value
+        self._error = error
+
+    @property
+    def error(self):
+        return self._error
+
+    @property
+    def value(self):
+        if not self._executed:
+            raise GrapheekException('Batch has not been executed yet')
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class ProxyBatch(ProxyGraph):
+    """
+    A graph recording requests instead of sending them : they are all sent in a single message by execute()
+    (and run in order by the server)
+
+    Requests return a BatchResult, iterating (which needs several exchanges) is not possible in a batch :
+    use all(), ids(), collect(), ... instead
+    """
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._address = graph._address
+        self._timeout = graph._timeout
+        self._batch_size = graph._batch_size
+        self._pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+        else:
+            self._pending = []
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _request(self, commands):
+        result = BatchResult()
+        self._pending.append((commands, result))
+        return result
+
+    def _cursor_iterator(self, commands):
+        raise GrapheekException('Iteration is not possible inside a batch')
+
+    def _stream(self, commands):
+        return self._request(commands)
+
+    def batch(self):
+        return self
+
+    def execute(self):
+        """
+        Sends recorded requests and returns their results (in the same order)
+        A request that failed gives a GrapheekException instead of its result
+        """
+        pending, self._pending = self._pending, []
+        if not pending:
+            return []
+        msg = self._send([['_batch', [[commands for commands, _ in pending]], {}]])
+        if isinstance(msg, dict):
+            # The whole batch failed
+            unmarshall(self._graph, msg)
+        values = []
+        for (_, result), item in zip(pending, msg):
+            try:
+                result._set(value=unmarshall(self._graph, item))
+            except GrapheekException as e:
+                result._set(error=e)
+            values.append(result._error if result._error is not None else result._value)
+        return values
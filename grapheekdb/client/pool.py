@@ -0,0 +1,103 @@
+# -*- coding:utf-8 -*-
+
+import os
+import threading
+
+import zmq
+
+from grapheekdb.lib.exceptions import GrapheekConnectionTimeoutException
+
+# Number of idle (connected) sockets kept for an address :
+DEFAULT_MAX_IDLE_SOCKETS = 8
+
+
+class ConnectionPool(object):
+    """
+    A thread safe pool of connected REQ sockets to a server address
+
+    A socket is checked out for a whole request/reply exchange (a REQ socket must strictly alternate send and recv)
+    so that threads never share a socket
+    """
+
+    def __init__(self, context, address, max_idle=DEFAULT_MAX_IDLE_SOCKETS):
+        self._context = context
+        self._address = address
+        self._max_idle = max_idle
+        self._idle_sockets = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        socket = self._context.socket(zmq.REQ)
+        socket.connect(self._address)
+        return socket
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle_sockets:
+                return self._idle_sockets.pop()
+        return self._connect()
+
+    def _release(self, socket):
+        with self._lock:
+            if len(self._idle_sockets) < self._max_idle:
+                self._idle_sockets.append(socket)
+                return
+        socket.close(linger=0)
+
+    def request(self, data, timeout=None):
+        """
+        Sends data and returns the raw reply (timeout is in seconds, None means : wait forever)
+
+        A socket that failed (or timed out) is closed instead of going back to the pool
+        """
+        socket = self._acquire()
+        try:
+            try:
+                socket.send(data)
+            except zmq.ZMQError:
+                # socket in a bad REQ state : reconnecting (nothing has been sent yet)
+                socket.close(linger=0)
+                socket = self._connect()
+                socket.send(data)
+            if timeout is not None and not socket.poll(timeout * 1000, zmq.POLLIN):
+                raise GrapheekConnectionTimeoutException('No reply from %s after %s seconds' % (self._address, timeout))
+            raw = socket.recv()
+        except:
+            socket.close(linger=0)
+            raise
+        self._release(socket)
+        return raw
+
+    def close(self):
+        with self._lock:
+            sockets, self._idle_sockets = self._idle_sockets, []
+        for socket in sockets:
+            socket.close(linger=0)
+
+
+# One zmq context and one pool per address for each process
+# (a forked process can't use the context and sockets of its parent) :
+_context = None
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(address):
+    global _context, _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _context = zmq.Context()
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(address, None)
+        if pool is None:
+            pool = _pools[address] = ConnectionPool(_context, address)
+        return pool
+
+
+def close_connection_pool(address):
+    with _pools_lock:
+        pool = _pools.pop(address, None) if _pools_pid == os.getpid() else None
+    if pool is not None:
+        pool.close()
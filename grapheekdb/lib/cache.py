@@ -0,0 +1,114 @@
+# -*- coding:utf-8 -*-
+
+import sys
+import threading
+from collections import OrderedDict
+
+from grapheekdb.lib.undef import UNDEFINED
+
+DEFAULT_MAX_ENTRIES = 100000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def approximate_size(value):
+    # Shallow estimation : container size + size of its items (nested containers are not walked)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + sys.getsizeof(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += sys.getsizeof(item)
+    return size
+
+
+def copy_value(value):
+    # Cached values are shared : readers get their own copy (nested containers included), so that changing it can't alter the cache
+    if isinstance(value, dict):
+        return dict((key, copy_value(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return [copy_value(item) for item in value]
+    return value
+
+
+class LRUCache(object):
+    """
+    A Least Recently Used cache bounded both by its number of entries and by the (approximate) size of its values
+
+    It is thread safe (a server can run concurrent read-only requests)
+
+    generation is increased by bulk_invalidate(keys, new_generation=True) : a value read before it is only
+    stored by set(key, value, generation) if the generation didn't change meanwhile
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size), least recently used first
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value, size = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return UNDEFINED
+            # Moving key at the end (most recently used) :
+            self._entries[key] = (value, size)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, generation=None):
+        size = approximate_size(value)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return  # value may be outdated
+            self._invalidate(key)
+            if size > self._max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def _invalidate(self, key):
+        try:
+            _, size = self._entries.pop(key)
+        except KeyError:
+            return
+        self._bytes -= size
+
+    def invalidate(self, key):
+        with self._lock:
+            self._invalidate(key)
+
+    def bulk_invalidate(self, keys, new_generation=False):
+        with self._lock:
+            for key in keys:
+                self._invalidate(key)
+            if new_generation:
+                self.generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_entries': self._max_entries,
+            'max_bytes': self._max_bytes,
+        }
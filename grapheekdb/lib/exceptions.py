@@ -31,6 +31,14 @@ class GrapheekNotIntegerException(GrapheekException):
     pass
 
 
+class GrapheekConnectionTimeoutException(GrapheekException):
+    pass
+
+
+class GrapheekUnknownCursorException(GrapheekException):
+    pass
+
+
 # Data (<-> backend) exceptions :
 
 class GrapheekDataException(GrapheekException):
@@ -2,6 +2,8 @@ import ast
 import operator as op
 import re
 
+from grapheekdb.lib.cache import LRUCache
+from grapheekdb.lib.undef import UNDEFINED
 from grapheekdb.lib.exceptions import GrapheekInvalidExpression
 
 # supported operators
@@ -13,38 +15,89 @@ cmps = {ast.Lt: op.lt, ast.LtE: op.le, ast.Gt: op.gt, ast.GtE: op.ge, ast.Eq: op
 VALID_ATTRIBUTE = r'''^[a-zA-Z][a-zA-Z0-9_]*$'''
 VALID_ATTRIBUTE_REGEX = re.compile(VALID_ATTRIBUTE)
 
+# Name of the iterator context (aliases) inside expressions :
+CONTEXT_NAME = '_'
+
+# Number of compiled expressions kept (by source string) :
+COMPILED_EXPRESSION_CACHE_SIZE = 256
+
+_compiled_expressions = LRUCache(max_entries=COMPILED_EXPRESSION_CACHE_SIZE)
+
+
+class CompiledExpression(object):
+    """
+    An expression compiled into a tree of closures
+
+    fields are the entity fields read by the expression (entity data is only needed for them)
+    uses_context is True when the expression reads the iterator context (i.e : _.alias.field)
+    """
+
+    def __init__(self, func, names):
+        self._func = func
+        self.uses_context = CONTEXT_NAME in names
+        self.fields = sorted(names - set([CONTEXT_NAME]))
+
+    def __call__(self, context):
+        try:
+            return self._func(context)
+        except GrapheekInvalidExpression:
+            raise
+        except:
+            raise GrapheekInvalidExpression
+
+
+def compile_expr(expr):
+    compiled = _compiled_expressions.get(expr)
+    if compiled == UNDEFINED:
+        names = set()
+        try:
+            func = compile_(ast.parse(expr).body[0].value, names)
+        except GrapheekInvalidExpression:
+            raise
+        except:
+            raise GrapheekInvalidExpression
+        compiled = CompiledExpression(func, names)
+        _compiled_expressions.set(expr, compiled)
+    return compiled
+
 
 def eval_expr(context, expr):
-    try:
-        return eval_(context, ast.parse(expr).body[0].value)
-    except GrapheekInvalidExpression:
-        raise
-    except:
-        raise GrapheekInvalidExpression
+    return compile_expr(expr)(context)
 
 
-def eval_(context, node):
+def compile_(node, names):
     if isinstance(node, ast.Num):
-        return node.n
-    elif isinstance(node, ast.operator):
-        return operators[type(node)]
-    elif isinstance(node, ast.cmpop):
-        return cmps[type(node)]
+        value = node.n
+        return lambda context: value
     elif isinstance(node, ast.IfExp):
-        return eval_(context, node.body) if eval_(context, node.test) else eval_(context, node.orelse)
+        test = compile_(node.test, names)
+        body = compile_(node.body, names)
+        orelse = compile_(node.orelse, names)
+        return lambda context: body(context) if test(context) else orelse(context)
     elif isinstance(node, ast.BinOp):
-        return eval_(context, node.op)(eval_(context, node.left), eval_(context, node.right))
+        operator = operators[type(node.op)]
+        left = compile_(node.left, names)
+        right = compile_(node.right, names)
+        return lambda context: operator(left(context), right(context))
     elif isinstance(node, ast.Name):
-        return context[node.id]
+        name = node.id
+        names.add(name)
+        return lambda context: context[name]
     elif isinstance(node, ast.Attribute):
         attr = node.attr
         if VALID_ATTRIBUTE_REGEX.match(attr):
-            return eval_(context, node.value).get(node.attr, 0)
+            value = compile_(node.value, names)
+            return lambda context: value(context).get(attr, 0)
         raise GrapheekInvalidExpression("attributes must be of the form %s" % (VALID_ATTRIBUTE,))
     elif isinstance(node, ast.Compare):
-        result = eval_(context, node.left)
-        for op, comp in zip(node.ops, node.comparators):
-            result = eval_(context, op)(result, eval_(context, comp))
-        return result
+        left = compile_(node.left, names)
+        comparisons = [(cmps[type(op)], compile_(comp, names)) for op, comp in zip(node.ops, node.comparators)]
+
+        def compare(context):
+            result = left(context)
+            for cmp_func, comp in comparisons:
+                result = cmp_func(result, comp(context))
+            return result
+        return compare
     else:
         raise GrapheekInvalidExpression(repr(node))
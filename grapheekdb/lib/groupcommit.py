@@ -0,0 +1,97 @@
+# -*- coding:utf-8 -*-
+
+import threading
+import time
+
+try:  # pragma : no cover
+    from Queue import Queue, Empty  # Python 2
+except ImportError:  # pragma : no cover
+    from queue import Queue, Empty  # Python 3
+
+# Maximum number of writes sharing a transaction :
+DEFAULT_GROUP_MAX_SIZE = 1000
+
+
+class GroupCommitter(object):
+    """
+    Coalesces writes submitted by several threads : a single thread runs the writes waiting together
+    in a single backend transaction (see BaseGraph._group_commit), then releases each submitter
+
+    window is the number of seconds the first write of a group waits for other writes
+    (with 0, a group is made of the writes submitted while the previous group was being committed)
+
+    lock is an optional ReadWriteLock (held exclusively while a group runs), on_commit is an optional callable
+    and finish an optional callable applied to each result, they are called after the commit (before releasing lock)
+    """
+
+    def __init__(self, graph, lock=None, window=0, max_size=DEFAULT_GROUP_MAX_SIZE, on_commit=None):
+        self._graph = graph
+        self._lock = lock
+        self._window = window
+        self._max_size = max_size
+        self._on_commit = on_commit
+        self._queue = Queue()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, func, finish=None):
+        """
+        Runs func (in a shared transaction) and returns its result (or finish(result)) once committed
+        """
+        entry = [func, finish, threading.Event(), None, None]
+        self._queue.put(entry)
+        entry[2].wait()
+        if entry[4] is not None:
+            raise entry[4]
+        return entry[3]
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _next_group(self):
+        # Returns (group, stop)
+        entry = self._queue.get()
+        if entry is None:
+            return [], True
+        group = [entry]
+        deadline = time.time() + self._window
+        while len(group) < self._max_size:
+            timeout = deadline - time.time()
+            try:
+                entry = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except Empty:
+                break
+            if entry is None:
+                return group, True
+            group.append(entry)
+        return group, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            group, stop = self._next_group()
+            if not group:
+                continue
+            if self._lock is not None:
+                self._lock.acquire_write()
+            try:
+                outcomes = self._graph._group_commit([entry[0] for entry in group])
+                if self._on_commit is not None:
+                    self._on_commit()
+                for entry, (result, exception) in zip(group, outcomes):
+                    if exception is None and entry[1] is not None:
+                        try:
+                            result = entry[1](result)
+                        except Exception as e:
+                            exception = e
+                    entry[3], entry[4] = result, exception
+            except Exception as e:  # pragma : no cover
+                for entry in group:
+                    entry[4] = e
+            finally:
+                if self._lock is not None:
+                    self._lock.release_write()
+                for entry in group:
+                    entry[2].set()
@@ -25,11 +25,13 @@ class GraphReadWrite(object):
             edges.append(data)
         node_indexes = self.get_node_indexes()
         edge_indexes = self.get_edge_indexes()
+        vertex_centric_indexes = self.get_vertex_centric_indexes()
         dic = {
             'nodes': nodes,
             'edges': edges,
             'node_indexes': node_indexes,
-            'edge_indexes': edge_indexes
+            'edge_indexes': edge_indexes,
+            'vertex_centric_indexes': vertex_centric_indexes
         }
         json.dump(dic, fp)
         # finished, close file
@@ -55,9 +57,20 @@ class GraphReadWrite(object):
         self.bulk_add_edge(edge_data)
         del edges
         # Adding node indexes :
-        for fields, filters in dic.get('node_indexes', []):
-            self.add_node_index(*fields)
+        for description in dic.get('node_indexes', []):
+            fields, filters = description[:2]
+            if description[2:] == ['range']:
+                self.add_node_range_index(*fields)
+            else:
+                self.add_node_index(*fields, **filters)
         # Adding edge indexes :
-        for fields, filters in dic.get('edge_indexes', []):
-            self.add_edge_index(*fields, **filters)
+        for description in dic.get('edge_indexes', []):
+            fields, filters = description[:2]
+            if description[2:] == ['range']:
+                self.add_edge_range_index(*fields)
+            else:
+                self.add_edge_index(*fields, **filters)
+        # Adding vertex centric indexes :
+        for field in dic.get('vertex_centric_indexes', []):
+            self.add_vertex_centric_index(field)
         return node_dump_id_to_node
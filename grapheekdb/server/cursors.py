@@ -0,0 +1,77 @@
+# -*- coding:utf-8 -*-
+
+import threading
+import time
+from collections import OrderedDict
+from itertools import count, islice
+
+from grapheekdb.lib.exceptions import GrapheekUnknownCursorException
+
+# Cursor commands (a cursor is opened by adding CURSOR_OPEN to the commands of an iterator) :
+CURSOR_OPEN = '_cursor'
+CURSOR_FETCH = '_cursor_fetch'
+CURSOR_CLOSE = '_cursor_close'
+
+# Number of items sent in each batch (unless client asks for another size) :
+DEFAULT_CURSOR_BATCH_SIZE = 1000
+# Seconds after which a cursor that has not been used is forgotten :
+DEFAULT_CURSOR_EXPIRY = 300
+
+
+class CursorRegistry(object):
+    """
+    Keeps server side iterators open between client requests, so that results can be sent by batches
+    """
+
+    def __init__(self, expiry=DEFAULT_CURSOR_EXPIRY):
+        self._expiry = expiry
+        self._cursors = OrderedDict()  # cursor id -> (iterator, last access time), least recently used first
+        self._ids = count(1)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cursors)
+
+    def _expire(self):
+        # (lock must be held)
+        limit = time.time() - self._expiry
+        while self._cursors:
+            cursor_id, (_, last_access) = next(iter(self._cursors.items()))
+            if last_access > limit:
+                break
+            del self._cursors[cursor_id]
+
+    def _batch(self, cursor_id, iterator, batch_size):
+        batch_size = max(1, int(batch_size))
+        items = list(islice(iterator, batch_size))
+        finished = len(items) < batch_size
+        if not finished:
+            with self._lock:
+                self._cursors[cursor_id] = (iterator, time.time())
+        return cursor_id, items, finished
+
+    def open(self, iterable, batch_size=DEFAULT_CURSOR_BATCH_SIZE):
+        """
+        Returns (cursor id, first items, finished)
+        """
+        with self._lock:
+            self._expire()
+            cursor_id = next(self._ids)
+        return self._batch(cursor_id, iter(iterable), batch_size)
+
+    def fetch(self, cursor_id, batch_size=DEFAULT_CURSOR_BATCH_SIZE):
+        """
+        Returns (cursor id, next items, finished)
+        """
+        with self._lock:
+            self._expire()
+            # (the cursor is taken out of the registry while its items are fetched)
+            try:
+                iterator, _ = self._cursors.pop(cursor_id)
+            except KeyError:
+                raise GrapheekUnknownCursorException('Unknown (or expired) cursor : %s' % (cursor_id,))
+        return self._batch(cursor_id, iterator, batch_size)
+
+    def close(self, cursor_id):
+        with self._lock:
+            self._cursors.pop(cursor_id, None)
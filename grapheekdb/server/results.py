@@ -0,0 +1,68 @@
+# -*- coding:utf-8 -*-
+
+import threading
+from operator import itemgetter
+
+import msgpack
+
+from grapheekdb.lib.cache import LRUCache, DEFAULT_MAX_BYTES
+from grapheekdb.lib.undef import UNDEFINED
+
+# Number of replies kept by default (when result cache is enabled) :
+DEFAULT_RESULT_CACHE_SIZE = 1000
+
+
+def normalize(item):
+    # Same commands must give the same key, whatever the order of keyword arguments
+    if isinstance(item, dict):
+        return {'d': [[key, normalize(value)] for key, value in sorted(item.items(), key=itemgetter(0))]}
+    elif isinstance(item, (list, tuple)):
+        return [normalize(x) for x in item]
+    return item
+
+
+class ResultCache(object):
+    """
+    Keeps replies of read-only requests (by command chain)
+
+    Every write bumps the epoch : replies computed during a previous epoch are not returned anymore
+    """
+
+    def __init__(self, max_entries=DEFAULT_RESULT_CACHE_SIZE, max_bytes=DEFAULT_MAX_BYTES):
+        self._cache = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    def epoch(self):
+        return self._epoch
+
+    def key(self, commands):
+        return msgpack.dumps(normalize(commands), encoding='utf8')
+
+    def get(self, key):
+        entry = self._cache.get(key)
+        if entry == UNDEFINED:
+            return None
+        epoch, reply = entry
+        if epoch != self._epoch:
+            self._cache.invalidate(key)
+            return None
+        return reply
+
+    def set(self, key, reply, epoch):
+        # epoch is the one seen before computing the reply (a reply computed while a write happened is dropped)
+        if epoch == self._epoch:
+            self._cache.set(key, (epoch, reply))
+
+    def bump(self):
+        with self._lock:
+            self._epoch += 1
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats['epoch'] = self._epoch
+        return stats
@@ -2,10 +2,14 @@
 # -*- coding: utf-8 -*-
 
 import sys
+import threading
 import traceback
 import msgpack
 import argparse
+from uuid import uuid4
+from functools import partial
 from collections import OrderedDict
+from types import GeneratorType
 
 try:  # pragma : no cover
     from ConfigParser import RawConfigParser  # Python 2
@@ -25,8 +29,43 @@ except NameError:  # pragma : no cover
 import zmq
 
 from grapheekdb.backends.data.base import EntityAggregate, EntityIterator, Node, Edge
+from grapheekdb.backends.data.keys import KIND_VERTEX
 from grapheekdb import __version__
 from grapheekdb.lib.exceptions import GrapheekMarshallingException
+from grapheekdb.lib.rwlock import ReadWriteLock
+from grapheekdb.lib.groupcommit import GroupCommitter
+from grapheekdb.server.cursors import CursorRegistry, CURSOR_OPEN, CURSOR_FETCH, CURSOR_CLOSE, DEFAULT_CURSOR_EXPIRY
+from grapheekdb.server.results import ResultCache
+
+
+# Methods that never modify the graph : requests made only of them can run concurrently in worker mode
+READ_ONLY_METHODS = frozenset([
+    'V', 'E', 'v', 'e',
+    'inV', 'outV', 'bothV', 'in_', 'out_', 'both_', 'inE', 'outE', 'bothE', 'random',
+    'dedup', 'without', 'limit', 'aka', 'order_by', 'entities', 'project',
+    'count', 'all', 'ids', 'iids', 'values', 'ivalues', 'collect', 'data', 'sum', 'percent', 'get', 'get_id', '_dot_str',
+    'get_node_indexes', 'get_edge_indexes', 'get_vertex_centric_indexes', 'get_cache_stats',
+    CURSOR_OPEN, CURSOR_FETCH, CURSOR_CLOSE,
+])
+# Set operations : their arguments are command lists (which must be read-only too)
+READ_ONLY_OPERATIONS = frozenset([
+    '_marshalled_issubset', '_marshalled_issuperset',
+    '_marshalled_union', '_marshalled_intersection', '_marshalled_difference', '_marshalled_symmetric_difference',
+])
+
+# Read-only methods whose replies can't be kept by the result cache
+UNCACHEABLE_METHODS = frozenset([
+    'random', 'get_cache_stats', CURSOR_FETCH, CURSOR_CLOSE,
+])
+# Single entity writes : concurrent ones can share a transaction (cf group commit)
+GROUPABLE_METHODS = frozenset([
+    'add_node', 'add_edge_by_ids', 'update_data',
+])
+# Method executing a list of command lists (sent at once by a client batch)
+BATCH = '_batch'
+
+# Milliseconds between 2 checks of the stop event by workers
+WORKER_POLL_TIMEOUT = 100
 
 
 def marshall(item):
@@ -58,10 +97,29 @@ def marshall(item):
             '_i': item.get_id(),
             'd': marshall(item.data())
         }
-    elif isinstance(item, (EntityAggregate, EntityIterator)):
+    elif isinstance(item, EntityIterator):
+        return list(marshall_entities(item))
+    elif isinstance(item, (EntityAggregate, GeneratorType)):
         return [marshall(x) for x in item]
     raise GrapheekMarshallingException('Unknown type or instance : %s - %s' % (type(item), item))
 
+def marshall_entities(entity_iterator):
+    # Entities data is read by windows, and only projected fields are sent
+    kind = 'n' if entity_iterator._src_kind == KIND_VERTEX else 'e'
+    for entity_id, data in entity_iterator._iterate_data(*entity_iterator._projection):
+        yield {
+            '__': kind,
+            '_i': entity_id,
+            'd': marshall(data)
+        }
+
+
+def marshalled_items(obj):
+    if isinstance(obj, EntityIterator):
+        return marshall_entities(obj)
+    return (marshall(item) for item in obj)
+
+
 def fixbytes(item):
     if isinstance(item, (bool, float, int, str, LONG, NONETYPE, UNICODE)):
         return item
@@ -75,7 +133,216 @@ def fixbytes(item):
     raise GrapheekMarshallingException('Unknown type or instance : %s - %s' % (type(item), item))  # pragma : no cover
 
 
-def runserver(_address, _backend, _scripts, _context, **params):
+def is_read_only(commands):
+    for method_name, args, _ in commands:
+        if method_name == BATCH:
+            if not all(is_read_only(sub_commands) for sub_commands in args[0]):
+                return False
+        elif method_name in READ_ONLY_OPERATIONS:
+            if not all(is_read_only(sub_commands) for sub_commands in args):
+                return False
+        elif method_name not in READ_ONLY_METHODS:
+            return False
+    return True
+
+
+def is_groupable(commands):
+    if len(commands) == 1:
+        return commands[0][0] in GROUPABLE_METHODS
+    # (entity update : g.v(id).update(...))
+    return len(commands) == 2 and commands[0][0] in ('v', 'e') and commands[1][0] == 'update'
+
+
+def is_cacheable(commands):
+    for method_name, args, _ in commands:
+        if method_name in UNCACHEABLE_METHODS:
+            return False
+        if method_name == BATCH:
+            sub_commands_list = args[0]
+        elif method_name in READ_ONLY_OPERATIONS:
+            sub_commands_list = args
+        else:
+            continue
+        if not all(is_cacheable(sub_commands) for sub_commands in sub_commands_list):
+            return False
+    return True
+
+
+def cursor_reply(cursor_id, items, finished):
+    return {
+        '__': 'c',
+        'i': cursor_id,
+        'd': items,
+        'f': finished
+    }
+
+
+def run_commands(g, data):
+    obj = g
+    for item in data:
+        method_name, args, kwargs = item
+        method = getattr(obj, method_name)
+        obj = method(*args, **kwargs)
+    return obj
+
+
+def batch_result(g, batch):
+    # Command lists are run in order, an exception only fails its own item :
+    results = []
+    for data in batch:
+        try:
+            results.append(marshall(run_commands(g, data)))
+        except:
+            results.append(exception_result())
+    return results
+
+
+def build_reply(g, data, cursors):
+    # Returns (reply, reusable) : a reply is not reusable when it refers to an open cursor
+    if is_read_only(data):
+        # Every read of the request sees the same state of the graph
+        with g.read_snapshot():
+            return _build_reply(g, data, cursors)
+    return _build_reply(g, data, cursors)
+
+
+def _build_reply(g, data, cursors):
+    method_name, args, _ = data[-1]
+    if method_name == BATCH:
+        return msgpack.dumps(batch_result(g, *args), encoding='utf8'), True
+    if method_name == CURSOR_FETCH:
+        return msgpack.dumps(cursor_reply(*cursors.fetch(*args)), encoding='utf8'), False
+    if method_name == CURSOR_CLOSE:
+        cursors.close(*args)
+        return msgpack.dumps(True, encoding='utf8'), False
+    cursor_args = None
+    if method_name == CURSOR_OPEN:
+        cursor_args = args
+        data = data[:-1]
+    obj = run_commands(g, data)
+    # Results of read-only iterators are sent by batches (others are sent at once) :
+    if cursor_args is not None and isinstance(obj, (EntityAggregate, EntityIterator, GeneratorType)) and is_read_only(data):
+        cursor_id, items, finished = cursors.open(marshalled_items(obj), *cursor_args)
+        return msgpack.dumps(cursor_reply(cursor_id, items, finished), encoding='utf8'), finished
+    result = marshall(obj)
+    return msgpack.dumps(result, encoding='utf8'), True
+
+
+def execute(g, data, cursors, results=None):
+    if results is None:
+        return build_reply(g, data, cursors)[0]
+    if not is_read_only(data):
+        try:
+            return build_reply(g, data, cursors)[0]
+        finally:
+            # Even a failed write may have changed the graph
+            results.bump()
+    if not is_cacheable(data):
+        return build_reply(g, data, cursors)[0]
+    key = results.key(data)
+    reply = results.get(key)
+    if reply is None:
+        epoch = results.epoch
+        reply, reusable = build_reply(g, data, cursors)
+        if reusable:
+            results.set(key, reply, epoch)
+    return reply
+
+
+def marshalled_reply(obj):
+    return msgpack.dumps(marshall(obj), encoding='utf8')
+
+
+def exception_result():
+    return {
+        '__': 'x',
+        'd': traceback.format_exc()
+    }
+
+
+def exception_reply():
+    return msgpack.dumps(exception_result(), encoding='utf8')
+
+
+def worker(g, lock, cursors, results, committer, context, workers_address, stop_event):  # pragma : no cover
+    socket = context.socket(zmq.REP)
+    socket.connect(workers_address)
+    try:
+        while not stop_event.is_set():
+            if not socket.poll(WORKER_POLL_TIMEOUT, zmq.POLLIN):
+                continue
+            raw = socket.recv()
+            try:
+                data = fixbytes(msgpack.loads(raw, encoding='utf8'))
+                if committer is not None and is_groupable(data):
+                    # Committed with concurrent writes of other clients (reply is sent after the shared commit)
+                    socket.send(committer.submit(partial(run_commands, g, data), marshalled_reply))
+                    continue
+                # Read-only requests share the lock (if backend allows it), others get it exclusively :
+                read_only = g._concurrent_reads and is_read_only(data)
+                acquire, release = (lock.acquire_read, lock.release_read) if read_only else (lock.acquire_write, lock.release_write)
+                acquire()
+                try:
+                    reply = execute(g, data, cursors, results)
+                finally:
+                    release()
+            except:
+                reply = exception_reply()
+            socket.send(reply)
+    finally:
+        socket.close(linger=0)
+
+
+def serve_with_workers(g, cursors, results, _address, _context, _workers, _group_commit=None):  # pragma : no cover
+    """
+    A ROUTER socket receives client requests and dispatches them (through a DEALER socket) to <_workers> threads
+
+    With _group_commit (a window in milliseconds), concurrent single entity writes share backend transactions
+    """
+    frontend = _context.socket(zmq.ROUTER)
+    frontend.bind(_address)
+    workers_address = 'inproc://grapheekdb-workers-%s' % (uuid4().hex,)
+    backend = _context.socket(zmq.DEALER)
+    backend.bind(workers_address)
+    lock = ReadWriteLock()
+    committer = None
+    if _group_commit is not None:
+        committer = GroupCommitter(g, lock, float(_group_commit) / 1000., on_commit=results.bump if results is not None else None)
+    stop_event = threading.Event()
+    threads = [threading.Thread(target=worker, args=(g, lock, cursors, results, committer, _context, workers_address, stop_event)) for _ in range(_workers)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    poller = zmq.Poller()
+    poller.register(frontend, zmq.POLLIN)
+    poller.register(backend, zmq.POLLIN)
+    ipc = _address.startswith('ipc://')
+    try:
+        while True:
+            try:
+                events = dict(poller.poll())
+            except KeyboardInterrupt:
+                break
+            if frontend in events:
+                frames = frontend.recv_multipart()
+                # (same "stop" request as in single thread mode, cf runserver)
+                if ipc and frames[-1] == b'stop':
+                    frontend.send_multipart(frames[:-1] + [b'ok'])
+                    break
+                backend.send_multipart(frames)
+            if backend in events:
+                frontend.send_multipart(backend.recv_multipart())
+    finally:
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+        if committer is not None:
+            committer.close()
+        frontend.close(linger=0)
+        backend.close(linger=0)
+
+
+def runserver(_address, _backend, _scripts, _context, _workers=0, _cursor_expiry=DEFAULT_CURSOR_EXPIRY, _result_cache=0, _group_commit=None, **params):
     class_module_name, class_name = _backend.rsplit('.', 1)
     # START -- Following lines may raise an exception if data module cannot be imported
     # I'm letting exception propagate so that the user can fix path (or other potential errors)
@@ -90,6 +357,13 @@ def runserver(_address, _backend, _scripts, _context, **params):
         # --
         if _context is None:  # pragma : no cover
             _context = zmq.Context()
+        # Iterators kept open for clients fetching results by batches :
+        cursors = CursorRegistry(float(_cursor_expiry))
+        # Replies of read-only requests kept until next write (disabled when _result_cache is 0) :
+        results = ResultCache(int(_result_cache)) if int(_result_cache) > 0 else None
+        if int(_workers) > 0:
+            serve_with_workers(g, cursors, results, _address, _context, int(_workers), _group_commit)
+            return
         socket = _context.socket(zmq.REP)
         socket.bind(_address)
         # -----------------------------------------
@@ -107,22 +381,12 @@ def runserver(_address, _backend, _scripts, _context, **params):
                         break
                 # Handling request :
                 data = fixbytes(msgpack.loads(raw, encoding='utf8'))
-                obj = g
-                for item in data:
-                    method_name, args, kwargs = item
-                    method = getattr(obj, method_name)
-                    obj = method(*args, **kwargs)
-                result = marshall(obj)
-                socket.send(msgpack.dumps(result, encoding='utf8'))
+                socket.send(execute(g, data, cursors, results))
             except KeyboardInterrupt:
                 stop = True
             except:
-                result = {
-                    '__': 'x',
-                    'd': traceback.format_exc()
-                }
                 try:
-                    socket.send(msgpack.dumps(result, encoding='utf8'))
+                    socket.send(exception_reply())
                 except:
                     pass  # The server must not fail
                     # TODO : At least log an info
@@ -199,6 +463,42 @@ def main(cmds=None, verbose=True, context=None):
         default=default_scripts,
         help='Server side scripts module path. Must be of the form : path.to.my_module1.scripts:path.to.my_module2.scripts:[.. additional module path ..]',
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        dest="workers",
+        type=int,
+        required=False,
+        default=0,
+        help='Number of worker threads (0 : requests are handled one at a time by a single thread). With workers, read-only requests run concurrently when the backend allows it (writes are serialized)',
+    )
+    parser.add_argument(
+        "-e",
+        "--cursor-expiry",
+        dest="cursor_expiry",
+        type=float,
+        required=False,
+        default=DEFAULT_CURSOR_EXPIRY,
+        help='Seconds after which an unused cursor (iteration results not fetched yet by a client) is dropped',
+    )
+    parser.add_argument(
+        "-r",
+        "--result-cache",
+        dest="result_cache",
+        type=int,
+        required=False,
+        default=0,
+        help='Number of read-only request replies kept until next write (0 : no result cache). Only use it when no other process writes to the database',
+    )
+    parser.add_argument(
+        "-g",
+        "--group-commit",
+        dest="group_commit",
+        type=float,
+        required=False,
+        default=None,
+        help='Milliseconds a single entity write waits for concurrent ones, to share a backend transaction (needs workers). With 0, writes arriving while a commit is running share the next one',
+    )
     parser.add_argument(
         "params",
         nargs="*",
@@ -238,7 +538,8 @@ def main(cmds=None, verbose=True, context=None):
         'address': address,
         'backend': backend,
         'params': params,
-        'scripts': scripts
+        'scripts': scripts,
+        'workers': args.workers
     }
     label = "GrapheekDB Server version %(version)s" % config
     if verbose:  # pragma : no cover
@@ -248,8 +549,9 @@ def main(cmds=None, verbose=True, context=None):
         print("Backend              : %(backend)s" % config)
         print("Params               : %(params)s" % config)
         print("Server scripts paths : %(scripts)s" % config)
+        print("Workers              : %(workers)s" % config)
         print("Quit the server with CONTROL-C.")
-    runserver(address, backend, scripts, context, **params)
+    runserver(address, backend, scripts, context, args.workers, args.cursor_expiry, args.result_cache, args.group_commit, **params)
 
 
 if __name__ == '__main__':  # pragma : no cover
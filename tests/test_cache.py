@@ -0,0 +1,65 @@
+#!/usr/bin/env
+# -*- coding: utf-8 -*-
+
+from grapheekdb.lib.cache import LRUCache, approximate_size
+from grapheekdb.lib.undef import UNDEFINED
+
+
+class TestLRUCache(object):
+
+    def test_get_and_set(self):
+        cache = LRUCache()
+        assert(cache.get('a') == UNDEFINED)
+        cache.set('a', [1, 2])
+        assert(cache.get('a') == [1, 2])
+        assert(cache.hits == 1)
+        assert(cache.misses == 1)
+
+    def test_eviction_by_entries(self):
+        cache = LRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')  # 'b' becomes the least recently used entry
+        cache.set('c', 3)
+        assert(len(cache) == 2)
+        assert(cache.get('b') == UNDEFINED)
+        assert(cache.get('a') == 1)
+        assert(cache.get('c') == 3)
+
+    def test_eviction_by_bytes(self):
+        value = list(range(100))
+        cache = LRUCache(max_bytes=2 * approximate_size(value))
+        cache.set('a', value)
+        cache.set('b', value)
+        cache.set('c', value)
+        assert(len(cache) == 2)
+        assert(cache.get('a') == UNDEFINED)
+        assert(cache.stats()['bytes'] <= 2 * approximate_size(value))
+
+    def test_too_big_value_is_not_cached(self):
+        cache = LRUCache(max_bytes=10)
+        cache.set('a', list(range(100)))
+        assert(len(cache) == 0)
+        assert(cache.stats()['bytes'] == 0)
+
+    def test_invalidation(self):
+        cache = LRUCache()
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('c', 3)
+        cache.invalidate('a')
+        cache.bulk_invalidate(['b', 'unknown'])
+        assert(cache.get('a') == cache.get('b') == UNDEFINED)
+        assert(cache.get('c') == 3)
+        cache.clear()
+        assert(cache.stats()['entries'] == cache.stats()['bytes'] == 0)
+
+    def test_generation(self):
+        cache = LRUCache()
+        generation = cache.generation
+        cache.bulk_invalidate(['a'], new_generation=True)
+        # (a value read before the new generation isn't stored)
+        cache.set('a', 1, generation)
+        assert(cache.get('a') == UNDEFINED)
+        cache.set('a', 2, cache.generation)
+        assert(cache.get('a') == 2)
@@ -1,15 +1,20 @@
 # -*- coding:utf-8 -*-
 
 #import zmq.green as zmq
+import os
+import tempfile
+
 import zmq
 
 import time
 from multiprocessing import Process, Queue
 from uuid import uuid4
 from grapheekdb.client.api import ProxyGraph
+from grapheekdb.client.pool import get_connection_pool
 from grapheekdb.server.serve import runserver
 from grapheekdb.lib.exceptions import GrapheekException
 from grapheekdb.lib.exceptions import GrapheekUnmarshallingException
+from grapheekdb.lib.exceptions import GrapheekConnectionTimeoutException
 
 from .data_backend_common import FillMethod, CommonMethods
 
@@ -73,6 +78,7 @@ class TestClient(FillMethod, CommonMethods):
     def teardown(self):
         self.graph._zmq_socket.send_string('stop')
         self.graph._zmq_socket.close()
+        self.graph.close()
         self.server_process.terminate()
 
     def test_client_exception(self):
@@ -99,9 +105,117 @@ class TestClient(FillMethod, CommonMethods):
             exception_raised = True
         assert(exception_raised)
 
+    def test_connections_are_reused(self):
+        pool = get_connection_pool(self.address)
+        self.graph.V().count()
+        sockets = list(pool._idle_sockets)
+        assert(len(sockets) == 1)
+        self.graph.V().count()
+        assert(pool._idle_sockets == sockets)
+        self.graph.close()
+        assert(sockets[0].closed)
+        assert(self.graph.V().count() == 3)
+
+    def test_request_timeout(self):
+        graph = ProxyGraph("ipc:///tmp/%s" % (uuid4().int,), timeout=0.1)
+        exception_raised = False
+        try:
+            graph.V().count()
+        except GrapheekConnectionTimeoutException:
+            exception_raised = True
+        assert(exception_raised)
+        assert(get_connection_pool(graph._address)._idle_sockets == [])
+        graph.close()
+
+    def test_iteration_by_batches(self):
+        self.graph._batch_size = 2
+        assert(sorted(node.name for node in self.graph.V()) == ['Flo', 'Raf', 'Theo'])
+        assert(len(list(self.graph.V().outV())) == 2)
+        assert(sorted(value for _, value in self.graph.V().sum('foo')) == [1, 1, 2])
+
+    def test_iteration_stopped_before_the_end(self):
+        self.graph._batch_size = 2
+        nodes = self.graph.V()
+        assert(next(nodes).name in ('Raf', 'Flo', 'Theo'))
+        nodes.close()
+        # iteration restarts :
+        assert(len(list(nodes)) == 3)
+        # remaining items can't be fetched once the cursor is closed :
+        nodes.close()
+        exception_raised = False
+        try:
+            self.graph._request([['_cursor_fetch', [1, 2], {}]])
+        except GrapheekException:
+            exception_raised = True
+        assert(exception_raised)
+
+    def test_projected_data_is_sent(self):
+        node = list(self.graph.V(name='Raf').project(only=['name']))[0]
+        assert(node._data == {'name': 'Raf'})
+        node = list(self.graph.V(name='Raf').project(exclude=['name', 'baz']))[0]
+        assert(node._data == {'foo': 1, 'bar': 2})
+        self.graph._batch_size = 2
+        assert(sorted(self.graph.V().ids()) == sorted([self.n1.get_id(), self.n2.get_id(), self.n3.get_id()]))
+        assert(sorted(self.graph.V().values('name')) == [['Flo'], ['Raf'], ['Theo']])
+
+    def test_batch(self):
+        pool = get_connection_pool(self.address)
+        nodes = list(self.graph.V().order_by('name'))
+        sockets = list(pool._idle_sockets)
+        with self.graph.batch() as batch:
+            counts = [batch.v(node.get_id()).outV().count() for node in nodes]
+            names = batch.V(foo=1).order_by('name').all()
+            new_node = batch.add_node(name='Bob')
+            assert(len(batch) == 5)
+        assert(pool._idle_sockets == sockets)
+        assert([count.value for count in counts] == [1, 1, 0])
+        assert([node.name for node in names.value] == ['Flo', 'Raf'])
+        assert(new_node.value.name == 'Bob')
+        assert(self.graph.V(name='Bob').count() == 1)
+
+    def test_batch_errors(self):
+        batch = self.graph.batch()
+        count1 = batch.V().count()
+        # adding the same index twice must fail :
+        batch.add_node_index('foo')
+        failure = batch.add_node_index('foo')
+        count2 = batch.E().count()
+        exception_raised = False
+        try:
+            count1.value
+        except GrapheekException:
+            exception_raised = True
+        assert(exception_raised)
+        results = batch.execute()
+        assert(results[0] == 3 and results[3] == 2)
+        assert(isinstance(results[2], GrapheekException))
+        assert(count1.value == 3 and count2.value == 2)
+        assert(failure.error is results[2])
+        exception_raised = False
+        try:
+            failure.value
+        except GrapheekException:
+            exception_raised = True
+        assert(exception_raised)
+        assert(batch.execute() == [])
+
+    def test_batch_iteration_forbidden(self):
+        exception_raised = False
+        try:
+            list(self.graph.batch().V())
+        except GrapheekException:
+            exception_raised = True
+        assert(exception_raised)
+
     def test_double_close(self):
         pass  # disable inherited method
 
+    def test_group_commit(self):
+        pass  # disable inherited method
+
+    def test_group_commit_failure(self):
+        pass  # disable inherited method
+
     def test_partial_indexes_4(self):
         pass  # disable inherited method
 
@@ -130,6 +244,79 @@ class TestClient(FillMethod, CommonMethods):
         pass  # disable inherited method
 
 
+class TestClientWithWorkers(TestClient):
+    """
+    Same tests, with a server running worker threads
+    """
+
+    def setup(self):
+        self.address = "ipc:///tmp/%s" % (uuid4().int,)
+        self.backend = "grapheekdb.backends.data.localmem.LocalMemoryGraph"
+        self.params = {'_workers': 4}
+        self.scripts = ''
+        self.server_process = Process(target=serve, args=(self.address, self.backend, self.scripts), kwargs=self.params)
+        self.server_process.start()
+        self.graph = WaitingProxyGraph(self.address)
+        self.fill()
+
+
+class TestClientWithResultCache(TestClient):
+    """
+    Same tests, with a server keeping replies of read-only requests
+    """
+
+    def setup(self):
+        self.address = "ipc:///tmp/%s" % (uuid4().int,)
+        self.backend = "grapheekdb.backends.data.localmem.LocalMemoryGraph"
+        self.params = {'_result_cache': 100}
+        self.scripts = ''
+        self.server_process = Process(target=serve, args=(self.address, self.backend, self.scripts), kwargs=self.params)
+        self.server_process.start()
+        self.graph = WaitingProxyGraph(self.address)
+        self.fill()
+
+    def test_cache_stats(self):
+        pass  # disable inherited method (repeated reads are answered by result cache, not by backend cache)
+
+
+class TestClientWithGroupCommit(TestClient):
+    """
+    Same tests, with a (transactional) sqlite backend and writes sharing commits
+    """
+
+    def setup(self):
+        self.address = "ipc:///tmp/%s" % (uuid4().int,)
+        self.backend = "grapheekdb.backends.data.sqlite.SqliteGraph"
+        self.dbpath = tempfile.mktemp()
+        self.params = {'filename': self.dbpath, '_workers': 4, '_group_commit': 1}
+        self.scripts = ''
+        self.server_process = Process(target=serve, args=(self.address, self.backend, self.scripts), kwargs=self.params)
+        self.server_process.start()
+        self.graph = WaitingProxyGraph(self.address)
+        self.fill()
+
+    def teardown(self):
+        super(TestClientWithGroupCommit, self).teardown()
+        try:
+            os.remove(self.dbpath)
+        except OSError:  # pragma : no cover
+            pass
+
+    def test_concurrent_writes(self):
+        import threading
+        nodes = []
+
+        def write(number):
+            nodes.append(self.graph.add_node(number=number))
+        threads = [threading.Thread(target=write, args=(number,)) for number in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert(sorted(node.number for node in nodes) == list(range(20)))
+        assert(self.graph.V(number__gte=0).count() == 20)
+
+
 class TestConcurrentAccess(object):
     """
     This is not a deterministic test <-> anti-pattern
@@ -148,6 +335,7 @@ class TestConcurrentAccess(object):
     def teardown(self):
         self.graph._zmq_socket.send_string('stop')
         self.graph._zmq_socket.close()
+        self.graph.close()
         self.server_process.terminate()
 
     def _concurrency(self, count):
@@ -171,6 +359,18 @@ class TestConcurrentAccess(object):
         assert(all(results))
 
 
+class TestConcurrentAccessWithWorkers(TestConcurrentAccess):
+
+    def setup(self):
+        self.address = "ipc:///tmp/%s" % (uuid4().int,)
+        self.backend = "grapheekdb.backends.data.localmem.LocalMemoryGraph"
+        self.params = {'_workers': 4}
+        self.scripts = ''
+        self.graph = WaitingProxyGraph(self.address)
+        self.server_process = Process(target=serve, args=(self.address, self.backend, self.scripts), kwargs=self.params)
+        self.server_process.start()
+
+
 class TestServerSideScriptCallByClient(object):
 
     def setup(self):
@@ -190,6 +390,7 @@ class TestServerSideScriptCallByClient(object):
     def teardown(self):
         self.graph._zmq_socket.send_string('stop')
         self.graph._zmq_socket.close()
+        self.graph.close()
         self.server_process.terminate()
 
     def test_server_script_add_edge(self):
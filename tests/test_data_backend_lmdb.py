@@ -2,6 +2,9 @@
 
 import tempfile
 import shutil
+import threading
+
+from grapheekdb.lib.exceptions import GrapheekDataException
 
 from .test_data_backend_localmem import TLocalMemoryGraph
 
@@ -27,3 +30,173 @@ class TestlmdbGraph(TLocalMemoryGraph):
         self.e1 = self.e2 = None
         # Just checking that no exception raised :
         del self.graph
+
+    def test_read_snapshot_is_repeatable(self):
+        with self.graph.read_snapshot():
+            assert(self.graph.V().count() == 3)
+            self.graph.add_node(name='Bob')  # written (and committed) by this thread
+            thread = threading.Thread(target=setattr, args=(self.n1, 'name', 'Ralf'))  # and by another one
+            thread.start()
+            thread.join()
+            # Writes committed after the snapshot start are not seen :
+            assert(self.graph.V().count() == 3)
+            assert(sorted(self.graph.V().values('name')) == [['Flo'], ['Raf'], ['Theo']])
+        assert(self.graph.V().count() == 4)
+        assert(sorted(self.graph.V().values('name')) == [['Bob'], ['Flo'], ['Ralf'], ['Theo']])
+
+    def test_read_snapshot_with_cache(self):
+        self.graph.enable_cache()
+        assert(self.n1.name == 'Raf')  # cached
+        with self.graph.read_snapshot():
+            self.n1.name = 'Ralf'
+            assert(self.graph.V(name='Raf').count() == 1)
+        assert(self.graph.V(name='Ralf').count() == 1)
+
+    def test_remove_prefix(self):
+        txn = self.graph._transaction_begin()
+        for key in ['t/a', 't/b/1', 't/b/2', 't/c']:
+            self.graph._set(txn, key, key)
+        self.graph._remove_prefix(txn, 't/b/')
+        self.graph._remove_prefix(txn, 'zzz')  # no key after prefix
+        self.graph._transaction_commit(txn)
+        assert(self.graph._bulk_get(None, ['t/a', 't/b/1', 't/b/2', 't/c']) == {'t/a': 't/a', 't/c': 't/c'})
+
+    def test_bulk_reads(self):
+        txn = self.graph._transaction_begin()
+        self.graph._bulk_set(txn, {'t/a': {'x': 1}, 't/b': 2})
+        self.graph._store_lst(txn, 't/l', [3, 1, 2])
+        self.graph._transaction_commit(txn)
+        assert(self.graph._bulk_get(None, ['t/b', 't/missing', 't/a', 't/a']) == {'t/a': {'x': 1}, 't/b': 2})
+        assert(self.graph._bulk_load_lst(None, ['t/missing', 't/l']) == {'t/l': [3, 1, 2]})
+
+    def test_map_grows_when_full(self):
+        from grapheekdb.backends.data.symaslmdb import LmdbGraph
+        self.graph._db_close()
+        shutil.rmtree(self.dbpath)
+        self.graph = LmdbGraph(self.dbpath, map_size=64 * 1024)
+        self.fill()
+        self.graph.add_node_index('name')
+        self.graph.bulk_add_node([dict(name='bulk', content='x' * 1000) for _ in range(200)])
+        for _ in range(20):
+            self.graph.add_node(name='single', content='x' * 10000)
+        assert(self.graph._env.info()['map_size'] > 64 * 1024)
+        assert(self.graph.V(name='bulk').count() == 200)
+        assert(self.graph.V(name='single').count() == 20)
+        assert(self.graph.V().count() == 223)
+
+    def test_map_growth_limit(self):
+        from grapheekdb.backends.data.symaslmdb import LmdbGraph
+        self.graph._db_close()
+        shutil.rmtree(self.dbpath)
+        self.graph = LmdbGraph(self.dbpath, map_size=64 * 1024, max_map_size=128 * 1024)
+        self.fill()
+        exception_raised = False
+        try:
+            self.graph.bulk_add_node([dict(content='x' * 1000) for _ in range(1000)])
+        except GrapheekDataException:
+            exception_raised = True
+        assert(exception_raised)
+        assert(self.graph._env.info()['map_size'] == 128 * 1024)
+        assert(self.graph.V().count() == 3)
+
+    def test_map_doesnt_grow_while_another_thread_reads(self):
+        from grapheekdb.backends.data.symaslmdb import LmdbGraph
+        self.graph._db_close()
+        shutil.rmtree(self.dbpath)
+        self.graph = LmdbGraph(self.dbpath, map_size=64 * 1024)
+        self.fill()
+        reading = threading.Event()
+        done = threading.Event()
+
+        def read():
+            with self.graph.read_snapshot():
+                self.graph.V().count()
+                reading.set()
+                done.wait(10)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        reading.wait(10)
+        exception_raised = False
+        try:
+            self.graph.bulk_add_node([dict(content='x' * 1000) for _ in range(200)])
+        except GrapheekDataException:
+            exception_raised = True
+        done.set()
+        reader.join()
+        assert(exception_raised)
+        assert(self.graph._env.info()['map_size'] == 64 * 1024)
+        assert(self.graph._open_txns == 0)
+        # Once the reader is gone, the map can grow :
+        self.graph.bulk_add_node([dict(content='x' * 1000) for _ in range(200)])
+        assert(self.graph._env.info()['map_size'] > 64 * 1024)
+        assert(self.graph.V().count() == 203)
+
+
+
+class TestlmdbGraphWithSubDatabases(TestlmdbGraph):
+
+    def setup(self):
+        from grapheekdb.backends.data.symaslmdb import LmdbGraph
+        self.dbpath = tempfile.mktemp()
+        self.graph = LmdbGraph(self.dbpath, map_size=10 * 1024 * 1024, sub_databases=True)
+        self.fill()
+
+    def test_map_grows_when_full(self):
+        # Disabling this test : it reopens a database without sub-databases
+        pass
+
+    def test_map_growth_limit(self):
+        # Disabling this test : same reason
+        pass
+
+    def test_map_doesnt_grow_while_another_thread_reads(self):
+        # Disabling this test : same reason
+        pass
+
+    def test_key_families_are_separated(self):
+        with self.graph._env.begin() as txn:
+            assert(txn.get(b'm/v/c', db=self.graph._dbs['m/']) is not None)
+            assert(txn.get(b'm/v/c') is None)
+            assert(txn.get(b'v/0/d', db=self.graph._dbs['v/']) is not None)
+            assert(txn.get(b'v/0/d', db=self.graph._dbs['e/']) is None)
+
+    def test_snapshot_reads_use_cache(self):
+        from grapheekdb.server.serve import execute
+        from grapheekdb.server.cursors import CursorRegistry
+        self.graph.enable_cache()
+        for _ in range(3):
+            assert(self.graph.V(name='Raf').outE().outV().data() == [self.n2.data()])
+        hits = self.graph.get_cache_stats()['hits']
+        assert(hits > 0)
+        # Read-only server requests run in a snapshot, too :
+        commands = [['V', [], {'name': 'Raf'}], ['outV', [], {}], ['data', [], {}]]
+        for _ in range(3):
+            execute(self.graph, commands, CursorRegistry())
+        assert(self.graph.get_cache_stats()['hits'] > hits)
+        # Once a write is committed, snapshots opened before it no longer use the cache :
+        with self.graph.read_snapshot():
+            hits = self.graph.get_cache_stats()['hits']
+            self.n2.name = 'Florence'
+            assert(self.graph.V(name='Raf').outV().data() == [{'name': 'Flo', 'foo': 1, 'bar': 3}])
+            assert(self.graph.get_cache_stats()['hits'] == hits)
+        assert(self.graph.V(name='Raf').outV().data()[0]['name'] == 'Florence')
+
+    def test_read_before_commit_isnt_kept_in_cache(self):
+        from grapheekdb.backends.data.operations import Addition
+        self.graph.enable_cache()
+        key = 'v/%s/d' % (self.n1.get_id(),)
+        old = self.graph._cached_get(None, key)
+        txn = self.graph._txn_begin()
+        operation = Addition()
+        operation.set(key, dict(old, name='Ralf'))
+        operation.apply(txn, self.graph)
+        # Another thread reads (and caches) the committed value before the write commits :
+        reads = []
+        reader = threading.Thread(target=lambda: reads.append(self.graph._cached_get(None, key)))
+        reader.start()
+        reader.join()
+        self.graph._txn_commit(txn)
+        assert(reads[0]['name'] == 'Raf')
+        assert(self.graph._cached_get(None, key)['name'] == 'Ralf')
+        assert(self.n1.data()['name'] == 'Ralf')
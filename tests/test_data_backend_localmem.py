@@ -14,6 +14,8 @@ from grapheekdb.lib.exceptions import GrapheekIndexCreationFailedException
 from grapheekdb.lib.exceptions import GrapheekSubLookupNotImplementedException
 from grapheekdb.lib.exceptions import GrapheekUnknownScriptException
 
+from grapheekdb.lib.undef import UNDEFINED
+
 from grapheekdb.backends.data.keys import METADATA_VERTEX_COUNTER, METADATA_EDGE_COUNTER
 from grapheekdb.backends.data.keys import METADATA_VERTEX_INDEX_COUNTER, METADATA_EDGE_INDEX_COUNTER
 from grapheekdb.backends.data.keys import METADATA_VERTEX_INDEX_PREFIX, METADATA_EDGE_INDEX_PREFIX
@@ -288,6 +290,233 @@ class TLocalMemoryGraph(FillMethod, CommonMethods):  # Not using "Test" in names
         total_calls_with_index = stats.total_calls
         assert(total_calls_with_index < total_calls_without_index / 20)  # 20 is totally subjective
 
+    def test_range_index_is_used(self):
+        import cProfile
+        import pstats
+        count = 10 * CHUNK_SIZE
+        self.graph.bulk_add_node([dict(timestamp=i) for i in range(count)])
+        pr = cProfile.Profile()
+        pr.enable()
+        count_without_index = self.graph.V(timestamp__gte=count - 10).count()
+        pr.disable()
+        stats = pstats.Stats(pr)
+        total_calls_without_index = stats.total_calls
+        self.graph.add_node_range_index('timestamp')
+        pr = cProfile.Profile()
+        pr.enable()
+        count_with_index = self.graph.V(timestamp__gte=count - 10).count()
+        pr.disable()
+        stats = pstats.Stats(pr)
+        total_calls_with_index = stats.total_calls
+        assert(count_without_index == count_with_index == 10)
+        # (a whole run is read and deserialized, so the gain is lower than with exact indexes)
+        assert(total_calls_with_index < total_calls_without_index / 10)  # 10 is totally subjective
+
+    def test_iterator_replays_its_plan(self):
+        nodes = self.graph.V(foo__gte=1)
+        out_nodes = self.n1.outV()
+        assert(nodes.count() == 3)
+        assert(out_nodes.count() == 1)
+        # Iterators are not buffered : iterating them again re-runs the query
+        self.graph.add_node(foo=1)
+        self.graph.add_edge(self.n1, self.n3)
+        assert(nodes.count() == len(list(nodes)) == 4)
+        assert(out_nodes.count() == 2)
+
+    def test_materialize(self):
+        nodes = self.graph.V(foo__gte=1).materialize()
+        assert(nodes.count() == 3)
+        self.graph.add_node(foo=1)
+        assert(nodes.count() == len(list(nodes)) == 3)
+        assert(sorted(nodes.ids()) == sorted([self.n1.get_id(), self.n2.get_id(), self.n3.get_id()]))
+        assert(nodes.outV().count() == 2)
+
+    def test_count_doesnt_read_entities(self):
+        def fail(*args, **kwargs):
+            raise AssertionError('entities should not be read')
+        self.graph.add_node_index('name')
+        self.graph._cached_get_lst = self.graph._bulk_get_lst = self.graph._bulk_get_data = fail
+        assert(self.graph.V().count() == 3)
+        assert(self.graph.E().count() == 2)
+        assert(self.graph.V(name='Raf').count() == 1)
+        assert(self.n2.bothE().count() == 2)
+        assert(self.graph.e(0).bothV().count() == 2)
+
+    def test_order_by_limit_keeps_ties_order(self):
+        nodes = self.graph.bulk_add_node([dict(score=i % 7, i=i) for i in range(1000)])
+        expected = sorted(nodes, key=lambda node: -node.score)
+        assert(list(self.graph.V(i__gte=0).order_by('-score').limit(20)) == expected[:20])
+        assert(list(self.graph.V(i__gte=0).order_by('-score')) == expected)
+
+    def test_filter_fetches_data_by_windows(self):
+        from grapheekdb.backends.data.filtertools import FILTER_WINDOW_SIZE
+        self.graph.bulk_add_node([dict(i=i) for i in range(2 * FILTER_WINDOW_SIZE)])
+        expected = [node.get_id() for node in self.graph.V() if node.data().get('i', -1) % 3 == 0]
+        windows = []
+        bulk_get_data = self.graph._bulk_get_data
+
+        def counting_bulk_get_data(txn, kind, entity_ids):
+            windows.append(len(entity_ids))
+            return bulk_get_data(txn, kind, entity_ids)
+
+        self.graph._bulk_get_data = counting_bulk_get_data
+        found = [node.get_id() for node in self.graph.V(i__in=list(range(0, 2 * FILTER_WINDOW_SIZE, 3)))]
+        del self.graph._bulk_get_data
+        assert(found == expected)
+        assert(max(windows) == FILTER_WINDOW_SIZE)
+        assert(len(windows) == 3)  # 2 * FILTER_WINDOW_SIZE nodes + nodes added by fill method
+
+    def test_big_list(self):
+        key = 'test/lst'
+        values = list(range(2 * CHUNK_SIZE + 10))
+        txn = self.graph._transaction_begin()
+        self.graph._init_lst(txn, key)
+        self.graph._bulk_append_to_lst(txn, key, values[:CHUNK_SIZE])
+        for value in values[CHUNK_SIZE:CHUNK_SIZE + 20]:
+            self.graph._append_to_lst(txn, key, value)
+        self.graph._bulk_append_to_lst(txn, key, values[CHUNK_SIZE + 20:])
+        self.graph._transaction_commit(txn)
+        assert(self.graph._get_lst(None, key) == values)
+        txn = self.graph._transaction_begin()
+        self.graph._remove_from_lst(txn, key, 5)
+        self.graph._bulk_remove_from_lst(txn, key, [CHUNK_SIZE + 1, 2 * CHUNK_SIZE])
+        self.graph._transaction_commit(txn)
+        values = [value for value in values if value not in (5, CHUNK_SIZE + 1, 2 * CHUNK_SIZE)]
+        assert(self.graph._bulk_get_lst(None, [key])[0] == values)
+        txn = self.graph._transaction_begin()
+        self.graph._bulk_remove_from_lst(txn, key, values[10:-10])
+        self.graph._transaction_commit(txn)
+        assert(self.graph._get_lst(None, key) == values[:10] + values[-10:])
+        txn = self.graph._transaction_begin()
+        self.graph._set_lst(txn, key, values)
+        self.graph._remove_lst(txn, key)
+        self.graph._transaction_commit(txn)
+        assert(self.graph._get_lst(None, key) == UNDEFINED)
+        assert(self.graph._get(None, key + '/lc/0') == UNDEFINED)
+
+    def test_supernode(self):
+        nodes = self.graph.bulk_add_node([dict(i=i) for i in range(2 * CHUNK_SIZE + 10)])
+        hub = self.graph.add_node(name='hub')
+        edges = self.graph.bulk_add_edge([(hub, node, dict(i=i)) for i, node in enumerate(nodes)])
+        edges[0].remove()
+        edges[-1].remove()
+        assert(hub.outE().count() == 2 * CHUNK_SIZE + 8)
+        assert(list(hub.outV().ids()) == [node.get_id() for node in nodes[1:-1]])
+        assert(nodes[1].inV().next() == hub)
+        hub.remove()
+        assert(nodes[1].inV().count() == 0)
+        assert(self.graph.E().count() == 2)
+
+    def test_big_list_removal_with_duplicates(self):
+        key = 'test/lst'
+        values = list(range(CHUNK_SIZE)) * 2 + [1, 2]
+        txn = self.graph._transaction_begin()
+        self.graph._set_lst(txn, key, values)
+        # only the first occurences are removed :
+        self.graph._bulk_remove_from_lst(txn, key, [1, 1, 1, 2, CHUNK_SIZE - 1])
+        self.graph._transaction_commit(txn)
+        expected = values[:]
+        for value in [1, 1, 1, 2, CHUNK_SIZE - 1]:
+            expected.remove(value)
+        assert(self.graph._get_lst(None, key) == expected)
+        exception_raised = False
+        txn = self.graph._transaction_begin()
+        try:
+            self.graph._bulk_remove_from_lst(txn, key, [2, 2, 2])
+        except ValueError:
+            exception_raised = True
+        self.graph._transaction_commit(txn)
+        assert(exception_raised)
+        assert(self.graph._get_lst(None, key) == expected)
+
+    def test_list_removal_is_done_in_a_single_pass(self):
+        import cProfile
+        import pstats
+        key = 'test/lst'
+        values = list(range(2 * CHUNK_SIZE))
+        txn = self.graph._transaction_begin()
+        self.graph._set_lst(txn, key, values)
+        self.graph._transaction_commit(txn)
+        txn = self.graph._transaction_begin()
+        pr = cProfile.Profile()
+        pr.enable()
+        self.graph._bulk_remove_from_lst(txn, key, values[::-2])
+        pr.disable()
+        self.graph._transaction_commit(txn)
+        # (list.remove would scan the list once per removed value)
+        removes = [func for func in pstats.Stats(pr).stats if "'remove' of 'list' objects" in func[2]]
+        assert(removes == [])
+        assert(self.graph._get_lst(None, key) == values[::2])
+
+    def test_supernode_removal(self):
+        nodes = self.graph.bulk_add_node([dict(i=i) for i in range(CHUNK_SIZE + 10)])
+        hub = self.graph.add_node(name='hub')
+        edge_defns = [(hub, node, {}) for node in nodes] + [(node, hub, {}) for node in nodes[::2]]
+        edge_defns += [(hub, nodes[0], {}), (hub, hub, {})]
+        self.graph.bulk_add_edge(edge_defns)
+        self.graph.add_edge(nodes[0], nodes[1])
+        hub.remove()
+        # (fill method added 3 nodes and 2 edges)
+        assert(self.graph.E().count() == 3)
+        assert(self.graph.V().count() == CHUNK_SIZE + 13)
+        assert(list(nodes[0].bothV()) == [nodes[1]])
+        assert(nodes[0].bothV().count() == 1)
+        assert(nodes[2].bothE().count() == 0)
+        assert(self.graph.V(name='hub').count() == 0)
+
+    def test_vertex_centric_index_is_used(self):
+        import cProfile
+        import pstats
+        # A "supernode" with many out edges, only a few of them having the wanted label :
+        hub = self.graph.add_node(name='hub')
+        nodes = self.graph.bulk_add_node([dict(i=i) for i in range(CHUNK_SIZE)])
+        self.graph.bulk_add_edge([(hub, node, dict(label='rare' if i % 100 == 0 else 'common')) for i, node in enumerate(nodes)])
+        pr = cProfile.Profile()
+        pr.enable()
+        count_without_index = hub.outE(label='rare').count()
+        pr.disable()
+        stats = pstats.Stats(pr)
+        total_calls_without_index = stats.total_calls
+        # Same traversal WITH vertex centric index :
+        self.graph.add_vertex_centric_index('label')
+        pr = cProfile.Profile()
+        pr.enable()
+        count_with_index = hub.outE(label='rare').count()
+        pr.disable()
+        stats = pstats.Stats(pr)
+        total_calls_with_index = stats.total_calls
+        assert(count_without_index == count_with_index == CHUNK_SIZE // 100)
+        assert(total_calls_with_index < total_calls_without_index / 20)  # 20 is totally subjective
+
+    def test_vertex_centric_lists_are_removed(self):
+        self.graph.add_vertex_centric_index('label')
+        n1, n2, n3 = self.n1.get_id(), self.n2.get_id(), self.n3.get_id()
+
+        def vertex_centric_keys(node_id, value):
+            return ['v/%s/%s/vc/label/"%s"' % (node_id, traversal, value) for traversal in ('oe', 'ie', 'be')]
+
+        def existing(keys):
+            return [key for key in keys if self.graph._get_lst(None, key) != UNDEFINED]
+        knows_keys = vertex_centric_keys(n1, 'knows') + vertex_centric_keys(n2, 'knows')
+        assert(len(existing(knows_keys)) == 4)  # (out and both lists of n1, in and both lists of n2)
+        # Emptied lists are dropped :
+        self.e1.remove()
+        assert(existing(knows_keys) == [])
+        # A node removal drops its lists :
+        parent_keys = vertex_centric_keys(n2, 'is_parent') + vertex_centric_keys(n3, 'is_parent')
+        assert(len(existing(parent_keys)) == 4)
+        self.graph.V().remove()
+        assert(existing(parent_keys) == [])
+
+    def test_vertex_centric_index_removal_drops_lists(self):
+        self.graph.add_vertex_centric_index('label')
+        n1, n2, n3 = self.n1.get_id(), self.n2.get_id(), self.n3.get_id()
+        keys = ['v/%s/%s/vc/label/"%s"' % (node_id, traversal, value)
+                for node_id, traversal, value in [(n1, 'oe', 'knows'), (n2, 'ie', 'knows'), (n2, 'oe', 'is_parent'), (n3, 'ie', 'is_parent')]]
+        assert(all(self.graph._get_lst(None, key) != UNDEFINED for key in keys))
+        self.graph.remove_vertex_centric_index('label')
+        assert(all(self.graph._get_lst(None, key) == UNDEFINED for key in keys))
+
     def test_index_multi_chunk(self):
         count = CHUNK_SIZE + 100
         data = []
@@ -439,11 +668,42 @@ class TLocalMemoryGraph(FillMethod, CommonMethods):  # Not using "Test" in names
         from grapheekdb.backends.data.keys import KIND_VERTEX
         self.graph.update_data(KIND_VERTEX, self.n1.get_id(), 'foo', 10)
 
+    # Test read snapshots :
+
+    def test_read_snapshot(self):
+        with self.graph.read_snapshot():
+            assert(self.graph.V().count() == 3)
+            with self.graph.read_snapshot():  # nested scopes are allowed
+                assert(sorted(self.graph.V().values('name')) == [['Flo'], ['Raf'], ['Theo']])
+            assert(self.graph.V(name='Raf').outV().data() == [self.n2.data()])
+        # Scope is left even if an exception is raised :
+        exception_raised = False
+        try:
+            with self.graph.read_snapshot():
+                raise GrapheekDataException('test')
+        except GrapheekDataException:
+            exception_raised = True
+        assert(exception_raised)
+        assert(self.graph._snapshot_txn() is None)
+
 
 class TestLocalMemoryGraph(TLocalMemoryGraph):
     pass
 
 
+class TestCacheHasNoEffectsOnResultsLocalMem(TLocalMemoryGraph):
+
+    def setup(self):
+        from grapheekdb.backends.data.localmem import LocalMemoryGraph
+        self.graph = LocalMemoryGraph()
+        self.graph.enable_cache(max_entries=10)  # Small cache, so that evictions also occur
+        self.fill()
+
+    def test_cache_stats(self):
+        # Disabling this test : cache is already enabled
+        pass
+
+
 class TAddingIndexesHasNoEffectsOnResultsLocalMem(TLocalMemoryGraph):
 
     def setup(self):
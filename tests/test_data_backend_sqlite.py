@@ -2,6 +2,9 @@
 
 import tempfile
 import os
+import sys
+
+from grapheekdb.lib.undef import UNDEFINED
 
 from .test_data_backend_localmem import TLocalMemoryGraph
 
@@ -26,3 +29,110 @@ class TestSqliteGraph(TLocalMemoryGraph):
         self.e1 = self.e2 = None
         # Just checking that no exception raised :
         del self.graph
+
+    def test_keys_are_bound_as_parameters(self):
+        keys = ["t/quote'd", 't/%', 't/_x', 't/a_b']
+        txn = self.graph._transaction_begin()
+        self.graph._bulk_set(txn, dict((key, key) for key in keys))
+        self.graph._transaction_commit(txn)
+        assert(self.graph._bulk_get(None, keys + ['t/missing']) == dict((key, key) for key in keys))
+        txn = self.graph._transaction_begin()
+        self.graph._remove_prefix(txn, 't/a_')  # "_" is not a wildcard
+        self.graph._bulk_remove(txn, ["t/quote'd"])
+        self.graph._transaction_commit(txn)
+        assert(sorted(self.graph._bulk_get(None, keys)) == ['t/%', 't/_x'])
+
+    def test_remove_prefix_ending_with_greatest_code_point(self):
+        top = (unichr if sys.version_info.major == 2 else chr)(sys.maxunicode)
+        keys = ['t/a', 't/a' + top, 't/a' + top + 'x', 't/b' + top, top, top + top + 'x']
+        txn = self.graph._transaction_begin()
+        self.graph._bulk_set(txn, dict((key, 1) for key in keys))
+        self.graph._remove_prefix(txn, 't/a' + top)
+        self.graph._remove_prefix(txn, top + top)
+        self.graph._transaction_commit(txn)
+        assert(sorted(self.graph._bulk_get(None, keys)) == sorted(['t/a', 't/b' + top, top]))
+
+    def test_bulk_operations_on_many_keys(self):
+        from grapheekdb.backends.data.sqlite import MAX_VARIABLES
+        keys = ['t/%s' % (i,) for i in range(MAX_VARIABLES * 2 + 1)]
+        txn = self.graph._transaction_begin()
+        self.graph._bulk_set(txn, dict((key, [key]) for key in keys))
+        self.graph._transaction_commit(txn)
+        assert(len(self.graph._bulk_get(None, keys)) == len(keys))
+        txn = self.graph._transaction_begin()
+        self.graph._bulk_remove(txn, keys[1:])
+        self.graph._transaction_commit(txn)
+        assert(self.graph._bulk_get(None, keys) == {'t/0': ['t/0']})
+
+    def test_rollback(self):
+        txn = self.graph._transaction_begin()
+        self.graph._set(txn, 't/a', 1)
+        assert(self.graph._get(txn, 't/a') == 1)
+        self.graph._transaction_rollback(txn)
+        assert(self.graph._get(None, 't/a') == UNDEFINED)
+
+
+class TestSqliteGraphFastMode(TestSqliteGraph):
+
+    def setup(self):
+        from grapheekdb.backends.data.sqlite import SqliteGraph
+        self.dbpath = tempfile.mktemp()
+        self.graph = SqliteGraph(self.dbpath, fast=True)
+        self.fill()
+
+    def teardown(self):
+        for suffix in ['', '-wal', '-shm']:
+            try:
+                os.remove(self.dbpath + suffix)
+            except:
+                pass
+
+    def test_fast_mode_storage(self):
+        assert(self.graph._c.execute("pragma journal_mode").fetchone()[0] == 'wal')
+        assert(self.graph._c.execute("select typeof(value) from storage where key = 'v/0/d'").fetchone()[0] == 'blob')
+        # Reopening the database :
+        from grapheekdb.backends.data.sqlite import SqliteGraph
+        self.graph.close()
+        self.graph = SqliteGraph(self.dbpath, fast=True)
+        assert(self.graph.V(name='Raf').count() == 1)
+
+
+class TestRelationalSqliteGraph(TestSqliteGraph):
+
+    def setup(self):
+        from grapheekdb.backends.data.sqlite import RelationalSqliteGraph
+        self.dbpath = tempfile.mktemp()
+        self.graph = RelationalSqliteGraph(self.dbpath)
+        self.fill()
+
+    def test_entities_are_stored_in_tables(self):
+        c = self.graph._c
+        assert(c.execute("select count(*) from vertices").fetchone()[0] == 3)
+        rows = c.execute("select id, src, tgt from edges order by id").fetchall()
+        assert(rows == [(self.e1.get_id(), self.n1.get_id(), self.n2.get_id()), (self.e2.get_id(), self.n2.get_id(), self.n3.get_id())])
+        # Adjacency lists and entity data are not stored in storage table :
+        assert(c.execute("select count(*) from storage where key like 'v/%/oe' or key like 'e/%/iv' or key like '%/d'").fetchone()[0] == 0)
+        self.n2.remove()
+        assert(c.execute("select count(*) from edges").fetchone()[0] == 0)
+        assert(c.execute("select count(*) from vertices").fetchone()[0] == 2)
+
+    def test_adjacency_lists(self):
+        loop = self.graph.add_edge(self.n2, self.n2)
+        n1, n2, n3 = self.n1.get_id(), self.n2.get_id(), self.n3.get_id()
+        e1, e2, e3 = self.e1.get_id(), self.e2.get_id(), loop.get_id()
+        lists = self.graph._bulk_get_lst(None, ['v/%s/%s' % (n2, suffix) for suffix in ['oe', 'ov', 'ie', 'iv', 'be', 'bv']] + ['e/%s/bv' % (e1,), 'v/1000/oe'])
+        assert(lists == [[e2, e3], [n3, n2], [e1, e3], [n1, n2], [e1, e2, e3, e3], [n1, n3, n2, n2], [n1, n2], UNDEFINED])
+
+    def test_adjacency_lists_queries(self):
+        statements = []
+        self.graph._db.set_trace_callback(statements.append)
+        try:
+            # Only out edges are selected, n1 has some : it exists
+            assert(self.graph._bulk_get_lst(None, ['v/%s/oe' % (self.n1.get_id(),)]) == [[self.e1.get_id()]])
+            assert(len(statements) == 1 and 'where src in' in statements[0])
+            del statements[:]
+            # n3 has no out edges : its existence is checked
+            assert(self.graph._bulk_get_lst(None, ['v/%s/ov' % (self.n3.get_id(),)]) == [[]])
+            assert(len(statements) == 2 and 'from vertices' in statements[1])
+        finally:
+            self.graph._db.set_trace_callback(None)
@@ -0,0 +1,40 @@
+#!/usr/bin/env
+# -*- coding: utf-8 -*-
+
+from grapheekdb.lib.exceptions import GrapheekInvalidExpression
+from grapheekdb.lib.expressions import compile_expr, eval_expr
+
+
+class TestExpressions(object):
+
+    def test_eval(self):
+        assert(eval_expr(dict(a=2, b=3), 'a * b + 1') == 7)
+        assert(eval_expr(dict(a=2), '1 if a > 1 else 0') == 1)
+        assert(eval_expr(dict(_=dict(x=dict(weight=4))), '_.x.weight / 2') == 2)
+        assert(eval_expr(dict(_=dict(x=dict())), '_.x.weight') == 0)
+
+    def test_compiled_expressions_are_cached(self):
+        assert(compile_expr('a + b') is compile_expr('a + b'))
+
+    def test_referenced_names(self):
+        expression = compile_expr('a + b * a')
+        assert(expression.fields == ['a', 'b'])
+        assert(not expression.uses_context)
+        expression = compile_expr('_.x.weight + c')
+        assert(expression.fields == ['c'])
+        assert(expression.uses_context)
+
+    def test_invalid_expressions(self):
+        for expr in ['import string', 'a % 2', '"a"', 'a.__class__', 'f(a)']:
+            exception_raised = False
+            try:
+                compile_expr(expr)
+            except GrapheekInvalidExpression:
+                exception_raised = True
+            assert(exception_raised)
+        exception_raised = False
+        try:
+            eval_expr(dict(a=1), 'b + 1')
+        except GrapheekInvalidExpression:
+            exception_raised = True
+        assert(exception_raised)
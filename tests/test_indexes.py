@@ -1,7 +1,11 @@
 #!/usr/bin/env
 # -*- coding: utf-8 -*-
 
+import random
+
 from grapheekdb.backends.data.indexes import BaseIndex
+from grapheekdb.backends.data.keys import CHUNK_SIZE
+from grapheekdb.lib.undef import UNDEFINED
 
 
 class TestBaseIndex(object):
@@ -33,6 +37,14 @@ class TestBaseIndex(object):
             exception_raised = True
         assert(exception_raised)
 
+    def test_bulk_remove_is_not_implemented(self):
+        exception_raised = False
+        try:
+            self.index.bulk_remove(None, [])
+        except NotImplementedError:
+            exception_raised = True
+        assert(exception_raised)
+
     def test_estimate_is_not_implemented(self):
         exception_raised = False
         try:
@@ -48,3 +60,146 @@ class TestBaseIndex(object):
         except NotImplementedError:
             exception_raised = True
         assert(exception_raised)
+
+
+    def test_count_is_unknown(self):
+        assert(self.index.count(None, {}) is None)
+
+
+class TestExactIndex(object):
+
+    def setup(self):
+        from grapheekdb.backends.data.localmem import LocalMemoryGraph
+        self.graph = LocalMemoryGraph()
+        self.graph.add_node_index('name')
+        self.index = self.graph._node_indexes[-1]
+
+    def test_count(self):
+        nodes = self.graph.bulk_add_node([dict(name='a'), dict(name='b'), dict(name='a')])
+        self.graph.add_node(name='a')
+        assert(self.index.count(None, dict(name='a')) == 3)
+        assert(self.index.count(None, dict(name__in=['a', 'b', 'c'])) == 4)
+        nodes[0].remove()
+        assert(self.index.count(None, dict(name__exact='a')) == 2)
+        nodes[1].name = 'a'
+        assert(self.index.count(None, dict(name='a')) == 3)
+        assert(self.index.count(None, dict(name='b')) == 0)
+
+    def test_count_is_unknown(self):
+        self.graph.add_node(name='a', value=1)
+        assert(self.index.count(None, dict(name='a', value=1)) is None)
+        assert(self.index.count(None, dict(name__startswith='a')) is None)
+        assert(self.index.count(None, dict(value=1)) is None)
+        assert(self.index.count(None, dict(name=1)) is None)
+        # index built before live counters existed :
+        txn = self.graph._transaction_begin()
+        self.graph._remove_prefix(txn, self.index._prefix + '/n/')
+        self.graph._transaction_commit(txn)
+        assert(self.index.count(None, dict(name='a')) is None)
+        assert(self.graph.V(name='a').count() == 1)
+
+    def test_bulk_add_keeps_existing_ids(self):
+        self.graph.add_node(name='a')
+        self.graph.bulk_add_node([dict(name='a'), dict(name='a')])
+        assert(len(list(self.index.ids(None, dict(name='a')))) == 3)
+
+    def test_remove_forgets_entity(self):
+        node = self.graph.add_node(name='a')
+        node.remove()
+        assert(self.graph._get(None, '%s/%s' % (self.index._prefix, node.get_id())) == UNDEFINED)
+
+    def test_depends_on(self):
+        self.graph.add_node_index('value', kind='a')
+        partial_index = self.graph._node_indexes[-1]
+        assert(self.index.depends_on(['name', 'other']))
+        assert(not(self.index.depends_on(['other'])))
+        assert(partial_index.depends_on(['kind']))
+        assert(not(partial_index.depends_on(['name'])))
+
+    def test_update_only_maintains_dependent_indexes(self):
+        calls = []
+        bulk_remove = self.index.bulk_remove
+        self.index.bulk_remove = lambda txn, entity_ids: calls.append(entity_ids) or bulk_remove(txn, entity_ids)
+        self.graph.bulk_add_node([dict(name='a', value=value) for value in range(3)])
+        self.graph.V().update(value=10)
+        assert(calls == [])
+        self.graph.V(value=10).update(name='b')
+        assert(calls == [[0, 1, 2]])
+        assert(self.index.count(None, dict(name='a')) == 0)
+        assert(self.index.count(None, dict(name='b')) == 3)
+
+    def test_bulk_remove(self):
+        nodes = self.graph.bulk_add_node([dict(name=str(value % 3)) for value in range(3 * CHUNK_SIZE)])
+        self.graph.V(name__in=['0', '1']).remove()
+        assert(self.index.count(None, dict(name__in=['0', '1'])) == 0)
+        assert(self.index.count(None, dict(name='2')) == CHUNK_SIZE)
+        assert(sorted(self.index.ids(None, dict(name='2'))) == [node.get_id() for node in nodes[2::3]])
+        assert(self.graph._get(None, '%s/%s' % (self.index._prefix, nodes[0].get_id())) == UNDEFINED)
+
+
+class TestRangeIndex(object):
+
+    def setup(self):
+        from grapheekdb.backends.data.localmem import LocalMemoryGraph
+        self.graph = LocalMemoryGraph()
+        self.graph.add_node_range_index('value')
+        self.index = self.graph._node_indexes[-1]
+
+    def test_multi_run(self):
+        values = list(range(5 * CHUNK_SIZE))
+        random.shuffle(values)
+        # first nodes are indexed through bulk add, next ones one by one :
+        nodes = self.graph.bulk_add_node([dict(value=value) for value in values[:3 * CHUNK_SIZE]])
+        for value in values[3 * CHUNK_SIZE:]:
+            nodes.append(self.graph.add_node(value=value))
+        assert(len(self.index._get_header(None)[1]) > 2)
+        assert(sorted(node.value for node in self.graph.V(value__gte=1000, value__lt=1100)) == list(range(1000, 1100)))
+        for node in nodes[:4 * CHUNK_SIZE]:
+            node.remove()
+        assert(self.graph.V(value__gte=0).count() == CHUNK_SIZE)
+        assert(sorted(node.value for node in self.graph.V(value__in=values[-10:])) == sorted(values[-10:]))
+
+    def test_bulk_update_and_remove(self):
+        values = list(range(5 * CHUNK_SIZE))
+        random.shuffle(values)
+        self.graph.bulk_add_node([dict(value=value) for value in values])
+        self.graph.V(value__lt=CHUNK_SIZE).update(value='moved')
+        assert(self.graph.V(value__lt=CHUNK_SIZE).count() == 0)
+        assert(self.graph.V(value__startswith='mov').count() == CHUNK_SIZE)
+        self.graph.V(value__gte=2 * CHUNK_SIZE).remove()
+        assert(self.graph.V(value__gte=0).count() == CHUNK_SIZE)
+        assert(sorted(node.value for node in self.graph.V(value__gte=0)) == list(range(CHUNK_SIZE, 2 * CHUNK_SIZE)))
+        assert(sum(entry_count for _, _, entry_count in self.index._get_header(None)[1]) == 2 * CHUNK_SIZE)
+
+    def test_bulk_operations_build_first_entries_once(self):
+        self.graph.bulk_add_node([dict(value=value) for value in range(10 * CHUNK_SIZE)])
+        assert(len(self.index._get_header(None)[1]) > 2)
+        calls = []
+        first_entries = self.index._first_entries
+        self.index._first_entries = lambda directory: calls.append(len(directory)) or first_entries(directory)
+        values = list(range(0, 10 * CHUNK_SIZE, 7))
+        self.graph.bulk_add_node([dict(value=value) for value in values])
+        assert(len(calls) == 1)
+        removed_ids = [node.get_id() for node in self.graph.V(value__lt=CHUNK_SIZE)]
+        del calls[:]
+        self.graph._bulk_remove_node(removed_ids)
+        assert(len(calls) == 1)
+        assert(self.graph.V(value__gte=0).count() == 9 * CHUNK_SIZE + len([value for value in values if value >= CHUNK_SIZE]))
+
+    def test_estimate_only_counts_matching_runs(self):
+        self.graph.bulk_add_node([dict(value=value) for value in range(10 * CHUNK_SIZE)])
+        assert(self.index.estimate(None, dict(value__gte=10 * CHUNK_SIZE - 10)) <= 2 * CHUNK_SIZE)
+        assert(self.index.estimate(None, dict(value__lt=0)) <= 2 * CHUNK_SIZE)
+
+    def test_incompetent_filters(self):
+        assert(self.index.estimate(None, dict(other=1)) == -1)
+        assert(self.index.estimate(None, dict(value=None)) == -1)
+        assert(self.index.estimate(None, dict(value=[1, 2])) == -1)
+        assert(self.index.estimate(None, dict(value__startswith=1)) == -1)
+
+    def test_prefix_lookups(self):
+        for name in ['a', 'ab', 'abc', 'abd', 'b', u'ab\uffff', '']:
+            self.graph.add_node(value=name)
+        assert(self.graph.V(value__startswith='ab').count() == 4)
+        assert(self.graph.V(value__startswith='').count() == 7)
+        assert(self.graph.V(value__startswith='c').count() == 0)
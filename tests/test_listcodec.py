@@ -0,0 +1,40 @@
+#!/usr/bin/env
+# -*- coding: utf-8 -*-
+
+from grapheekdb.backends.data.listcodec import pack_ints, unpack_ints, pack_lst, unpack_lst
+from grapheekdb.backends.data.keys import CHUNK_SIZE
+
+
+class TestListCodec(object):
+
+    def test_ints_roundtrip(self):
+        values = [0, 1, 2, -1, CHUNK_SIZE, 2 ** 40, -2 ** 63, 2 ** 63 - 1]
+        raw = pack_ints(values)
+        assert(len(raw) == 8 * len(values))
+        assert(unpack_ints(raw) == values)
+
+    def test_little_endian(self):
+        assert(pack_ints([1]) == b'\x01' + b'\x00' * 7)
+
+    def test_empty_list(self):
+        assert(pack_lst([]) == b'')
+        assert(unpack_lst(b'') == [])
+
+    def test_appending_raw_values(self):
+        # Packed lists can be extended without decoding them
+        raw = pack_lst([1, 2]) + pack_ints([3])
+        assert(unpack_lst(raw) == [1, 2, 3])
+
+    def test_decoding_from_buffer(self):
+        raw = pack_lst(list(range(10)))
+        assert(unpack_lst(memoryview(raw)) == list(range(10)))
+
+    def test_header_roundtrip(self):
+        header = {'n': 3, 'c': [[0, CHUNK_SIZE, 1, 2 * CHUNK_SIZE], [2, 10, 5, 27]]}
+        raw = pack_lst(header)
+        assert(len(raw) % 8 == 1)
+        assert(unpack_lst(raw) == header)
+
+    def test_empty_header(self):
+        header = {'n': 0, 'c': []}
+        assert(unpack_lst(pack_lst(header)) == header)
@@ -122,10 +122,237 @@ class TestServerParseParams:
         assert(parse_params(['key1:value1', 'key2:value2', 'key3:value3']) == {'key1': 'value1', 'key2': 'value2', 'key3': 'value3'})
 
 
+class TestReadOnlyRequests:
+
+    def test_is_read_only(self):
+        from grapheekdb.server.serve import is_read_only
+        assert(is_read_only([['V', [], {'foo': 1}], ['outV', [], {}], ['order_by', ['name'], {}], ['count', [], {}]]))
+        assert(is_read_only([['_marshalled_union', [[['V', [], {}]], [['E', [], {}], ['inV', [], {}]]], {}]]))
+        assert(not(is_read_only([['V', [], {}], ['remove', [], {}]])))
+        assert(not(is_read_only([['add_node', [], {'foo': 1}]])))
+        assert(not(is_read_only([['V', [], {}], ['call', ['script'], {}]])))
+        assert(not(is_read_only([['_marshalled_union', [[['V', [], {}], ['update', [], {'foo': 1}]]], {}]])))
+        assert(is_read_only([['_batch', [[[['V', [], {}], ['count', [], {}]], [['E', [], {}], ['all', [], {}]]]], {}]]))
+        assert(not(is_read_only([['_batch', [[[['V', [], {}], ['count', [], {}]], [['add_node', [], {}]]]], {}]])))
+
+    def test_is_groupable(self):
+        from grapheekdb.server.serve import is_groupable
+        assert(is_groupable([['add_node', [], {'foo': 1}]]))
+        assert(is_groupable([['v', [1], {}], ['update', [], {'foo': 1}]]))
+        assert(not(is_groupable([['V', [], {}], ['update', [], {'foo': 1}]])))
+        assert(not(is_groupable([['v', [1], {}], ['remove', [], {}]])))
+
+
+class TestReadWriteLock:
+
+    def test_readers_share_the_lock(self):
+        import threading
+        from grapheekdb.lib.rwlock import ReadWriteLock
+        lock = ReadWriteLock()
+        lock.acquire_read()
+        acquired = threading.Event()
+
+        def read():
+            lock.acquire_read()
+            acquired.set()
+            lock.release_read()
+        thread = threading.Thread(target=read)
+        thread.start()
+        assert(acquired.wait(5))
+        thread.join()
+        lock.release_read()
+
+    def test_writer_is_exclusive(self):
+        import threading
+        from grapheekdb.lib.rwlock import ReadWriteLock
+        lock = ReadWriteLock()
+        lock.acquire_read()
+        events = []
+
+        def write():
+            lock.acquire_write()
+            events.append('write')
+            lock.release_write()
+
+        def read():
+            lock.acquire_read()
+            events.append('read')
+            lock.release_read()
+        writer = threading.Thread(target=write)
+        writer.start()
+        time.sleep(0.1)
+        # the writer waits for the 1st reader, and a new reader waits for the writer :
+        reader = threading.Thread(target=read)
+        reader.start()
+        time.sleep(0.1)
+        assert(events == [])
+        lock.release_read()
+        writer.join()
+        reader.join()
+        assert(events == ['write', 'read'])
+
+
+class TestCursorRegistry:
+
+    def test_batches(self):
+        from grapheekdb.server.cursors import CursorRegistry
+        cursors = CursorRegistry()
+        cursor_id, items, finished = cursors.open(range(5), 2)
+        assert((items, finished) == ([0, 1], False))
+        assert(len(cursors) == 1)
+        assert(cursors.fetch(cursor_id, 2) == (cursor_id, [2, 3], False))
+        assert(cursors.fetch(cursor_id, 2) == (cursor_id, [4], True))
+        assert(len(cursors) == 0)
+
+    def test_small_result_doesnt_keep_cursor(self):
+        from grapheekdb.server.cursors import CursorRegistry
+        cursors = CursorRegistry()
+        _, items, finished = cursors.open(range(3), 10)
+        assert((items, finished) == ([0, 1, 2], True))
+        assert(len(cursors) == 0)
+
+    def test_unknown_cursor(self):
+        from grapheekdb.server.cursors import CursorRegistry
+        from grapheekdb.lib.exceptions import GrapheekUnknownCursorException
+        cursors = CursorRegistry()
+        cursor_id, _, _ = cursors.open(range(5), 2)
+        cursors.close(cursor_id)
+        exception_raised = False
+        try:
+            cursors.fetch(cursor_id, 2)
+        except GrapheekUnknownCursorException:
+            exception_raised = True
+        assert(exception_raised)
+
+    def test_expiry(self):
+        from grapheekdb.server.cursors import CursorRegistry
+        from grapheekdb.lib.exceptions import GrapheekUnknownCursorException
+        cursors = CursorRegistry(expiry=0.1)
+        cursor_id, _, _ = cursors.open(range(5), 2)
+        time.sleep(0.2)
+        cursors.open(range(5), 2)
+        assert(len(cursors) == 1)
+        exception_raised = False
+        try:
+            cursors.fetch(cursor_id, 2)
+        except GrapheekUnknownCursorException:
+            exception_raised = True
+        assert(exception_raised)
+
+
+class TestGroupCommitter:
+
+    def test_concurrent_writes_share_commits(self):
+        import os
+        import threading
+        from grapheekdb.backends.data.sqlite import SqliteGraph
+        from grapheekdb.lib.groupcommit import GroupCommitter
+        from grapheekdb.lib.rwlock import ReadWriteLock
+        path = tempfile.mktemp()
+        graph = SqliteGraph(path)
+        commits = []
+        transaction_commit = graph._transaction_commit
+
+        def counting_commit(txn):
+            commits.append(txn)
+            transaction_commit(txn)
+        graph._transaction_commit = counting_commit
+        committer = GroupCommitter(graph, ReadWriteLock(), window=0.2, on_commit=lambda: commits.append('on_commit'))
+        ids = []
+
+        def write(number):
+            ids.append(committer.submit(lambda: graph.add_node(number=number), lambda node: node.get_id()))
+        threads = [threading.Thread(target=write, args=(number,)) for number in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        committer.close()
+        assert(sorted(ids) == list(range(10)))
+        assert(sorted(node.number for node in graph.V()) == list(range(10)))
+        # less commits than writes :
+        assert(commits.count('on_commit') < 10)
+        assert(len(commits) == 2 * commits.count('on_commit'))
+        graph.close()
+        os.remove(path)
+
+    def test_failure_is_raised_to_its_submitter(self):
+        from grapheekdb.backends.data.localmem import LocalMemoryGraph
+        from grapheekdb.lib.groupcommit import GroupCommitter
+        graph = LocalMemoryGraph()
+        committer = GroupCommitter(graph)
+
+        def fail():
+            raise ValueError('failure')
+        exception_raised = False
+        try:
+            committer.submit(fail)
+        except ValueError:
+            exception_raised = True
+        assert(exception_raised)
+        assert(committer.submit(lambda: graph.add_node(foo=1)).foo == 1)
+        committer.close()
+
+
+class TestResultCache:
+
+    def setup(self):
+        from grapheekdb.backends.data.localmem import LocalMemoryGraph
+        from grapheekdb.server.cursors import CursorRegistry
+        from grapheekdb.server.results import ResultCache
+        self.graph = LocalMemoryGraph()
+        self.graph.add_node(name='a', foo=1)
+        self.cursors = CursorRegistry()
+        self.results = ResultCache()
+
+    def execute(self, commands):
+        from grapheekdb.server.serve import execute
+        return msgpack.loads(execute(self.graph, commands, self.cursors, self.results), encoding='utf8')
+
+    def test_replies_are_kept_until_next_write(self):
+        count = [['V', [], {'name': 'a', 'foo': 1}], ['count', [], {}]]
+        assert(self.execute(count) == 1)
+        assert(len(self.results) == 1)
+        # (graph changed without the server knowing it : cached reply is returned)
+        self.graph.add_node(name='a', foo=1)
+        assert(self.execute(count) == 1)
+        # keyword arguments order doesn't matter :
+        assert(self.execute([['V', [], {'foo': 1, 'name': 'a'}], ['count', [], {}]]) == 1)
+        self.execute([['add_node', [], {'name': 'a', 'foo': 1}]])
+        assert(self.execute(count) == 3)
+
+    def test_failed_write_bumps_epoch(self):
+        epoch = self.results.epoch
+        exception_raised = False
+        try:
+            self.execute([['v', [1000], {}], ['remove', [], {}]])
+        except Exception:
+            exception_raised = True
+        assert(exception_raised)
+        assert(self.results.epoch == epoch + 1)
+
+    def test_uncacheable_requests(self):
+        from grapheekdb.server.serve import is_cacheable
+        assert(is_cacheable([['V', [], {}], ['count', [], {}]]))
+        assert(not(is_cacheable([['V', [], {}], ['random', ['shuffle'], {}], ['all', [], {}]])))
+        assert(not(is_cacheable([['_batch', [[[['V', [], {}], ['count', [], {}]], [['V', [], {}], ['random', ['shuffle'], {}]]]], {}]])))
+        self.graph.add_node(name='b', foo=1)
+        # a cursor that has not been fully read can't be cached, a finished one can :
+        self.execute([['V', [], {}], ['_cursor', [1], {}]])
+        assert(len(self.results) == 0)
+        self.execute([['V', [], {}], ['_cursor', [10], {}]])
+        assert(len(self.results) == 1)
+
+
 class TestServer:
 
     def test_running_server(self):
-        pass
+        self._check_running_server('')
+
+    def test_running_server_with_workers(self):
+        self._check_running_server('-w 4 ')
+
+    def _check_running_server(self, options):
         from grapheekdb.server.serve import main as main_serve
 
         address = "ipc:///tmp/%s" % (uuid4().int,)
@@ -172,7 +399,7 @@ class TestServer:
         process.start()
         # Now starting server (will block but external process will unblock it)
         context = zmq.Context()
-        main_serve(cmds=('-a %s -b grapheekdb.backends.data.localmem.LocalMemoryGraph' % (address,)).split(), verbose=False, context=context)
+        main_serve(cmds=(options + '-a %s -b grapheekdb.backends.data.localmem.LocalMemoryGraph' % (address,)).split(), verbose=False, context=context)
         results = queue.get()
         process.terminate()
         # Checking results :